@@ -9,8 +9,17 @@ DATABASE_HOST=getenv("DATABASE_HOST")
 DATABASE_PASSWORD=getenv("DATABASE_PASSWORD")
 DATABASE_NAME=getenv("DATABASE_NAME")
 
-# Configuración de la base de datos
-DATABASE_URL = f"mysql+mysqlconnector://{DATABASE_USER}:{DATABASE_PASSWORD}@{DATABASE_HOST}:3306/{DATABASE_NAME}"
+# Configuración de la base de datos (DATABASE_URL permite usar otra BD, p. ej. SQLite en pruebas)
+DATABASE_URL = getenv("DATABASE_URL") or f"mysql+mysqlconnector://{DATABASE_USER}:{DATABASE_PASSWORD}@{DATABASE_HOST}:3306/{DATABASE_NAME}"
+# Entradas de la caché de sentencias compiladas de SQLAlchemy, por engine (aciertos en /debug/runtime)
+DATABASE_QUERY_CACHE_SIZE = int(getenv("DATABASE_QUERY_CACHE_SIZE", "500"))
+
+# Réplicas de lectura (URLs separadas por comas); vacío = todo va al primario
+DATABASE_REPLICA_URLS = [url.strip() for url in getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+DATABASE_REPLICA_STRATEGY = getenv("DATABASE_REPLICA_STRATEGY", "round_robin")  # "round_robin" o "least_connections"
+DATABASE_REPLICA_HEALTH_INTERVAL = float(getenv("DATABASE_REPLICA_HEALTH_INTERVAL", "10.0"))
+# Segundos que un cliente lee del primario después de escribir (read-after-write)
+DATABASE_REPLICA_STICKY_SECONDS = int(getenv("DATABASE_REPLICA_STICKY_SECONDS", "5"))
 
 # Configuración de JWT
 SECRET_KEY = getenv("SECRET_KEY", "your-secret-key-here")
@@ -33,4 +42,114 @@ SMTP_PASSWORD = getenv("SMTP_PASSWORD")
 
 # Configuración de remitente
 MAIL_FROM_EMAIL = getenv("MAIL_FROM_EMAIL", "noreply@chacharitas.com")
-MAIL_FROM_NAME = getenv("MAIL_FROM_NAME", "Chacharitas")
\ No newline at end of file
+MAIL_FROM_NAME = getenv("MAIL_FROM_NAME", "Chacharitas")
+
+# Configuración del outbox de eventos
+OUTBOX_ENABLED = getenv("OUTBOX_ENABLED", "true").lower() == "true"
+OUTBOX_POLL_INTERVAL = float(getenv("OUTBOX_POLL_INTERVAL", "1.0"))
+OUTBOX_BATCH_SIZE = int(getenv("OUTBOX_BATCH_SIZE", "100"))
+# Segundos que se espera un id que falta antes de saltarlo (subir con transacciones largas)
+OUTBOX_GAP_TIMEOUT = float(getenv("OUTBOX_GAP_TIMEOUT", "5.0"))
+# Segundos que se sigue buscando un id saltado por si hace commit tarde
+OUTBOX_LATE_WINDOW = float(getenv("OUTBOX_LATE_WINDOW", "3600"))
+OUTBOX_BROKER = getenv("OUTBOX_BROKER", "local")  # "local" o "none"
+
+# Configuración de rate limiting (formato "peticiones/segundos")
+def _rate(value: str):
+    limit, window = value.split("/")
+    return int(limit), float(window)
+
+RATE_LIMIT_ENABLED = getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BACKEND = getenv("RATE_LIMIT_BACKEND", "memory")  # "memory" o "redis"
+# Proxies cuyo X-Forwarded-For se acepta (IPs o redes CIDR, separadas por comas).
+# Vacío = se ignora la cabecera y se usa la IP de la conexión
+TRUSTED_PROXIES = [p.strip() for p in getenv("TRUSTED_PROXIES", "").split(",") if p.strip()]
+REDIS_URL = getenv("REDIS_URL", "redis://localhost:6379/0")
+RATE_LIMITS = {
+    "login": {
+        "ip": _rate(getenv("RATE_LIMIT_LOGIN_IP", "20/60")),
+        "identity": _rate(getenv("RATE_LIMIT_LOGIN_EMAIL", "5/60")),
+    },
+    "register": {
+        "ip": _rate(getenv("RATE_LIMIT_REGISTER_IP", "5/60")),
+        "identity": _rate(getenv("RATE_LIMIT_REGISTER_EMAIL", "3/3600")),
+    },
+    "resend-verification": {
+        "ip": _rate(getenv("RATE_LIMIT_RESEND_IP", "5/600")),
+        "identity": _rate(getenv("RATE_LIMIT_RESEND_USER", "3/600")),
+    },
+}
+# Máximo de peticiones de auth simultáneas por worker (bcrypt es caro en CPU)
+AUTH_MAX_CONCURRENCY = int(getenv("AUTH_MAX_CONCURRENCY", "8"))
+
+# Índice en memoria de precios (estadísticas para el slider de filtros): cada
+# REFRESH segundos aplica los cambios del outbox; cada FULL_RELOAD lo recarga entero
+PRICE_STATS_REFRESH_SECONDS = float(getenv("PRICE_STATS_REFRESH_SECONDS", "2"))
+PRICE_STATS_FULL_RELOAD_SECONDS = float(getenv("PRICE_STATS_FULL_RELOAD_SECONDS", "3600"))
+
+# Arranque
+ENABLE_TEST_ROUTES = getenv("ENABLE_TEST_ROUTES", "false").lower() == "true"  # expone /test/*
+LOG_ROUTES = getenv("LOG_ROUTES", "false").lower() == "true"  # imprime las rutas al arrancar
+# Calentar pool, consultas y cachés antes de que /health/ready responda 200
+WARMUP_ENABLED = getenv("WARMUP_ENABLED", "true").lower() == "true"
+
+# Servidor multi-proceso (python -m app.serve)
+WEB_CONCURRENCY = int(getenv("WEB_CONCURRENCY", "0"))  # 0 = un worker por CPU
+MAX_REQUESTS = int(getenv("MAX_REQUESTS", "0"))  # reciclar el worker tras N peticiones (0 = nunca)
+MAX_REQUESTS_JITTER = int(getenv("MAX_REQUESTS_JITTER", "0"))
+GRACEFUL_TIMEOUT = int(getenv("GRACEFUL_TIMEOUT", "30"))
+THREADPOOL_SIZE = int(getenv("THREADPOOL_SIZE", "40"))  # hilos para rutas síncronas, por worker
+# Las tareas de mantenimiento compartidas (purga, sweeper, outbox...) solo corren en
+# el worker 0. app.serve lo fija en cada hijo; con otro lanzador de varios procesos,
+# dar un valor distinto de 0 a todos menos uno
+WORKER_INDEX = int(getenv("WORKER_INDEX", "0"))
+# Avisar cuando el event loop se bloquee más de N ms (0 = desactivado)
+LOOP_BLOCK_THRESHOLD_MS = float(getenv("LOOP_BLOCK_THRESHOLD_MS", "0"))
+ENABLE_DEBUG_ROUTES = getenv("ENABLE_DEBUG_ROUTES", "false").lower() == "true"  # expone /debug/*
+
+# Sincronización incremental (/sync/products)
+# Los cambios más recientes que N segundos se retienen hasta la siguiente página,
+# para no saltarse transacciones que confirmaron tarde con un updated_at anterior
+SYNC_SAFETY_LAG_SECONDS = float(getenv("SYNC_SAFETY_LAG_SECONDS", "2"))
+SYNC_TOMBSTONE_RETENTION_DAYS = int(getenv("SYNC_TOMBSTONE_RETENTION_DAYS", "30"))
+
+# Purga de productos borrados lógicamente (deleted_at)
+PRODUCT_PURGE_INTERVAL = float(getenv("PRODUCT_PURGE_INTERVAL", "60"))
+PRODUCT_PURGE_GRACE_SECONDS = int(getenv("PRODUCT_PURGE_GRACE_SECONDS", "3600"))  # margen antes de borrar de verdad
+PRODUCT_PURGE_BATCH_SIZE = int(getenv("PRODUCT_PURGE_BATCH_SIZE", "200"))
+PRODUCT_PURGE_MAX_BATCHES = int(getenv("PRODUCT_PURGE_MAX_BATCHES", "50"))  # por ejecución
+PRODUCT_PURGE_PAUSE_SECONDS = float(getenv("PRODUCT_PURGE_PAUSE_SECONDS", "0.1"))  # entre lotes
+
+# Reservas de stock
+RESERVATION_TTL_SECONDS = int(getenv("RESERVATION_TTL_SECONDS", "900"))
+RESERVATION_MAX_TTL_SECONDS = int(getenv("RESERVATION_MAX_TTL_SECONDS", "3600"))
+RESERVATION_SWEEP_INTERVAL = float(getenv("RESERVATION_SWEEP_INTERVAL", "30"))  # también consolida el stock fraccionado
+RESERVATION_SWEEP_BATCH_SIZE = int(getenv("RESERVATION_SWEEP_BATCH_SIZE", "500"))
+
+# /catalog/bootstrap: cada cuántos segundos comprobar si otro worker cambió las dimensiones
+CATALOG_FINGERPRINT_SECONDS = float(getenv("CATALOG_FINGERPRINT_SECONDS", "30"))
+
+# Productos similares (product_neighbors)
+SIMILARITY_TOP_K = int(getenv("SIMILARITY_TOP_K", "20"))  # vecinos guardados por producto
+SIMILARITY_BATCH_SIZE = int(getenv("SIMILARITY_BATCH_SIZE", "256"))  # filas por producto de matrices
+SIMILARITY_REFRESH_INTERVAL = float(getenv("SIMILARITY_REFRESH_INTERVAL", "300"))
+# El refresco carga todo el catálogo: por defecto va por cron, no en cada worker
+SIMILARITY_JOB_ENABLED = getenv("SIMILARITY_JOB_ENABLED", "false").lower() == "true"
+
+# Vistas y popularidad (product_stats): contadores en memoria volcados por lotes
+VIEW_FLUSH_INTERVAL = float(getenv("VIEW_FLUSH_INTERVAL", "10"))  # lo máximo que se pierde si cae un worker
+POPULARITY_HALF_LIFE_HOURS = float(getenv("POPULARITY_HALF_LIFE_HOURS", "72"))
+POPULARITY_DECAY_INTERVAL = float(getenv("POPULARITY_DECAY_INTERVAL", "3600"))
+
+# Filtro ?near=lat,lon&radius= (km) de los listados de productos
+GEO_DEFAULT_RADIUS_KM = float(getenv("GEO_DEFAULT_RADIUS_KM", "10"))
+GEO_MAX_RADIUS_KM = float(getenv("GEO_MAX_RADIUS_KM", "100"))
+
+# Idempotency-Key en POST /products/ y POST /auth/register
+IDEMPOTENCY_TTL_SECONDS = int(getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))  # cuánto se repite una respuesta
+IDEMPOTENCY_LOCK_SECONDS = int(getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))  # lock de una petición en curso (si el worker cae)
+IDEMPOTENCY_WAIT_SECONDS = float(getenv("IDEMPOTENCY_WAIT_SECONDS", "5"))  # espera de un duplicado concurrente antes del 409
+
+# Administración de usuarios (/users): emails con acceso, separados por comas
+ADMIN_EMAILS = [e.strip().lower() for e in getenv("ADMIN_EMAILS", "").split(",") if e.strip()]
+USER_COUNT_CACHE_SECONDS = float(getenv("USER_COUNT_CACHE_SECONDS", "60"))  # vigencia de /users/count
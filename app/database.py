@@ -1,16 +1,260 @@
-from fastapi import FastAPI
-from sqlalchemy import create_engine
+import threading
+import time
+from contextlib import contextmanager
+from itertools import count
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from sqlmodel import Session, SQLModel
 
-from app.config import DATABASE_URL
+from app.config import (
+    DATABASE_URL, DATABASE_QUERY_CACHE_SIZE, DATABASE_REPLICA_URLS, DATABASE_REPLICA_STRATEGY,
+    DATABASE_REPLICA_HEALTH_INTERVAL, DATABASE_REPLICA_STICKY_SECONDS,
+    OUTBOX_ENABLED, OUTBOX_POLL_INTERVAL, PRICE_STATS_REFRESH_SECONDS, LOG_ROUTES,
+    THREADPOOL_SIZE, LOOP_BLOCK_THRESHOLD_MS, PRODUCT_PURGE_INTERVAL,
+    RESERVATION_SWEEP_INTERVAL, SIMILARITY_REFRESH_INTERVAL, VIEW_FLUSH_INTERVAL,
+    POPULARITY_DECAY_INTERVAL, WARMUP_ENABLED, SIMILARITY_JOB_ENABLED
+)
 from app import models
+from app.utils.background import register_job, start_jobs, stop_jobs
+from app.utils import statement_cache
+
+# El engine y las réplicas se crean en el primer uso, no al importar el módulo
+_engine: Optional[Engine] = None
+_replicas: Optional["ReplicaPool"] = None
+
+# Cookie que fija las lecturas al primario justo después de una escritura
+STICKY_PRIMARY_COOKIE = "read_primary_until"
+
+
+class ReplicaPool:
+    """
+    Conjunto de engines de réplicas de lectura con selección round-robin o
+    por menor número de conexiones en uso, y health checks periódicos.
+    Si no hay réplicas sanas, las lecturas caen al engine primario.
+    """
+
+    def __init__(self, primary: Engine, urls: List[str], strategy: str = "round_robin"):
+        self.primary = primary
+        self.strategy = strategy
+        self.engines: List[Engine] = [_create_engine(url) for url in urls]
+        self._healthy: Dict[int, bool] = {i: True for i in range(len(self.engines))}
+        self._in_use: Dict[int, int] = {i: 0 for i in range(len(self.engines))}
+        self._counter = count()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Engine:
+        healthy = [i for i, ok in self._healthy.items() if ok]
+        if not healthy:
+            return self.primary
+
+        if self.strategy == "least_connections":
+            with self._lock:
+                index = min(healthy, key=lambda i: self._in_use[i])
+                self._in_use[index] += 1
+        else:
+            index = healthy[next(self._counter) % len(healthy)]
+            with self._lock:
+                self._in_use[index] += 1
+        return self.engines[index]
+
+    def release(self, target: Engine):
+        for i, replica in enumerate(self.engines):
+            if replica is target:
+                with self._lock:
+                    self._in_use[i] = max(0, self._in_use[i] - 1)
+                return
+
+    def check_health(self):
+        """Marcar cada réplica como sana o caída según un SELECT 1"""
+        for i, replica in enumerate(self.engines):
+            try:
+                with replica.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                healthy = True
+            except Exception as e:
+                if self._healthy[i]:
+                    print(f"Réplica {replica.url.render_as_string(hide_password=True)} caída: {str(e)}")
+                healthy = False
+            self._healthy[i] = healthy
+
+    def status(self) -> List[dict]:
+        return [
+            {
+                "url": replica.url.render_as_string(hide_password=True),
+                "healthy": self._healthy[i],
+                "in_use": self._in_use[i],
+            }
+            for i, replica in enumerate(self.engines)
+        ]
+
+
+def _create_engine(url: str) -> Engine:
+    engine = create_engine(url, query_cache_size=DATABASE_QUERY_CACHE_SIZE)
+    statement_cache.watch(engine)
+    return engine
+
+
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        _engine = _create_engine(DATABASE_URL)
+    return _engine
+
+
+def get_replicas() -> ReplicaPool:
+    global _replicas
+    if _replicas is None:
+        _replicas = ReplicaPool(get_engine(), DATABASE_REPLICA_URLS, DATABASE_REPLICA_STRATEGY)
+    return _replicas
+
+
+def __getattr__(name: str):
+    # Compatibilidad con `from app.database import engine`
+    if name == "engine":
+        return get_engine()
+    if name == "replicas":
+        return get_replicas()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-engine = create_engine(DATABASE_URL)
 
 def get_session():
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         yield session
 
-def lifespan(app: FastAPI):
+
+def _prefers_primary(request: Optional[Request]) -> bool:
+    if request is None:
+        return False
+    try:
+        return float(request.cookies.get(STICKY_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+@contextmanager
+def read_session_scope(request: Optional[Request] = None):
+    """
+    Sesión de solo lectura: usa una réplica, salvo que el cliente haya escrito
+    hace poco (cookie read_primary_until), en cuyo caso usa el primario.
+    """
+    replicas = get_replicas()
+    target = replicas.primary if _prefers_primary(request) else replicas.acquire()
+    try:
+        with Session(target) as session:
+            yield session
+    finally:
+        replicas.release(target)
+
+
+def get_read_session(request: Request = None):
+    """Dependencia para rutas de solo lectura (ver read_session_scope)"""
+    with read_session_scope(request) as session:
+        yield session
+
+
+async def replica_sticky_middleware(request: Request, call_next):
+    """Tras una escritura exitosa, fijar las lecturas de ese cliente al primario unos segundos"""
+    response = await call_next(request)
+    if (
+        DATABASE_REPLICA_URLS
+        and request.method not in ("GET", "HEAD", "OPTIONS")
+        and response.status_code < 400
+    ):
+        response.set_cookie(
+            STICKY_PRIMARY_COOKIE,
+            str(time.time() + DATABASE_REPLICA_STICKY_SECONDS),
+            max_age=DATABASE_REPLICA_STICKY_SECONDS,
+            httponly=True,
+        )
+    return response
+
+
+_tables_created = False
+
+
+def create_tables():
+    """Crear las tablas que falten una sola vez por proceso (o en el padre antes del fork)"""
+    global _tables_created
+    if _tables_created:
+        return
     print("Creating database tables...")
-    yield
+    # Solo crea las tablas que falten (p. ej. product_summary); no altera las
+    # existentes: columnas e índices nuevos van en migrations/ (ver README)
+    SQLModel.metadata.create_all(get_engine())
+    _tables_created = True
+
+
+def lifespan(app: FastAPI):
+    """
+    Todo el trabajo de arranque vive aquí y no en imports: crear el engine,
+    las tablas que falten, arrancar las tareas periódicas y calentar el worker
+    (pool, consultas, plantillas y cachés) antes de marcarlo como listo.
+    """
+    from app.utils import runtime
+    from app.utils.warmup import readiness, start_warmup
+
+    # Hilos disponibles para rutas síncronas (def) en este worker
+    runtime.configure_threadpool(THREADPOOL_SIZE)
+    if LOOP_BLOCK_THRESHOLD_MS > 0:
+        runtime.loop_monitor = runtime.LoopBlockingMonitor(LOOP_BLOCK_THRESHOLD_MS)
+        runtime.loop_monitor.start()
+
+    create_tables()
+
+    if OUTBOX_ENABLED:
+        from app.utils.outbox import dispatcher, prune_job as prune_outbox_job
+        # Los suscriptores viven en el proceso que despacha: uno solo (worker 0)
+        register_job("outbox", OUTBOX_POLL_INTERVAL, dispatcher.dispatch_once, leader_only=True)
+        # Eventos ya entregados a todos los consumidores
+        register_job("outbox-prune", 3600, prune_outbox_job, leader_only=True)
+
+    # Caché en memoria de cada worker: corre en todos
+    from app.utils.price_stats import refresh_price_index
+    register_job("price-index", PRICE_STATS_REFRESH_SECONDS, refresh_price_index)
+
+    # leader_only: mantenimiento sobre la BD compartida, solo en el worker 0
+    from app.utils.sync import prune_tombstones_job
+    register_job("sync-tombstones", 3600, prune_tombstones_job, leader_only=True)
+
+    from app.utils.purge import purge_job
+    register_job("product-purge", PRODUCT_PURGE_INTERVAL, purge_job, leader_only=True)
+
+    from app.utils.inventory import sweep_job
+    register_job("reservation-sweeper", RESERVATION_SWEEP_INTERVAL, sweep_job, leader_only=True)
+
+    if SIMILARITY_JOB_ENABLED:
+        from app.utils.similarity import similarity_job
+        register_job("similar-products", SIMILARITY_REFRESH_INTERVAL, similarity_job, leader_only=True)
+
+    from app.utils.popularity import flush_job, decay_job
+    # run_on_stop: al apagar se vuelcan las vistas que queden en memoria
+    register_job("view-counter", VIEW_FLUSH_INTERVAL, flush_job, run_on_stop=True)
+    register_job("popularity-decay", POPULARITY_DECAY_INTERVAL, decay_job, leader_only=True)
+
+    from app.utils.idempotency import prune_job as prune_idempotency_job
+    register_job("idempotency-prune", 3600, prune_idempotency_job, leader_only=True)
+
+    replicas = get_replicas()
+    if replicas.engines:
+        register_job("replica-health", DATABASE_REPLICA_HEALTH_INTERVAL, replicas.check_health)
+
+    if LOG_ROUTES:
+        for route in app.routes:
+            print(f"{route.path} -> {route.name}")
+
+    start_jobs()
+    if WARMUP_ENABLED:
+        start_warmup(app)
+    else:
+        readiness.mark_ready()
+    try:
+        yield
+    finally:
+        # Primero dejar de recibir tráfico nuevo del balanceador
+        readiness.mark_not_ready()
+        stop_jobs()
+        if runtime.loop_monitor:
+            runtime.loop_monitor.stop()
@@ -1,17 +1,11 @@
 # app/main.py
+from importlib import import_module
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import lifespan
-from app.routers.product import router as products_router
-from app.routers.auth import router as auth_router
-from app.routers.brands import router as brands_router
-from app.routers.categories import router as categories_router
-from app.routers.size import router as sizes_router
-from app.routers.color import router as colors_router
-from app.routers.gender import router as gender_router
-from app.routers.material import router as material_router
-from app.routers.test_email import router as test_email_router
+from app.config import ENABLE_TEST_ROUTES, ENABLE_DEBUG_ROUTES
+from app.database import lifespan, replica_sticky_middleware
 
 app = FastAPI(lifespan=lifespan)
 
@@ -22,17 +16,23 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.middleware("http")(replica_sticky_middleware)
 
-# Lista de routers
+# Lista de routers (módulos que exponen `router`)
 routers = [
-    products_router, auth_router, brands_router, categories_router, 
-    sizes_router, colors_router, gender_router, material_router, test_email_router
+    "app.routers.product", "app.routers.auth", "app.routers.brands", "app.routers.categories",
+    "app.routers.size", "app.routers.color", "app.routers.gender", "app.routers.material",
+    "app.routers.sync", "app.routers.inventory", "app.routers.catalog",
+    "app.routers.seller", "app.routers.user", "app.routers.similarity",
+    "app.routers.address", "app.routers.health",
 ]
 
-# Incluir todos los routers
-for router in routers:
-    app.include_router(router)
+# Routers opcionales, solo si están habilitados por configuración
+if ENABLE_TEST_ROUTES:
+    routers.append("app.routers.test_email")
+if ENABLE_DEBUG_ROUTES:
+    routers.append("app.routers.debug")
 
-# Mostrar rutas en consola
-for route in app.routes:
-    print(f"{route.path} -> {route.name}")
+# Incluir todos los routers
+for module in routers:
+    app.include_router(import_module(module).router)
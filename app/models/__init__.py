@@ -1,13 +1,22 @@
+from .address import Address
 from .brand import Brand
 from .category import Category
 from .color import Color
 from .color_product import ColorProduct
 from .gender import Gender
 from .gender_product import GenderProduct
+from .idempotency import IdempotencyRecord
 from .material import Material
 from .material_product import MaterialProduct
+from .outbox import OutboxEvent, OutboxCheckpoint
 from .product import Product
+from .product_deletion import ProductDeletion
+from .product_neighbor import ProductNeighbor
 from .product_size import ProductSize
+from .product_stats import ProductStats
+from .product_summary import ProductSummary
+from .seller_stats import SellerCategoryStats
 from .size import Size
+from .stock import StockReservation, ProductStockShard
 from .user import User
 
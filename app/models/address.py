@@ -0,0 +1,33 @@
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlmodel import Field
+
+from app.models.base import BaseModel
+
+
+class Address(BaseModel, table=True):
+    """Dirección de un usuario (users.address_id) con coordenadas para búsquedas por cercanía"""
+    __tablename__ = 'addresses'
+    # Caja envolvente de app/utils/geo.py: rango por geohash y filtro por lat/lon
+    __table_args__ = (sa.Index("ix_addresses_latitude_longitude", "latitude", "longitude"),)
+
+    user_id: Optional[int] = Field(default=None, foreign_key="users.id", unique=True)
+    street: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    postal_code: Optional[str] = None
+    country: Optional[str] = None
+    latitude: float
+    longitude: float
+    # Se calcula al guardar (ver _set_geohash)
+    geohash: str = Field(default="", max_length=12, index=True)
+
+
+@event.listens_for(Address, "before_insert")
+@event.listens_for(Address, "before_update")
+def _set_geohash(mapper, connection, target):
+    from app.utils.geo import geohash_encode
+
+    target.geohash = geohash_encode(target.latitude, target.longitude, 12)
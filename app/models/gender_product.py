@@ -1,3 +1,4 @@
+import sqlalchemy as sa
 from sqlmodel import Field
 
 from app.models.base import BaseModel
@@ -5,7 +6,9 @@ from app.models.base import BaseModel
 
 class GenderProduct(BaseModel, table=True):
     __tablename__ = 'gender_product'
-    
+    # Filtro por géneros de /products/filter: product_id IN (SELECT ... WHERE gender_id IN ...)
+    __table_args__ = (sa.Index("ix_gender_product_gender_id_product_id", "gender_id", "product_id"),)
+
     # Foreign keys
     gender_id: int = Field(foreign_key="genders.id")
     product_id: int = Field(foreign_key="products.id")
\ No newline at end of file
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlmodel import Field
+
+from app.models.base import BaseModel
+
+
+class IdempotencyRecord(BaseModel, table=True):
+    """
+    Respuesta guardada de una petición con Idempotency-Key. El índice único
+    (scope, idempotency_key) es también el lock: solo un INSERT gana.
+    """
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (sa.UniqueConstraint("scope", "idempotency_key", name="uq_idempotency_keys_scope_key"),)
+
+    scope: str = Field(max_length=64)
+    idempotency_key: str = Field(max_length=255)
+    request_hash: str = Field(max_length=64)
+    status: str = Field(default="in_progress")  # in_progress | completed
+    response_status: Optional[int] = None
+    response_body: Optional[str] = Field(default=None, sa_type=sa.Text)
+    # in_progress: hasta cuándo vale el lock; completed: hasta cuándo se repite la respuesta
+    expires_at: datetime = Field(sa_type=sa.DateTime(timezone=True), index=True)
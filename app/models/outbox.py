@@ -0,0 +1,22 @@
+import sqlalchemy as sa
+from sqlmodel import Field
+
+from app.models.base import BaseModel
+
+
+class OutboxEvent(BaseModel, table=True):
+    """Evento de cambio escrito en la misma transacción que la mutación"""
+    __tablename__ = 'outbox_events'
+
+    aggregate_type: str = Field(index=True)
+    aggregate_id: int = Field(index=True)
+    event_type: str
+    payload: str = Field(default="{}", sa_type=sa.Text)
+
+
+class OutboxCheckpoint(BaseModel, table=True):
+    """Último evento entregado a cada consumidor del outbox"""
+    __tablename__ = 'outbox_checkpoints'
+
+    consumer: str = Field(unique=True, index=True)
+    last_event_id: int = Field(default=0)
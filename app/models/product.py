@@ -1,5 +1,10 @@
 
+import unicodedata
+from datetime import datetime
 from typing import Optional, List
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.orm import Session, with_loader_criteria
 from sqlmodel import Field, Relationship
 
 from app.models.base import BaseModel
@@ -13,6 +18,16 @@ from app.models.product_size import ProductSize
 
 class Product(BaseModel, table=True):
     __tablename__ = 'products'
+    __table_args__ = (
+        # Keyset de /sync/products: ORDER BY updated_at, id
+        sa.Index("ix_products_updated_at_id", "updated_at", "id"),
+        # Keyset de /users/me/products: WHERE user_id ORDER BY created_at, id
+        sa.Index("ix_products_user_id_created_at", "user_id", "created_at", "id"),
+        # Órdenes de app/utils/sorting.py (price,newest se declara abajo: lleva DESC)
+        sa.Index("ix_products_sort_name_id", "sort_name", "id"),
+        sa.Index("ix_products_price_id", "price", "id"),
+        sa.Index("ix_products_created_at_id", "created_at", "id"),
+    )
 
     name: str
     price: float
@@ -21,6 +36,12 @@ class Product(BaseModel, table=True):
     brand_id: int = Field(foreign_key="brands.id")
     category_id: int = Field(foreign_key="categories.id")
     description: Optional[str]
+    # Borrado lógico: la fila se elimina después, en lotes (app/utils/purge.py)
+    deleted_at: Optional[datetime] = Field(default=None, sa_type=sa.DateTime(timezone=True), index=True)
+    # > 0: el stock vive repartido en product_stock_shards y quantity es solo su suma (app/utils/inventory.py)
+    stock_shards: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    # Clave precalculada para ordenar por nombre sin mayúsculas ni acentos (ver name_sort_key)
+    sort_name: str = Field(default="", max_length=100, sa_column_kwargs={"server_default": ""})
 
     brand: Brand = Relationship(back_populates="products")
     category: Category = Relationship(back_populates="products")
@@ -29,3 +50,36 @@ class Product(BaseModel, table=True):
     genders: List["Gender"] = Relationship(back_populates="products", link_model=GenderProduct)
     materials: List["Material"] = Relationship(back_populates="products", link_model=MaterialProduct)
     sizes: List["Size"] = Relationship(back_populates="products", link_model=ProductSize)
+
+
+# Índice con partes descendentes: recorre price ASC, created_at DESC, id DESC sin ordenar
+sa.Index("ix_products_price_created_at_id", Product.price, Product.created_at.desc(), Product.id.desc())
+
+
+def name_sort_key(name: Optional[str]) -> str:
+    """Nombre en minúsculas, sin acentos ni espacios extra, recortado al largo de sort_name"""
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.lower().split())[:100]
+
+
+@event.listens_for(Product, "before_insert")
+@event.listens_for(Product, "before_update")
+def _set_sort_name(mapper, connection, target):
+    target.sort_name = name_sort_key(target.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _exclude_deleted_products(execute_state):
+    """
+    Ocultar productos borrados en toda consulta ORM (incluidas las cargas de
+    relaciones). Se desactiva con .execution_options(include_deleted=True).
+    """
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.execution_options.get("include_deleted", False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(Product, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+        )
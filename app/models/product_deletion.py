@@ -0,0 +1,10 @@
+from sqlmodel import Field
+
+from app.models.base import BaseModel
+
+
+class ProductDeletion(BaseModel, table=True):
+    """Tombstone de un producto borrado (created_at es el momento del borrado)"""
+    __tablename__ = 'product_deletions'
+
+    product_id: int = Field(index=True)
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlmodel import Field, SQLModel
+
+
+class ProductNeighbor(SQLModel, table=True):
+    """
+    Vecinos más parecidos de un producto (top-K por similitud de atributos).
+    La clave primaria (product_id, rank) deja la lista de cada producto
+    contigua y ordenada: /products/{id}/similar es una sola lectura por índice.
+    """
+    __tablename__ = 'product_neighbors'
+
+    product_id: int = Field(foreign_key="products.id", primary_key=True)
+    rank: int = Field(primary_key=True, sa_type=sa.SmallInteger)
+    neighbor_id: int = Field(foreign_key="products.id", index=True)
+    score: float = Field(sa_type=sa.Float)
+    computed_at: datetime = Field(sa_type=sa.DateTime(timezone=True))
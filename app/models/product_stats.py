@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlmodel import Field, SQLModel
+
+
+class ProductStats(SQLModel, table=True):
+    """
+    Vistas y popularidad de un producto, escritas en lotes por
+    app/utils/popularity.py (nunca en la ruta de lectura).
+    Sin foreign key: un lote de vistas no debe fallar porque la purga ya borró un producto.
+    """
+    __tablename__ = 'product_stats'
+    # Orden ?sort=popular: recorre el índice y une products por clave primaria
+    __table_args__ = (
+        sa.Index("ix_product_stats_popularity_product_id", "popularity", "product_id"),
+        sa.Index("ix_product_stats_decayed_at", "decayed_at"),
+    )
+
+    product_id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    views: int = Field(default=0, sa_type=sa.BigInteger, sa_column_kwargs={"server_default": "0"})
+    # Vistas con decaimiento exponencial (vida media POPULARITY_HALF_LIFE_HOURS)
+    popularity: float = Field(default=0, sa_type=sa.Float, sa_column_kwargs={"server_default": "0"})
+    last_viewed_at: Optional[datetime] = Field(default=None, sa_type=sa.DateTime(timezone=True))
+    decayed_at: Optional[datetime] = Field(
+        default=None, sa_type=sa.DateTime(timezone=True), sa_column_kwargs={"server_default": sa.func.now()}
+    )
@@ -0,0 +1,38 @@
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlmodel import Field
+
+from app.models.base import BaseModel
+
+
+class ProductSummary(BaseModel, table=True):
+    """Modelo de lectura desnormalizado: una fila por producto"""
+    __tablename__ = 'product_summary'
+    # Órdenes de /products/summaries (app/utils/sorting.py)
+    __table_args__ = (
+        sa.Index("ix_product_summary_sort_name_product_id", "sort_name", "product_id"),
+        sa.Index("ix_product_summary_price_product_id", "price", "product_id"),
+    )
+
+    product_id: int = Field(foreign_key="products.id", unique=True, index=True)
+    user_id: int = Field(index=True)
+    name: str
+    # Copia de products.sort_name: sort=name ordena igual que /products/filter
+    sort_name: str = Field(default="", max_length=100)
+    price: float = Field(index=True)
+    quantity: Optional[int] = None
+    description: Optional[str] = None
+
+    brand_id: int = Field(index=True)
+    brand_name: Optional[str] = None
+    category_id: int = Field(index=True)
+    category_name: Optional[str] = None
+    primary_image_url: Optional[str] = None
+
+    # Listas de IDs empaquetadas como ",1,4,7,", para devolverlas sin joins. Los
+    # filtros no usan estas columnas (LIKE no usa índices) sino las tablas de enlace
+    color_ids: str = Field(default=",")
+    gender_ids: str = Field(default=",")
+    material_ids: str = Field(default=",")
+    size_ids: str = Field(default=",")
@@ -0,0 +1,16 @@
+import sqlalchemy as sa
+from sqlmodel import Field
+
+from app.models.base import BaseModel
+
+
+class SellerCategoryStats(BaseModel, table=True):
+    """Rollup por vendedor y categoría, mantenido por las rutas de escritura de productos"""
+    __tablename__ = 'seller_category_stats'
+    __table_args__ = (sa.UniqueConstraint("user_id", "category_id", name="uq_seller_category_stats_user_category"),)
+
+    user_id: int = Field(foreign_key="users.id", index=True)
+    category_id: int = Field(foreign_key="categories.id")
+    product_count: int = Field(default=0)
+    total_quantity: int = Field(default=0)
+    total_value: float = Field(default=0)
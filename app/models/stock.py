@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlmodel import Field
+
+from app.models.base import BaseModel
+
+
+class StockReservation(BaseModel, table=True):
+    """Unidades apartadas de un producto hasta expires_at (o hasta confirmarse/liberarse)"""
+    __tablename__ = 'stock_reservations'
+    # El sweeper busca reservas activas vencidas y consolida las tocadas recientemente
+    __table_args__ = (
+        sa.Index("ix_stock_reservations_status_expires_at", "status", "expires_at"),
+        sa.Index("ix_stock_reservations_updated_at", "updated_at"),
+    )
+
+    product_id: int = Field(foreign_key="products.id", index=True)
+    quantity: int
+    status: str = Field(default="active")  # active | confirmed | released
+    expires_at: datetime = Field(sa_type=sa.DateTime(timezone=True))
+    user_id: Optional[int] = Field(default=None, foreign_key="users.id")
+
+
+class ProductStockShard(BaseModel, table=True):
+    """
+    Fracción del stock de un producto muy demandado. Las reservas restan de una
+    fracción al azar, así las escrituras concurrentes no compiten por una sola fila.
+    """
+    __tablename__ = 'product_stock_shards'
+    __table_args__ = (sa.UniqueConstraint("product_id", "shard", name="uq_product_stock_shards_product_shard"),)
+
+    product_id: int = Field(foreign_key="products.id", index=True)
+    shard: int
+    quantity: int = Field(default=0)
@@ -1,5 +1,6 @@
 from typing import Optional, List
 from datetime import datetime, timezone
+import sqlalchemy as sa
 from sqlmodel import Field, Relationship
 
 from .base import BaseModel
@@ -7,6 +8,12 @@ from .base import BaseModel
 
 class User(BaseModel, table=True):
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset del listado de administración: ORDER BY created_at, id
+        sa.Index("ix_users_created_at_id", "created_at", "id"),
+        # Filtro ?verified= y conteo de verificados
+        sa.Index("ix_users_email_verified_at", "email_verified_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
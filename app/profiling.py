@@ -0,0 +1,81 @@
+# app/profiling.py
+"""
+Perfil de arranque en frío: tiempo de import por módulo y tiempo total
+hasta tener `app.main` importado, medido en procesos nuevos.
+
+    python -m app.profiling [--runs 5] [--top 25] [--target app.main]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+
+def _import_times(target: str) -> Tuple[Dict[str, Tuple[int, int]], float]:
+    """Importar `target` en un proceso nuevo con -X importtime"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        times[module.strip()] = (int(self_us), int(cumulative_us))
+    return times, wall
+
+
+def profile(target: str = "app.main", runs: int = 5) -> Tuple[List[Tuple[str, float, float]], List[float]]:
+    """Promediar `runs` arranques; devuelve (módulo, self ms, acumulado ms) y los tiempos totales"""
+    self_ms = defaultdict(list)
+    cumulative_ms = defaultdict(list)
+    walls = []
+    for _ in range(runs):
+        times, wall = _import_times(target)
+        walls.append(wall)
+        for module, (self_us, cumulative_us) in times.items():
+            self_ms[module].append(self_us / 1000)
+            cumulative_ms[module].append(cumulative_us / 1000)
+
+    rows = [
+        (module, statistics.mean(self_ms[module]), statistics.mean(cumulative_ms[module]))
+        for module in cumulative_ms
+    ]
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows, walls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de imports en el arranque")
+    parser.add_argument("--target", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--only-app", action="store_true", help="mostrar solo módulos de app.*")
+    args = parser.parse_args()
+
+    rows, walls = profile(args.target, args.runs)
+    if args.only_app:
+        rows = [row for row in rows if row[0].startswith("app")]
+
+    print(f"{'módulo':<50} {'self ms':>9} {'acum. ms':>9}")
+    for module, self_ms, cumulative_ms in rows[:args.top]:
+        print(f"{module:<50} {self_ms:9.1f} {cumulative_ms:9.1f}")
+
+    print()
+    print(f"Arranque en frío ({args.runs} procesos, incluye el intérprete): "
+          f"mediana {statistics.median(walls) * 1000:.0f} ms, "
+          f"mín {min(walls) * 1000:.0f} ms, máx {max(walls) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
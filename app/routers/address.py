@@ -0,0 +1,47 @@
+# app/routers/address.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel import Session, select
+
+from app.models import Address, User
+from app.schemas.address import AddressIn, AddressRead
+from app.session import get_session, get_read_session
+from app.utils.user import get_current_user
+
+router = APIRouter(prefix="/users/me/address", tags=["addresses"])
+
+
+@router.get("", response_model=AddressRead, summary="Address of the current user")
+def get_my_address(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_read_session)
+):
+    address = session.exec(select(Address).where(Address.user_id == current_user.id)).first()
+    if not address:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Address not found")
+    return address
+
+
+@router.put("", response_model=AddressRead, summary="Create or replace the address of the current user")
+def put_my_address(
+    data: AddressIn,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Guarda la dirección y sus coordenadas (con las que /products/filter?near=
+    encuentra a los vendedores cercanos) y la enlaza en users.address_id.
+    """
+    address = session.exec(select(Address).where(Address.user_id == current_user.id)).first()
+    if address is None:
+        address = Address(user_id=current_user.id, **data.model_dump())
+    else:
+        address.sqlmodel_update(data.model_dump())
+    session.add(address)
+    session.flush()
+
+    user = session.get(User, current_user.id)
+    user.address_id = address.id
+    session.add(user)
+    session.commit()
+    session.refresh(address)
+    return address
@@ -1,8 +1,12 @@
 # app/api/routers/auth.py
 import os
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query, status, BackgroundTasks
-from sqlmodel import select
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status, BackgroundTasks
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select, update
 from sqlalchemy.orm import Session
 import bcrypt
 
@@ -10,26 +14,22 @@ from app.session import get_session
 from app.models.user import User
 from app.schemas.auth import RegisterRequest, LoginRequest, TokenResponse
 from app.utils.email import send_verification_email
+from app.utils.idempotency import run_idempotent_async
+from app.utils.rate_limit import enforce_rate_limit, enforce_rate_limit_async, limit_auth_concurrency
 from app.utils.tokens import create_access_token
 from app.utils.verifier import make_verify_token, verify_token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/register", status_code=status.HTTP_201_CREATED)
-async def register(
-        data: RegisterRequest,
-        background_tasks: BackgroundTasks,
-        session: Session = Depends(get_session)
-):
-    # 1) Validar email único
-    if session.exec(select(User).where(User.email == data.email)).first():
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Email already registered")
-
-    # 2) Hash de contraseña
+def _create_user(session: Session, data: RegisterRequest) -> Tuple[int, str]:
+    """
+    Insertar el usuario en un solo statement: el índice único de email decide
+    si ya existe, sin SELECT previo (y sin carrera entre registros paralelos).
+    """
     pw_hash = bcrypt.hashpw(data.password.encode(), bcrypt.gensalt()).decode()
 
-    # 3) Crear usuario (email_verified_at vendrá como NULL)
+    # email_verified_at queda en NULL
     user = User(
         name=data.name,
         last_name=data.last_name,
@@ -39,23 +39,58 @@ async def register(
         address_id=1,  # Ajusta si necesitas otro default
     )
     session.add(user)
+    try:
+        session.flush()
+    except IntegrityError as e:
+        session.rollback()
+        if "email" in str(e.orig).lower():
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "Email already registered")
+        raise
+    # Leer antes del commit: después los atributos expiran y costarían otro SELECT
+    user_id, email = user.id, user.email
     session.commit()
-    session.refresh(user)
+    return user_id, email
 
-    token = make_verify_token(user.id)
-    base = os.getenv("API_URL", "http://localhost:8000")
-    verify_url = f"{base}/auth/verify-email?token={token}"
-    resend_url = f"{base}/auth/resend-verification?token={token}"
 
-    # ✅ Enviar el correo en segundo plano
-    background_tasks.add_task(
-        send_verification_email,
-        email=user.email,
-        verify_url=verify_url,
-        resend_url=resend_url
-    )
+@router.post(
+    "/register",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_auth_concurrency)]
+)
+async def register(
+        data: RegisterRequest,
+        request: Request,
+        background_tasks: BackgroundTasks,
+        session: Session = Depends(get_session),
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
+):
+    await enforce_rate_limit_async(request, "register", data.email)
+
+    async def _register():
+        # Consulta, bcrypt y commit son bloqueantes: fuera del event loop
+        user_id, email = await run_in_threadpool(_create_user, session, data)
+
+        token = make_verify_token(user_id)
+        base = os.getenv("API_URL", "http://localhost:8000")
+        verify_url = f"{base}/auth/verify-email?token={token}"
+        resend_url = f"{base}/auth/resend-verification?token={token}"
+
+        # ✅ Enviar el correo en segundo plano (un reintento repetido no lo reenvía)
+        background_tasks.add_task(
+            send_verification_email,
+            email=email,
+            verify_url=verify_url,
+            resend_url=resend_url
+        )
 
-    return {"msg": "Revisa tu correo para verificar tu cuenta"}
+        return {"msg": "Revisa tu correo para verificar tu cuenta"}
+
+    if not idempotency_key:
+        return await _register()
+    # Un reintento tras un registro exitoso recibe el mismo 201, no "Email already registered"
+    return await run_idempotent_async(
+        "auth.register", idempotency_key, data, _register, status_code=status.HTTP_201_CREATED
+    )
 
 
 @router.get("/verify-email", status_code=status.HTTP_200_OK)
@@ -68,20 +103,30 @@ def verify_email(
     except Exception:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Token inválido o expirado")
 
-    user = session.get(User, user_id)
-    if not user:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, "Usuario no encontrado")
-
-    # Marcar email verificado
-    user.email_verified_at = datetime.utcnow()
-    session.add(user)
+    # Un solo UPDATE condicional: repetir el enlace no vuelve a escribir la fila
+    result = session.exec(
+        update(User)
+        .where(User.id == user_id, User.email_verified_at.is_(None))
+        .values(email_verified_at=datetime.utcnow())
+    )
     session.commit()
 
+    if result.rowcount == 0:
+        # Solo en el caso raro: distinguir "ya verificado" de "no existe"
+        if session.exec(select(User.id).where(User.id == user_id)).first() is None:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "Usuario no encontrado")
+        return {"ok": True, "message": "El correo ya estaba verificado"}
+
     return {"ok": True, "message": "Correo verificado correctamente!"}
 
 
-@router.get("/resend-verification", status_code=status.HTTP_200_OK)
+@router.get(
+    "/resend-verification",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_auth_concurrency)]
+)
 async def resend_verification(
+        request: Request,
         token: str = Query(...),
         session: Session = Depends(get_session)
 ):
@@ -91,7 +136,9 @@ async def resend_verification(
     except Exception:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Token inválido o expirado")
 
-    user = session.get(User, user_id)
+    await enforce_rate_limit_async(request, "resend-verification", str(user_id))
+
+    user = await run_in_threadpool(session.get, User, user_id)
     if not user:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Usuario no encontrado")
 
@@ -110,11 +157,18 @@ async def resend_verification(
     return {"msg": "Se ha enviado un nuevo enlace de verificación"}
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[Depends(limit_auth_concurrency)]
+)
 def login(
         data: LoginRequest,
+        request: Request,
         session: Session = Depends(get_session)
 ):
+    enforce_rate_limit(request, "login", data.email)
+
     # 1) Buscar usuario
     user = session.exec(select(User).where(User.email == data.email)).one_or_none()
     if not user or not bcrypt.checkpw(data.password.encode(), user.password.encode()):
@@ -0,0 +1,37 @@
+# app/routers/catalog.py
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Response, status
+from sqlmodel import Session
+
+from app.database import get_read_session
+from app.schemas.catalog import CatalogBootstrap
+from app.utils.catalog import catalog_cache, encode_for, matches_etag
+
+router = APIRouter(prefix="/catalog", tags=["catalog"])
+
+
+@router.get("/bootstrap", response_model=CatalogBootstrap, summary="All catalog dimensions in one response")
+def get_catalog_bootstrap(
+    session: Session = Depends(get_read_session),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+):
+    """
+    Marcas, categorías, tallas, colores, géneros y materiales en una sola
+    petición. El cuerpo está precalculado (y comprimido); con If-None-Match
+    responde 304 si no cambió.
+    """
+    blob = catalog_cache.get(session)
+    headers = {
+        "ETag": blob.etag,
+        "Cache-Control": "public, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if matches_etag(if_none_match, blob.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    body, encoding = encode_for(accept_encoding, blob)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,21 @@
+# app/routers/debug.py
+from fastapi import APIRouter, Request
+
+from app.utils import runtime, statement_cache
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get("/runtime", summary="Threadpool, routes and event loop blocking report")
+async def get_runtime_report(request: Request):
+    """
+    Qué rutas corren en el threadpool y cuáles en el event loop,
+    cuán saturado está el threadpool, los últimos bloqueos del loop detectados
+    y los aciertos de la caché de sentencias compiladas de cada engine.
+    """
+    return {
+        "threadpool": runtime.threadpool_stats(),
+        "routes": runtime.route_report(request.app),
+        "loop_blocking": runtime.loop_monitor.recent() if runtime.loop_monitor else None,
+        "statement_cache": statement_cache.report(),
+    }
@@ -0,0 +1,33 @@
+# app/routers/health.py
+from fastapi import APIRouter, Response, status
+from sqlalchemy import text
+
+from app.database import get_engine
+from app.utils.warmup import readiness
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live", summary="Liveness probe")
+async def live():
+    """El proceso responde. En el event loop, sin tocar la BD ni el threadpool."""
+    return {"status": "alive"}
+
+
+@router.get("/ready", summary="Readiness probe")
+def ready(response: Response):
+    """
+    503 mientras el worker se calienta (app/utils/warmup.py), al apagarse o
+    si la BD no responde; 200 cuando puede recibir tráfico.
+    """
+    report = readiness.report()
+    if not readiness.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return report
+    try:
+        with get_engine().connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {**report, "status": "database_unavailable", "error": str(e)}
+    return report
@@ -0,0 +1,109 @@
+# app/routers/inventory.py
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel import Session
+
+from app.config import RESERVATION_TTL_SECONDS
+from app.models import StockReservation
+from app.schemas.inventory import ReserveRequest, BatchReserveRequest, ReservationRead
+from app.session import get_session
+from app.utils.inventory import ReservationError, reserve, reserve_many, release, confirm
+
+router = APIRouter(tags=["inventory"])
+
+
+def _reservation_error(e: ReservationError) -> HTTPException:
+    if e.not_found:
+        return HTTPException(status.HTTP_404_NOT_FOUND, f"Product {e.product_id} not found")
+    return HTTPException(status.HTTP_409_CONFLICT, f"Insufficient stock for product {e.product_id}")
+
+
+@router.post(
+    "/products/{product_id}/reserve",
+    response_model=ReservationRead,
+    status_code=status.HTTP_201_CREATED,
+    summary="Reserve stock of a product"
+)
+def reserve_product(
+    product_id: int,
+    data: ReserveRequest,
+    session: Session = Depends(get_session)
+):
+    """Aparta `quantity` unidades hasta que se confirme, se libere o venza el TTL"""
+    try:
+        reservation = reserve(session, product_id, data.quantity,
+                              data.ttl_seconds or RESERVATION_TTL_SECONDS, data.user_id)
+    except ReservationError as e:
+        session.rollback()
+        raise _reservation_error(e)
+    # Serializar antes del commit: después los atributos expiran y costarían otro SELECT
+    result = ReservationRead.model_validate(reservation)
+    session.commit()
+    return result
+
+
+@router.post(
+    "/products/reserve",
+    response_model=List[ReservationRead],
+    status_code=status.HTTP_201_CREATED,
+    summary="Reserve stock of several products (all or nothing)"
+)
+def reserve_products(
+    data: BatchReserveRequest,
+    session: Session = Depends(get_session)
+):
+    try:
+        reservations = reserve_many(
+            session,
+            [(item.product_id, item.quantity) for item in data.items],
+            data.ttl_seconds or RESERVATION_TTL_SECONDS,
+            data.user_id,
+        )
+    except ReservationError as e:
+        session.rollback()
+        raise _reservation_error(e)
+    result = [ReservationRead.model_validate(r) for r in reservations]
+    session.commit()
+    return result
+
+
+@router.get("/reservations/{reservation_id}", response_model=ReservationRead, summary="Get reservation")
+def get_reservation(
+    reservation_id: int,
+    session: Session = Depends(get_session)
+):
+    reservation = session.get(StockReservation, reservation_id)
+    if not reservation:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Reservation not found")
+    return reservation
+
+
+def _finish_reservation(session: Session, reservation_id: int, action) -> ReservationRead:
+    reservation = action(session, reservation_id)
+    if not reservation:
+        session.rollback()
+        if not session.get(StockReservation, reservation_id):
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "Reservation not found")
+        raise HTTPException(status.HTTP_409_CONFLICT, "Reservation is no longer active")
+    result = ReservationRead.model_validate(reservation)
+    session.commit()
+    return result
+
+
+@router.post("/reservations/{reservation_id}/release", response_model=ReservationRead, summary="Release reservation")
+def release_reservation(
+    reservation_id: int,
+    session: Session = Depends(get_session)
+):
+    """Devuelve el stock apartado"""
+    return _finish_reservation(session, reservation_id, release)
+
+
+@router.post("/reservations/{reservation_id}/confirm", response_model=ReservationRead, summary="Confirm reservation")
+def confirm_reservation(
+    reservation_id: int,
+    session: Session = Depends(get_session)
+):
+    """Convierte la reserva en venta: el stock ya descontado no se devuelve"""
+    return _finish_reservation(session, reservation_id, confirm)
@@ -1,105 +1,241 @@
+from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, HTTPException, status
-from sqlmodel import Session, select, or_
-
-from app.models import Product
-from app.models.color_product import ColorProduct
-from app.models.gender_product import GenderProduct
-from app.models.material_product import MaterialProduct
-from app.models.product_size import ProductSize
+from fastapi import APIRouter, Depends, Header, Query, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, select, update, func
+
+from app.models import Product, ProductDeletion, ProductStats
 from app.models.brand import Brand
 from app.models.category import Category
 from app.models.color import Color
 from app.models.gender import Gender
 from app.models.material import Material
 from app.models.size import Size
+from app.models.product_summary import ProductSummary
 from app.schemas.product import (
-    ProductRead, ProductCreate, ProductUpdate, ProductFilter
+    ProductRead, ProductCreate, ProductUpdate, ProductFilter, ProductSummaryRead, PriceStats,
+    ProductReadList, ProductSummaryReadList
 )
-from app.session import get_session
+from app.config import GEO_DEFAULT_RADIUS_KM, GEO_MAX_RADIUS_KM
+from app.database import read_session_scope
+from app.session import get_session, get_read_session
+from app.utils.export import iter_product_batches, ndjson_chunks, csv_chunks
+from app.utils.inventory import set_stock
+from app.utils.seller_stats import apply_product_change, product_state
+from app.utils.outbox import record_event
+from app.utils.price_stats import price_index
+from app.utils.responses import adapter_response
+from app.utils.geo import parse_near, sellers_near_query
+from app.utils.idempotency import run_idempotent
+from app.utils.link_writer import create_links, replace_links
+from app.utils.popularity import view_counter
+from app.utils.product_filters import product_filters, summary_filters
+from app.utils.sorting import PRODUCT_SORT_COLUMNS, PRODUCT_SORT_JOINS, apply_sort, resolve_sort, sort_description
+from app.utils.product_summary import refresh_product_summary, delete_product_summary
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+# Campos de ProductCreate/ProductUpdate que no son columnas de products
+_RELATION_FIELDS = frozenset({"color_ids", "gender_ids", "material_ids", "size_ids"})
+
+# Claves del registro de órdenes en product_summary
+_SUMMARY_SORT_COLUMNS = {
+    "id": ProductSummary.product_id,
+    "name": ProductSummary.sort_name,
+    "price": ProductSummary.price,
+}
+
+_SORT_DESCRIPTION = sort_description(PRODUCT_SORT_COLUMNS, PRODUCT_SORT_JOINS)
+_SUMMARY_SORT_DESCRIPTION = sort_description(_SUMMARY_SORT_COLUMNS)
+
+
+def _sorted(query, sort: Optional[str], order_by: Optional[int], columns, joins=None):
+    try:
+        return apply_sort(query, resolve_sort(sort, order_by), columns, joins)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+_NEAR_DESCRIPTION = "Solo vendedores cerca de 'lat,lon' (dirección en /users/me/address)"
+
+
+def _near_filter(query, user_id_column, near: Optional[str], radius: float):
+    """Restringir a productos de vendedores dentro del radio (km), con una subconsulta sobre addresses"""
+    if not near:
+        return query
+    try:
+        lat, lon = parse_near(near)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return query.where(user_id_column.in_(sellers_near_query(lat, lon, radius)))
+
 @router.get("/filter", response_model=List[ProductRead], summary="Filter products")
 def filter_products(
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     categories: Optional[List[int]] = Query(None),
     genders: Optional[List[int]] = Query(None),
     min_price: Optional[float] = Query(None),
     max_price: Optional[float] = Query(None),
-    order_by: Optional[int] = Query(0)
+    order_by: Optional[int] = Query(0, description="Obsoleto: usar sort"),
+    sort: Optional[str] = Query(None, description=_SORT_DESCRIPTION),
+    near: Optional[str] = Query(None, description=_NEAR_DESCRIPTION),
+    radius: float = Query(GEO_DEFAULT_RADIUS_KM, gt=0, le=GEO_MAX_RADIUS_KM, description="Radio en km")
 ):
-    query = select(Product)
-    if categories:
-        query = query.where(Product.category_id.in_(categories))
-    if genders:
-        query = query.join(Product.genders).where(
-            or_(*[Product.genders.any(id=g) for g in genders])
-        )
-    if min_price is not None and max_price is not None:
-        query = query.where(Product.price.between(min_price, max_price))
-    if order_by == 1:
-        query = query.order_by(Product.name)
-    elif order_by == 2:
-        query = query.order_by(Product.price)
-    elif order_by == 3:
-        query = query.order_by(Product.price.desc())
-    else:
-        query = query.order_by(Product.id)
-    return session.exec(query).all()
+    query = _near_filter(select(Product), Product.user_id, near, radius)
+    query = product_filters(query, categories, genders, min_price, max_price)
+    query = _sorted(query, sort, order_by, PRODUCT_SORT_COLUMNS, PRODUCT_SORT_JOINS)
+    return adapter_response(ProductReadList, session.exec(query).all())
+
+# SUMMARIES
+@router.get("/summaries", response_model=List[ProductSummaryRead], summary="List product summaries")
+def list_product_summaries(
+    session: Session = Depends(get_read_session),
+    categories: Optional[List[int]] = Query(None),
+    genders: Optional[List[int]] = Query(None),
+    min_price: Optional[float] = Query(None),
+    max_price: Optional[float] = Query(None),
+    order_by: Optional[int] = Query(0, description="Obsoleto: usar sort"),
+    sort: Optional[str] = Query(None, description=_SUMMARY_SORT_DESCRIPTION),
+    near: Optional[str] = Query(None, description=_NEAR_DESCRIPTION),
+    radius: float = Query(GEO_DEFAULT_RADIUS_KM, gt=0, le=GEO_MAX_RADIUS_KM, description="Radio en km")
+):
+    """
+    Mismos filtros que /products/filter, pero leídos de la tabla
+    desnormalizada product_summary (una sola tabla, sin joins).
+    """
+    query = _near_filter(select(ProductSummary), ProductSummary.user_id, near, radius)
+    query = summary_filters(query, categories, genders, min_price, max_price)
+    query = _sorted(query, sort, order_by, _SUMMARY_SORT_COLUMNS)
+    return adapter_response(ProductSummaryReadList, session.exec(query).all())
+
+# PRICE STATS
+@router.get("/price-stats", response_model=PriceStats, summary="Price range and histogram")
+def get_price_stats(
+    session: Session = Depends(get_read_session),
+    categories: Optional[List[int]] = Query(None),
+    genders: Optional[List[int]] = Query(None),
+    buckets: int = Query(10, ge=1, le=100)
+):
+    """
+    Mínimo, máximo, promedio e histograma de precios para construir el slider.
+    Se sirve desde el índice en memoria, no recorre la tabla products.
+    """
+    price_index.ensure_loaded(session)
+    return price_index.stats(categories, genders, buckets)
+
+# EXPORT
+@router.get("/export", summary="Stream the whole catalog as NDJSON or CSV")
+def export_products(
+    request: Request,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    updated_since: Optional[datetime] = Query(None, description="Solo productos actualizados desde esta fecha")
+):
+    """
+    Catálogo completo en streaming, por lotes y con memoria constante.
+    Con `updated_since` se exporta solo lo que cambió (exportación incremental).
+    """
+    def generate():
+        # La sesión se abre dentro del generador: las dependencias con yield
+        # se cierran antes de que empiece a enviarse la respuesta
+        with read_session_scope(request) as session:
+            batches = iter_product_batches(session, updated_since)
+            yield from (csv_chunks if export_format == "csv" else ndjson_chunks)(batches)
+
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="products.{export_format}"'},
+    )
 
 # LIST
 @router.get("/", response_model=List[ProductRead], summary="List products")
 def list_products(
-    session: Session = Depends(get_session),
-    category: Optional[int] = Query(None)
+    session: Session = Depends(get_read_session),
+    category: Optional[int] = Query(None),
+    near: Optional[str] = Query(None, description=_NEAR_DESCRIPTION),
+    radius: float = Query(GEO_DEFAULT_RADIUS_KM, gt=0, le=GEO_MAX_RADIUS_KM, description="Radio en km")
 ):
-    query = select(Product)
+    query = _near_filter(select(Product), Product.user_id, near, radius)
     if category:
         query = query.where(Product.category_id == category)
-    return session.exec(query).all()
+    return adapter_response(ProductReadList, session.exec(query).all())
 
 # GET
 @router.get("/{product_id}", response_model=ProductRead, summary="Get product by ID")
 def get_product(
     product_id: int,
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
     product = session.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    # Solo en memoria: se vuelca a product_stats por lotes (app/utils/popularity.py)
+    view_counter.record(product_id)
     return product
 
 # CREATE
 @router.post("/", response_model=ProductRead, status_code=status.HTTP_201_CREATED, summary="Create product")
 def create_product(
     product_in: ProductCreate,
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
 ):
     """
     Crear un producto con relaciones many-to-many.
-    Implementa transacciones, validaciones y manejo de errores.
+    Con Idempotency-Key, los reintentos del cliente reciben la respuesta
+    guardada del primer intento en vez de crear otro producto.
+    """
+    if not idempotency_key:
+        return _create_product(session, product_in)
+    return run_idempotent(
+        "products.create", idempotency_key, product_in,
+        lambda: _create_product(session, product_in),
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+def _reindex_price(session: Session, product_id: int):
+    """
+    Después del commit: la escritura ya está confirmada, así que un fallo aquí
+    solo se registra (el índice se pone al día con el outbox) y no devuelve 500.
     """
+    try:
+        price_index.refresh_product(session, product_id)
+    except Exception as e:
+        print(f"Error actualizando el índice de precios del producto {product_id}: {str(e)}")
+
+
+def _create_product(session: Session, product_in: ProductCreate) -> ProductRead:
+    """Implementa transacciones, validaciones y manejo de errores."""
     try:
         # 1. Validar que las entidades relacionadas existan
         _validate_related_entities(session, product_in)
         
         # 2. Crear el producto base (sin las relaciones many-to-many)
-        product_data = product_in.dict(exclude={'color_ids', 'gender_ids', 'material_ids', 'size_ids'})
+        product_data = product_in.model_dump(exclude=_RELATION_FIELDS)
         product = Product(**product_data)
         
         session.add(product)
         session.flush()  # Obtener el ID sin hacer commit
+        session.add(ProductStats(product_id=product.id))
         
-        # 3. Crear las relaciones many-to-many
-        _create_product_relations(session, product.id, product_in)
-        
-        # 4. Commit único al final
-        session.commit()
+        # 3. Crear las relaciones many-to-many (un INSERT por tabla de enlace)
+        create_links(session, product.id, product_in)
+        session.flush()
+
+        # 4. Actualizar los modelos de lectura y publicar el cambio en el outbox
+        refresh_product_summary(session, product.id)
+        apply_product_change(session, None, product_state(product))
+        record_event(session, "product", product.id, "product.created", _product_snapshot(product))
+
+        # 5. Respuesta armada antes del commit único: tras el commit nada
+        # puede convertir en 500 una escritura ya confirmada
+        product_id = product.id
         session.refresh(product)
-        
-        return product
-        
+        response = ProductRead.model_validate(product)
+        session.commit()
+
     except HTTPException:
         session.rollback()
         raise
@@ -110,6 +246,22 @@ def create_product(
             detail=f"Error creating product: {str(e)}"
         )
 
+    _reindex_price(session, product_id)
+    return response
+
+
+def _product_snapshot(product: Product) -> dict:
+    """Campos escalares del producto que viajan en los eventos del outbox"""
+    return {
+        "id": product.id,
+        "name": product.name,
+        "price": product.price,
+        "quantity": product.quantity,
+        "user_id": product.user_id,
+        "brand_id": product.brand_id,
+        "category_id": product.category_id,
+    }
+
 
 def _validate_related_entities(session: Session, product_in: ProductCreate):
     """Validar que todas las entidades relacionadas existan"""
@@ -157,42 +309,6 @@ def _validate_related_entities(session: Session, product_in: ProductCreate):
             raise HTTPException(status_code=404, detail=f"Sizes not found: {missing_ids}")
 
 
-def _create_product_relations(session: Session, product_id: int, product_in: ProductCreate):
-    """Crear todas las relaciones many-to-many de forma eficiente"""
-    
-    # Crear relaciones de colores
-    if product_in.color_ids:
-        color_products = [
-            ColorProduct(product_id=product_id, color_id=color_id)
-            for color_id in product_in.color_ids
-        ]
-        session.add_all(color_products)
-    
-    # Crear relaciones de géneros
-    if product_in.gender_ids:
-        gender_products = [
-            GenderProduct(product_id=product_id, gender_id=gender_id)
-            for gender_id in product_in.gender_ids
-        ]
-        session.add_all(gender_products)
-    
-    # Crear relaciones de materiales
-    if product_in.material_ids:
-        material_products = [
-            MaterialProduct(product_id=product_id, material_id=material_id)
-            for material_id in product_in.material_ids
-        ]
-        session.add_all(material_products)
-    
-    # Crear relaciones de tallas
-    if product_in.size_ids:
-        product_sizes = [
-            ProductSize(product_id=product_id, size_id=size_id)
-            for size_id in product_in.size_ids
-        ]
-        session.add_all(product_sizes)
-
-
 def _validate_update_related_entities(session: Session, product_in: ProductUpdate):
     """Validar que todas las entidades relacionadas existan para updates"""
     
@@ -241,56 +357,6 @@ def _validate_update_related_entities(session: Session, product_in: ProductUpdat
             raise HTTPException(status_code=404, detail=f"Sizes not found: {missing_ids}")
 
 
-def _update_product_relations(session: Session, product_id: int, product_in: ProductUpdate):
-    """Actualizar relaciones many-to-many reemplazando completamente las existentes"""
-    
-    # Actualizar colores si se proporcionaron
-    if product_in.color_ids is not None:
-        # Eliminar relaciones existentes
-        session.exec(
-            select(ColorProduct).where(ColorProduct.product_id == product_id)
-        ).all()
-        session.query(ColorProduct).filter(ColorProduct.product_id == product_id).delete()
-        
-        # Crear nuevas relaciones
-        if product_in.color_ids:  # Solo si no está vacío
-            color_products = [
-                ColorProduct(product_id=product_id, color_id=color_id)
-                for color_id in product_in.color_ids
-            ]
-            session.add_all(color_products)
-    
-    # Actualizar géneros si se proporcionaron
-    if product_in.gender_ids is not None:
-        session.query(GenderProduct).filter(GenderProduct.product_id == product_id).delete()
-        if product_in.gender_ids:
-            gender_products = [
-                GenderProduct(product_id=product_id, gender_id=gender_id)
-                for gender_id in product_in.gender_ids
-            ]
-            session.add_all(gender_products)
-    
-    # Actualizar materiales si se proporcionaron
-    if product_in.material_ids is not None:
-        session.query(MaterialProduct).filter(MaterialProduct.product_id == product_id).delete()
-        if product_in.material_ids:
-            material_products = [
-                MaterialProduct(product_id=product_id, material_id=material_id)
-                for material_id in product_in.material_ids
-            ]
-            session.add_all(material_products)
-    
-    # Actualizar tallas si se proporcionaron
-    if product_in.size_ids is not None:
-        session.query(ProductSize).filter(ProductSize.product_id == product_id).delete()
-        if product_in.size_ids:
-            product_sizes = [
-                ProductSize(product_id=product_id, size_id=size_id)
-                for size_id in product_in.size_ids
-            ]
-            session.add_all(product_sizes)
-
-
 # UPDATE
 @router.patch("/{product_id}", response_model=ProductRead, summary="Update product")
 def update_product(
@@ -308,27 +374,36 @@ def update_product(
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
         
+        before = product_state(product)
+
         # 2. Validar entidades relacionadas si se están actualizando
         _validate_update_related_entities(session, product_in)
         
         # 3. Actualizar campos básicos del producto
-        product_data = product_in.dict(
-            exclude_unset=True,
-            exclude={'color_ids', 'gender_ids', 'material_ids', 'size_ids'}
-        )
+        product_data = product_in.model_dump(exclude_unset=True, exclude=_RELATION_FIELDS)
         for key, value in product_data.items():
             setattr(product, key, value)
+        if "quantity" in product_data and product.stock_shards:
+            # Stock fraccionado: products.quantity es solo la suma, el valor real vive en las fracciones
+            set_stock(session, product_id, product_data["quantity"] or 0)
         
         # 4. Actualizar relaciones many-to-many si se proporcionaron
-        _update_product_relations(session, product_id, product_in)
-        
-        # 5. Commit único al final
+        replace_links(session, product_id, product_in)
+        # Cambiar solo relaciones no emite UPDATE de products: marcarlo para /sync
+        product.updated_at = func.now()
         session.add(product)
-        session.commit()
+        session.flush()
+
+        # 5. Actualizar los modelos de lectura y publicar el cambio en el outbox
+        refresh_product_summary(session, product_id)
+        apply_product_change(session, before, product_state(product))
+        record_event(session, "product", product_id, "product.updated", _product_snapshot(product))
+
+        # 6. Respuesta armada antes del commit único (ver _create_product)
         session.refresh(product)
-        
-        return product
-        
+        response = ProductRead.model_validate(product)
+        session.commit()
+
     except HTTPException:
         session.rollback()
         raise
@@ -339,17 +414,40 @@ def update_product(
             detail=f"Error updating product: {str(e)}"
         )
 
+    _reindex_price(session, product_id)
+    return response
+
 # DELETE
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete product")
 def delete_product(
     product_id: int,
     session: Session = Depends(get_session)
 ):
+    """
+    Borrado lógico: marca deleted_at y deja el producto fuera de todas las
+    consultas. Imágenes y relaciones se eliminan después, en lotes (app/utils/purge.py).
+    """
     product = session.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    session.delete(product)
+    snapshot = _product_snapshot(product)
+
+    # UPDATE condicional: dos borrados simultáneos no generan dos tombstones
+    result = session.exec(
+        update(Product)
+        .where(Product.id == product_id, Product.deleted_at.is_(None))
+        .values(deleted_at=func.now(), updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    delete_product_summary(session, product_id)
+    apply_product_change(session, product_state(product), None)
+    record_event(session, "product", product_id, "product.deleted", snapshot)
+    session.add(ProductDeletion(product_id=product_id))
     session.commit()
+    price_index.remove(product_id)
 
 # FILTER
 
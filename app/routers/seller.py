@@ -0,0 +1,92 @@
+# app/routers/seller.py
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select, or_, and_
+
+from app.models import Category, Product, SellerCategoryStats, User
+from app.schemas.seller import SellerProductPage, SellerStats, SellerCategoryStatsRead
+from app.session import get_read_session
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.user import get_current_user
+
+router = APIRouter(prefix="/users/me", tags=["seller"])
+
+
+@router.get("/products", response_model=SellerProductPage, summary="Products of the current seller")
+def list_my_products(
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_read_session)
+):
+    """
+    Productos del usuario, del más reciente al más antiguo. Paginación por
+    keyset sobre (created_at, id), servida por el índice (user_id, created_at, id).
+    """
+    query = (
+        select(Product)
+        .options(
+            selectinload(Product.brand),
+            selectinload(Product.category),
+            selectinload(Product.images),
+            selectinload(Product.colors),
+            selectinload(Product.genders),
+            selectinload(Product.materials),
+            selectinload(Product.sizes),
+        )
+        .where(Product.user_id == current_user.id)
+        .order_by(Product.created_at.desc(), Product.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        try:
+            data = decode_cursor(cursor)
+            created_at, last_id = datetime.fromisoformat(data["c"]), int(data["i"])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "Cursor inválido")
+        query = query.where(or_(
+            Product.created_at < created_at,
+            and_(Product.created_at == created_at, Product.id < last_id),
+        ))
+
+    products = session.exec(query).all()
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        last = products[-1]
+        next_cursor = encode_cursor({"c": last.created_at.isoformat(), "i": last.id})
+    return SellerProductPage(items=products, next_cursor=next_cursor)
+
+
+@router.get("/stats", response_model=SellerStats, summary="Stock and value totals of the current seller")
+def get_my_stats(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_read_session)
+):
+    """Conteo, stock y valor (precio × stock) por categoría, leídos del rollup seller_category_stats"""
+    rows = session.exec(
+        select(SellerCategoryStats, Category.name)
+        .join(Category, Category.id == SellerCategoryStats.category_id, isouter=True)
+        .where(SellerCategoryStats.user_id == current_user.id, SellerCategoryStats.product_count > 0)
+        .order_by(SellerCategoryStats.category_id)
+    ).all()
+
+    by_category = [
+        SellerCategoryStatsRead(
+            category_id=stats.category_id,
+            category_name=name,
+            product_count=stats.product_count,
+            total_quantity=stats.total_quantity,
+            total_value=round(stats.total_value, 2),
+        )
+        for stats, name in rows
+    ]
+    return SellerStats(
+        product_count=sum(row.product_count for row in by_category),
+        total_quantity=sum(row.total_quantity for row in by_category),
+        total_value=round(sum(row.total_value for row in by_category), 2),
+        by_category=by_category,
+    )
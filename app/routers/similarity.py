@@ -0,0 +1,38 @@
+# app/routers/similarity.py
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session, select
+
+from app.config import SIMILARITY_TOP_K
+from app.models import ProductNeighbor, ProductSummary
+from app.schemas.product import ProductSummaryRead, ProductSummaryReadList
+from app.session import get_read_session
+from app.utils.responses import adapter_response
+
+router = APIRouter(tags=["products"])
+
+
+@router.get(
+    "/products/{product_id}/similar",
+    response_model=List[ProductSummaryRead],
+    summary="Products similar to a product"
+)
+def similar_products(
+    product_id: int,
+    limit: int = Query(10, ge=1, le=SIMILARITY_TOP_K),
+    session: Session = Depends(get_read_session)
+):
+    """
+    Vecinos precalculados por similitud de atributos (app/utils/similarity.py),
+    del más parecido al menos. Es una lectura por la clave primaria de
+    product_neighbors; un producto sin vecinos (o inexistente) devuelve [].
+    """
+    query = (
+        select(ProductSummary)
+        .join(ProductNeighbor, ProductNeighbor.neighbor_id == ProductSummary.product_id)
+        .where(ProductNeighbor.product_id == product_id)
+        .order_by(ProductNeighbor.rank)
+        .limit(limit)
+    )
+    return adapter_response(ProductSummaryReadList, session.exec(query).all())
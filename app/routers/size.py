@@ -2,11 +2,11 @@ from fastapi import APIRouter, Depends
 from sqlmodel import Session, select
 from app.models.size import Size
 from app.schemas.size import SizeRead
-from app.database import get_session
+from app.database import get_read_session
 from typing import List
 
 router = APIRouter(prefix="/sizes", tags=["sizes"])
 
 @router.get("/", response_model=List[SizeRead], summary="Get all sizes")
-def get_all_brands(session: Session = Depends(get_session)):
+def get_all_brands(session: Session = Depends(get_read_session)):
     return session.exec(select(Size)).all()
\ No newline at end of file
@@ -0,0 +1,39 @@
+# app/routers/sync.py
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import Session
+
+from app.schemas.sync import ProductSyncPage, ProductTombstone
+from app.session import get_read_session
+from app.utils.sync import SyncState, SyncTokenExpired, changes_since
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("/products", response_model=ProductSyncPage, summary="Changed and deleted products since a token")
+def sync_products(
+    since: Optional[str] = Query(None, description="next_token de la respuesta anterior; vacío = desde el inicio"),
+    limit: int = Query(200, ge=1, le=1000),
+    session: Session = Depends(get_read_session)
+):
+    """
+    Delta del catálogo: productos creados o modificados y tombstones de los
+    borrados desde `since`. Repetir con `next_token` mientras `has_more` sea true.
+    """
+    try:
+        state = SyncState.from_token(since)
+    except ValueError:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Token de sincronización inválido")
+
+    try:
+        products, deletions, next_state, has_more = changes_since(session, state, limit)
+    except SyncTokenExpired:
+        raise HTTPException(status.HTTP_410_GONE, "Token expirado: se requiere una sincronización completa")
+
+    return ProductSyncPage(
+        products=products,
+        deleted=[ProductTombstone(product_id=d.product_id, deleted_at=d.created_at) for d in deletions],
+        next_token=next_state.to_token(),
+        has_more=has_more,
+    )
@@ -1,16 +1,39 @@
-# app/api/routers/users.py
-from typing import List
-from fastapi import APIRouter, Depends, status
-from sqlmodel import Session, select
+# app/routers/user.py
+from datetime import datetime
+from typing import Optional
 
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, func, or_, and_
+
+from app.config import USER_COUNT_CACHE_SECONDS
 from app.models.user import User
-from app.schemas.user import UserCreate, UserRead, UserUpdate
-from app.session import get_session
+from app.schemas.user import UserCount, UserCreate, UserPage, UserRead, UserUpdate, USER_FIELDS
+from app.session import get_session, get_read_session
+from app.utils.counters import ApproximateCounter
+from app.utils.cursor import encode_cursor, decode_cursor
 from app.utils.hash import get_password_hash
-from app.utils.user import get_current_user
+from app.utils.user import get_current_user, require_admin
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+user_counter = ApproximateCounter(USER_COUNT_CACHE_SECONDS)
+
+
+def _verified_filter(query, verified: Optional[bool]):
+    if verified is None:
+        return query
+    if verified:
+        return query.where(User.email_verified_at.is_not(None))
+    return query.where(User.email_verified_at.is_(None))
+
+
+def _get_user_or_404(session: Session, user_id: int) -> User:
+    user = session.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
+
 
 @router.get(
     "/me",
@@ -24,33 +47,95 @@ def read_current_user(
 
 @router.get(
     "/",
-    response_model=List[UserRead],
+    response_model=UserPage,
     summary="List users",
-    operation_id="listUsers"  # <- aquí
+    operation_id="listUsers",  # <- aquí
+    dependencies=[Depends(require_admin)]
 )
 def api_read_users(
         *,
-        session: Session = Depends(get_session),
-        offset: int = 0,
-        limit: int = 100
+        session: Session = Depends(get_read_session),
+        cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+        limit: int = Query(50, ge=1, le=200),
+        verified: Optional[bool] = Query(None, description="Solo verificados (true) o sin verificar (false)"),
+        email_prefix: Optional[str] = Query(None, min_length=1, description="Inicio del correo"),
+        fields: Optional[str] = Query(None, description="Columnas separadas por comas, p. ej. id,email")
+):
+    """
+    Usuarios del más reciente al más antiguo. Paginación por keyset sobre
+    (created_at, id) con el índice ix_users_created_at_id; el prefijo de correo
+    usa el índice único de email y ?verified= el de email_verified_at.
+    """
+    requested = list(USER_FIELDS)
+    if fields:
+        requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [f for f in requested if f not in USER_FIELDS]
+        if unknown or not requested:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, f"Columnas no válidas: {', '.join(unknown)}")
+
+    # id y created_at siempre se leen: forman el cursor
+    columns = list(dict.fromkeys(["id", "created_at", *requested]))
+    query = (
+        select(*[getattr(User, name) for name in columns])
+        .order_by(User.created_at.desc(), User.id.desc())
+        .limit(limit + 1)
+    )
+    query = _verified_filter(query, verified)
+    if email_prefix:
+        query = query.where(User.email.startswith(email_prefix, autoescape=True))
+    if cursor:
+        try:
+            data = decode_cursor(cursor)
+            created_at, last_id = datetime.fromisoformat(data["c"]), int(data["i"])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "Cursor inválido")
+        query = query.where(or_(
+            User.created_at < created_at,
+            and_(User.created_at == created_at, User.id < last_id),
+        ))
+
+    rows = session.exec(query).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor({"c": rows[-1].created_at.isoformat(), "i": rows[-1].id})
+    items = [{name: row._mapping[name] for name in requested} for row in rows]
+    return UserPage(items=items, next_cursor=next_cursor)
+
+
+@router.get(
+    "/count",
+    response_model=UserCount,
+    summary="Approximate number of users",
+    operation_id="countUsers",
+    dependencies=[Depends(require_admin)]
+)
+def api_count_users(
+        *,
+        session: Session = Depends(get_read_session),
+        verified: Optional[bool] = Query(None, description="Solo verificados (true) o sin verificar (false)")
 ):
-    users = session.exec(select(User).offset(offset).limit(limit)).all()
-    return users
+    """Conteo cacheado hasta USER_COUNT_CACHE_SECONDS: no hace COUNT(*) en cada llamada"""
+    def count(session: Session) -> int:
+        return session.exec(_verified_filter(select(func.count(User.id)), verified)).one()
+
+    value, as_of = user_counter.get(session, verified, count)
+    return UserCount(count=value, as_of=as_of)
 
 
 @router.get(
     "/{user_id}",
     response_model=UserRead,
     summary="Get a user by ID",
-    operation_id="getUserById"  # <- aquí
+    operation_id="getUserById",  # <- aquí
+    dependencies=[Depends(require_admin)]
 )
 def api_read_user(
         *,
-        session: Session = Depends(get_session),
+        session: Session = Depends(get_read_session),
         user_id: int
 ):
-    user = session.get(User, user_id)
-    return user
+    return _get_user_or_404(session, user_id)
 
 
 @router.post(
@@ -58,7 +143,8 @@ def api_read_user(
     response_model=UserRead,
     status_code=status.HTTP_201_CREATED,
     summary="Create a new user",
-    operation_id="createUser"  # <- aquí
+    operation_id="createUser",  # <- aquí
+    dependencies=[Depends(require_admin)]
 )
 def api_create_user(
         *,
@@ -66,12 +152,17 @@ def api_create_user(
         user_in: UserCreate
 ):
     user = User(
-        **user_in.model_dump(exclude_unset=True),
-        password_hash=get_password_hash(user_in.password)
+        **user_in.model_dump(exclude={"password"}),
+        password=get_password_hash(user_in.password)
     )
     session.add(user)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email or phone already registered")
     session.refresh(user)
+    user_counter.invalidate()
     return user
 
 
@@ -79,7 +170,8 @@ def api_create_user(
     "/{user_id}",
     response_model=UserRead,
     summary="Update a user",
-    operation_id="updateUser"  # <- aquí
+    operation_id="updateUser",  # <- aquí
+    dependencies=[Depends(require_admin)]
 )
 def api_update_user(
         *,
@@ -87,16 +179,20 @@ def api_update_user(
         user_id: int,
         user_in: UserUpdate
 ):
-    user = session.get(User, user_id)
+    user = _get_user_or_404(session, user_id)
     user_data = user_in.model_dump(exclude_unset=True)
 
     if "password" in user_data:
-        user_data["password_hash"] = get_password_hash(user_data.pop("password"))
+        user_data["password"] = get_password_hash(user_data["password"])
 
     user.sqlmodel_update(user_data)
 
     session.add(user)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email or phone already registered")
     session.refresh(user)
     return user
 
@@ -105,13 +201,15 @@ def api_update_user(
     "/{user_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete a user",
-    operation_id="deleteUser"  # <- aquí
+    operation_id="deleteUser",  # <- aquí
+    dependencies=[Depends(require_admin)]
 )
 def api_delete_user(
         *,
         session: Session = Depends(get_session),
         user_id: int
 ):
-    user = session.get(User, user_id)
+    user = _get_user_or_404(session, user_id)
     session.delete(user)
     session.commit()
+    user_counter.invalidate()
@@ -1,6 +1,9 @@
-from sqlmodel import SQLModel
 from typing import Optional
 
-class BrandRead(SQLModel):
+from pydantic import BaseModel, ConfigDict
+
+class BrandRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: Optional[int] = None
     name: str
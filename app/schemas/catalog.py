@@ -0,0 +1,20 @@
+from typing import List
+
+from pydantic import BaseModel
+
+from app.schemas.brand import BrandRead
+from app.schemas.category import CategoryRead
+from app.schemas.color import ColorRead
+from app.schemas.gender import GenderRead
+from app.schemas.material import MaterialRead
+from app.schemas.size import SizeRead
+
+
+class CatalogBootstrap(BaseModel):
+    """Todas las dimensiones del catálogo en una sola respuesta"""
+    brands: List[BrandRead] = []
+    categories: List[CategoryRead] = []
+    sizes: List[SizeRead] = []
+    colors: List[ColorRead] = []
+    genders: List[GenderRead] = []
+    materials: List[MaterialRead] = []
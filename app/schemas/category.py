@@ -1,9 +1,8 @@
-from sqlmodel import SQLModel
+from pydantic import BaseModel, ConfigDict
 
 
-class CategoryRead(SQLModel):
+class CategoryRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
-    
-    class Config:
-        orm_mode = True
\ No newline at end of file
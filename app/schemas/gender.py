@@ -1,8 +1,7 @@
-from sqlmodel import SQLModel
+from pydantic import BaseModel, ConfigDict
+
+class GenderRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
 
-class GenderRead(SQLModel):
     id: int
     name: str
-    
-    class Config:
-        orm_mode = True
\ No newline at end of file
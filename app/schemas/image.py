@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class ImageBase(BaseModel):
     url: str
@@ -10,6 +10,8 @@ class ImageCreate(ImageBase):
     product_id: int
 
 class ImageRead(ImageBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     product_id: int
 
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.config import RESERVATION_MAX_TTL_SECONDS
+
+
+class ReserveRequest(BaseModel):
+    quantity: int = Field(1, gt=0)
+    ttl_seconds: Optional[int] = Field(None, gt=0, le=RESERVATION_MAX_TTL_SECONDS)
+    user_id: Optional[int] = None
+
+
+class ReserveItem(BaseModel):
+    product_id: int
+    quantity: int = Field(1, gt=0)
+
+
+class BatchReserveRequest(BaseModel):
+    items: List[ReserveItem] = Field(min_length=1, max_length=100)
+    ttl_seconds: Optional[int] = Field(None, gt=0, le=RESERVATION_MAX_TTL_SECONDS)
+    user_id: Optional[int] = None
+
+
+class ReservationRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    product_id: int
+    quantity: int
+    status: str
+    expires_at: datetime
+    user_id: Optional[int] = None
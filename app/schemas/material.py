@@ -1,8 +1,7 @@
-from sqlmodel import SQLModel
+from pydantic import BaseModel, ConfigDict
+
+class MaterialRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
 
-class MaterialRead(SQLModel):
     id: int
     name: str
-    
-    class Config:
-        orm_mode = True
\ No newline at end of file
@@ -0,0 +1,13 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+
+class ChangeEvent(BaseModel):
+    id: int
+    aggregate_type: str
+    aggregate_id: int
+    event_type: str
+    payload: Dict[str, Any] = {}
+    created_at: Optional[datetime] = None
@@ -1,6 +1,7 @@
+from datetime import datetime
 from typing import Optional, List
 
-from sqlmodel import SQLModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
 
 from app.schemas.image import ImageRead
 from app.schemas.brand import BrandRead
@@ -9,9 +10,10 @@ from app.schemas.color import ColorRead
 from app.schemas.gender import GenderRead
 from app.schemas.material import MaterialRead
 from app.schemas.size import SizeRead
+from app.utils.product_summary import unpack_ids
 
 
-class ProductBase(SQLModel):
+class ProductBase(BaseModel):
     name: str
     price: float
     quantity: Optional[int]
@@ -27,7 +29,7 @@ class ProductCreate(ProductBase):
     material_ids: Optional[List[int]] = Field(default=[], description="Lista de IDs de materiales")
     size_ids: Optional[List[int]] = Field(default=[], description="Lista de IDs de tallas")
 
-class ProductUpdate(SQLModel):
+class ProductUpdate(BaseModel):
     name: Optional[str] = None
     price: Optional[float] = None
     quantity: Optional[int] = None
@@ -40,7 +42,9 @@ class ProductUpdate(SQLModel):
     material_ids: Optional[List[int]] = Field(default=None, description="Lista de IDs de materiales")
     size_ids: Optional[List[int]] = Field(default=None, description="Lista de IDs de tallas")
 
-class ProductRead(SQLModel):
+class ProductRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
     price: float
@@ -57,10 +61,65 @@ class ProductRead(SQLModel):
     materials: List[MaterialRead] = []
     sizes: List[SizeRead] = []
 
+    updated_at: Optional[datetime] = None
+
+
+class ProductExportRow(ProductRead):
+    """Fila de /products/export (NDJSON)"""
+    created_at: Optional[datetime] = None
 
-class ProductFilter(SQLModel):
+
+class ProductFilter(BaseModel):
     categories: Optional[List[int]] = None
     genders: Optional[List[int]] = None
     min_price: Optional[float] = None
     max_price: Optional[float] = None
-    order_by: Optional[int] = Field(0, description="1=name, 2=price, 3=price desc")
\ No newline at end of file
+    order_by: Optional[int] = Field(0, description="Obsoleto: 1=name, 2=price, 3=price desc")
+    sort: Optional[str] = Field(None, description="Orden registrado en app/utils/sorting.py, p. ej. price,newest")
+
+class ProductSummaryRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    product_id: int
+    user_id: int
+    name: str
+    price: float
+    quantity: Optional[int]
+    description: Optional[str]
+
+    brand_id: int
+    brand_name: Optional[str]
+    category_id: int
+    category_name: Optional[str]
+    primary_image_url: Optional[str]
+
+    color_ids: List[int] = []
+    gender_ids: List[int] = []
+    material_ids: List[int] = []
+    size_ids: List[int] = []
+
+    @field_validator("color_ids", "gender_ids", "material_ids", "size_ids", mode="before")
+    @classmethod
+    def _unpack_ids(cls, value):
+        if isinstance(value, str):
+            return unpack_ids(value)
+        return value
+
+
+class PriceBucket(BaseModel):
+    lower: float
+    upper: float
+    count: int
+
+
+class PriceStats(BaseModel):
+    count: int
+    min_price: Optional[float]
+    max_price: Optional[float]
+    avg_price: Optional[float]
+    histogram: List[PriceBucket] = []
+
+
+# Adaptadores compilados una sola vez para las respuestas de listas
+ProductReadList = TypeAdapter(List[ProductRead])
+ProductSummaryReadList = TypeAdapter(List[ProductSummaryRead])
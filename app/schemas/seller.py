@@ -0,0 +1,25 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.schemas.product import ProductRead
+
+
+class SellerProductPage(BaseModel):
+    items: List[ProductRead] = []
+    next_cursor: Optional[str] = None
+
+
+class SellerCategoryStatsRead(BaseModel):
+    category_id: int
+    category_name: Optional[str] = None
+    product_count: int
+    total_quantity: int
+    total_value: float
+
+
+class SellerStats(BaseModel):
+    product_count: int = 0
+    total_quantity: int = 0
+    total_value: float = 0
+    by_category: List[SellerCategoryStatsRead] = []
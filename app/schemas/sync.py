@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.schemas.product import ProductRead
+
+
+class ProductTombstone(BaseModel):
+    product_id: int
+    deleted_at: Optional[datetime] = None
+
+
+class ProductSyncPage(BaseModel):
+    products: List[ProductRead] = []
+    deleted: List[ProductTombstone] = []
+    next_token: str
+    has_more: bool
@@ -1,13 +1,12 @@
 # app/schemas/user.py
 from datetime import datetime
-from typing import Optional
-from pydantic import EmailStr, Field
-from sqlmodel import SQLModel
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
-class UserBase(SQLModel):
+class UserBase(BaseModel):
     name: str
     last_name: str
-    second_last_name: Optional[str] = None
+    second_last_name: str = ""
     email: EmailStr
     phone_number: Optional[str] = None
 
@@ -16,12 +15,36 @@ class UserCreate(UserBase):
     # si necesitas forzar address_id aquí, puedes añadir:
     address_id: int = Field(default=1)
 
+class UserUpdate(BaseModel):
+    name: Optional[str] = None
+    last_name: Optional[str] = None
+    second_last_name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone_number: Optional[str] = None
+    password: Optional[str] = Field(None, min_length=6)
+    address_id: Optional[int] = None
+    gender_id: Optional[int] = None
+
 class UserRead(UserBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     email_verified_at: Optional[datetime] = None
     url: Optional[str] = None
-    remember_token: Optional[str] = None
     address_id: int
     gender_id: Optional[int] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+
+# Columnas que se pueden pedir en ?fields= del listado de administración
+USER_FIELDS = tuple(UserRead.model_fields)
+
+class UserPage(BaseModel):
+    # Con ?fields= cada elemento trae solo las columnas pedidas
+    items: List[Dict[str, Any]] = []
+    next_cursor: Optional[str] = None
+
+class UserCount(BaseModel):
+    count: int
+    approximate: bool = True
+    as_of: datetime
@@ -0,0 +1,174 @@
+# app/serve.py
+"""
+Punto de entrada de producción: N workers de uvicorn sobre un mismo socket.
+
+    python -m app.serve --host 0.0.0.0 --port 8000 --workers 4 --max-requests 10000
+
+El proceso padre importa la app (rutas, modelos, plantillas) antes de hacer
+fork, de modo que los workers comparten esa memoria copy-on-write. Los workers
+se reciclan tras --max-requests peticiones y, con SIGTERM, terminan las
+peticiones en curso antes de salir.
+
+Cada worker ocupa un hueco 0..N-1 que conserva al reciclarse; solo el del
+hueco 0 arranca las tareas de mantenimiento compartidas (leader_only).
+"""
+import argparse
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Tuple
+
+from app.config import (
+    WEB_CONCURRENCY, MAX_REQUESTS, MAX_REQUESTS_JITTER, GRACEFUL_TIMEOUT
+)
+
+
+def preload():
+    """Importar y preparar todo lo que se puede compartir entre workers"""
+    from sqlalchemy.orm import configure_mappers
+
+    from app.database import create_tables
+    from app.main import app
+    from app.utils.email import get_template_env
+
+    # Una sola vez en el padre: evita que los workers compitan creando tablas
+    create_tables()
+    configure_mappers()
+    get_template_env().get_template("verify_email.html")
+    app.openapi()
+    return app
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, slot: int, max_requests: int, log_level: str):
+    import uvicorn
+
+    from app import database
+    from app.utils.background import set_worker_index
+
+    set_worker_index(slot)
+
+    # Las conexiones abiertas por el padre no se pueden compartir entre procesos
+    if database._engine is not None:
+        database._engine.dispose(close=False)
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    config = uvicorn.Config(
+        app,
+        lifespan="on",
+        log_level=log_level,
+        limit_max_requests=max_requests or None,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+    )
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+class Supervisor:
+    """Mantiene N workers vivos y los reemplaza cuando se reciclan o mueren"""
+
+    def __init__(self, app, sock: socket.socket, workers: int, max_requests: int,
+                 jitter: int, log_level: str):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.max_requests = max_requests
+        self.jitter = jitter
+        self.log_level = log_level
+        self.children: Dict[int, Tuple[int, float]] = {}  # pid -> (hueco, arranque)
+        self.stopping = False
+
+    def spawn(self, slot: int):
+        # El jitter evita que todos los workers se reciclen a la vez
+        max_requests = self.max_requests + (random.randint(0, self.jitter) if self.max_requests else 0)
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(self.app, self.sock, slot, max_requests, self.log_level)
+            except Exception as e:
+                print(f"Worker {os.getpid()} terminó con error: {str(e)}", file=sys.stderr)
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = (slot, time.monotonic())
+        print(f"Worker {pid} iniciado (hueco {slot})")
+
+    def stop(self, signum, frame):
+        if self.stopping:
+            return
+        self.stopping = True
+        print(f"Señal {signum} recibida, drenando {len(self.children)} workers...")
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        for slot in range(self.workers):
+            self.spawn(slot)
+
+        deadline = None
+        while self.children:
+            if self.stopping and deadline is None:
+                deadline = time.monotonic() + GRACEFUL_TIMEOUT + 5
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                if deadline and time.monotonic() > deadline:
+                    for child in list(self.children):
+                        os.kill(child, signal.SIGKILL)
+                time.sleep(0.2)
+                continue
+
+            child = self.children.pop(pid, None)
+            if self.stopping or child is None:
+                continue
+            slot, started = child
+            # Un worker que muere al instante no se relanza en bucle cerrado
+            if time.monotonic() - started < 1:
+                time.sleep(1)
+            print(f"Worker {pid} salió (estado {os.waitstatus_to_exitcode(status)}), relanzando")
+            self.spawn(slot)
+
+        print("Todos los workers terminaron")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor multi-proceso de Chacharitas API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY or os.cpu_count() or 1)
+    parser.add_argument("--max-requests", type=int, default=MAX_REQUESTS)
+    parser.add_argument("--max-requests-jitter", type=int, default=MAX_REQUESTS_JITTER)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    app = preload()
+    sock = _bind(args.host, args.port)
+    print(f"Escuchando en {args.host}:{args.port} con {args.workers} workers")
+
+    Supervisor(app, sock, args.workers, args.max_requests, args.max_requests_jitter, args.log_level).run()
+
+
+if __name__ == "__main__":
+    main()
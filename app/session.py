@@ -2,9 +2,9 @@ from typing import Generator
 
 from sqlmodel import Session
 
-from app.database import engine
+from app.database import get_engine, get_read_session
 
 
 def get_session() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         yield session
\ No newline at end of file
@@ -0,0 +1,89 @@
+# app/utils/background.py
+import threading
+from typing import Callable, List
+
+from app.config import WORKER_INDEX
+
+# Índice de este worker; las tareas leader_only solo arrancan en el 0
+_worker_index = WORKER_INDEX
+
+
+class PeriodicJob:
+    """Ejecuta una función cada `interval` segundos en un hilo en segundo plano"""
+
+    def __init__(self, name: str, interval: float, func: Callable[[], object], run_on_stop: bool = False,
+                 leader_only: bool = False):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.run_on_stop = run_on_stop
+        self.leader_only = leader_only
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+            # Última pasada al apagar (p. ej. volcar contadores en memoria)
+            if self.run_on_stop:
+                self.run_once()
+
+    def run_once(self):
+        try:
+            self.func()
+        except Exception as e:
+            # Un fallo puntual no debe matar el hilo; se reintenta en el siguiente ciclo
+            print(f"Error en tarea periódica {self.name}: {str(e)}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+
+_jobs: List[PeriodicJob] = []
+
+
+def set_worker_index(index: int):
+    """Lo llama app.serve en cada worker hijo, antes del lifespan"""
+    global _worker_index
+    _worker_index = index
+
+
+def is_leader() -> bool:
+    return _worker_index == 0
+
+
+def register_job(name: str, interval: float, func: Callable[[], object], run_on_stop: bool = False,
+                 leader_only: bool = False) -> PeriodicJob:
+    """
+    Registrar una tarea periódica que arrancará con el lifespan de la app.
+    leader_only: tareas sobre datos compartidos en la BD, que con varios
+    workers solo deben correr en uno; las cachés en memoria van en todos.
+    """
+    for existing in _jobs:
+        if existing.name == name:
+            return existing
+    job = PeriodicJob(name, interval, func, run_on_stop, leader_only)
+    _jobs.append(job)
+    return job
+
+
+def start_jobs():
+    for job in _jobs:
+        if job.leader_only and not is_leader():
+            continue
+        job.start()
+
+
+def stop_jobs():
+    for job in reversed(_jobs):
+        job.stop()
@@ -0,0 +1,120 @@
+# app/utils/catalog.py
+"""
+Respuesta precalculada de /catalog/bootstrap.
+
+Las seis dimensiones (marcas, categorías, tallas, colores, géneros y
+materiales) se serializan una vez a JSON y gzip, con un ETag. El blob se
+reconstruye solo cuando cambia alguna de esas tablas:
+- escrituras ORM de este proceso: eventos de mapper + after_commit;
+- escrituras de otros workers o fuera del ORM: una huella (COUNT y
+  MAX(updated_at) por tabla) que se compara cada CATALOG_FINGERPRINT_SECONDS.
+"""
+import gzip
+import hashlib
+import threading
+import time
+from typing import Optional, Tuple
+
+from sqlalchemy import event, literal, union_all
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, select, func
+
+from app.config import CATALOG_FINGERPRINT_SECONDS
+from app.models import Brand, Category, Color, Gender, Material, Size
+from app.schemas.catalog import CatalogBootstrap
+
+DIMENSIONS = {
+    "brands": Brand,
+    "categories": Category,
+    "sizes": Size,
+    "colors": Color,
+    "genders": Gender,
+    "materials": Material,
+}
+
+
+class CatalogBlob:
+    def __init__(self, body: bytes, fingerprint: tuple):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=9)
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self.fingerprint = fingerprint
+        self.checked_at = time.monotonic()
+
+
+class CatalogCache:
+    def __init__(self, fingerprint_seconds: float = CATALOG_FINGERPRINT_SECONDS):
+        self.fingerprint_seconds = fingerprint_seconds
+        self._blob: Optional[CatalogBlob] = None
+        self._dirty = True
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        self._dirty = True
+
+    def _fingerprint(self, session: Session) -> tuple:
+        # Una sola consulta para las seis tablas
+        query = union_all(*[
+            select(literal(name), func.count(model.id), func.max(model.updated_at))
+            for name, model in DIMENSIONS.items()
+        ])
+        return tuple(sorted((row[0], row[1], str(row[2])) for row in session.exec(query).all()))
+
+    def _build(self, session: Session, fingerprint: tuple) -> CatalogBlob:
+        payload = CatalogBootstrap(**{
+            name: session.exec(select(model).order_by(model.id)).all()
+            for name, model in DIMENSIONS.items()
+        })
+        return CatalogBlob(payload.model_dump_json().encode(), fingerprint)
+
+    def get(self, session: Session) -> CatalogBlob:
+        blob = self._blob
+        if blob and not self._dirty and time.monotonic() - blob.checked_at < self.fingerprint_seconds:
+            return blob
+
+        with self._lock:
+            blob = self._blob
+            if blob and not self._dirty and time.monotonic() - blob.checked_at < self.fingerprint_seconds:
+                return blob
+            self._dirty = False
+            fingerprint = self._fingerprint(session)
+            if blob and blob.fingerprint == fingerprint:
+                blob.checked_at = time.monotonic()
+                return blob
+            self._blob = self._build(session, fingerprint)
+            return self._blob
+
+
+catalog_cache = CatalogCache()
+
+
+def _mark_session(mapper, connection, target):
+    session = OrmSession.object_session(target)
+    if session is not None:
+        session.info["catalog_dirty"] = True
+
+
+for _model in DIMENSIONS.values():
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _mark_session)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_after_commit(session):
+    # Invalidar solo tras el commit: reconstruir antes leería datos sin confirmar
+    if session.info.pop("catalog_dirty", False):
+        catalog_cache.invalidate()
+
+
+def matches_etag(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def encode_for(accept_encoding: Optional[str], blob: CatalogBlob) -> Tuple[bytes, Optional[str]]:
+    """Cuerpo y Content-Encoding según lo que acepte el cliente"""
+    if accept_encoding and "gzip" in accept_encoding.lower():
+        return blob.gzipped, "gzip"
+    return blob.body, None
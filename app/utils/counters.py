@@ -0,0 +1,38 @@
+# app/utils/counters.py
+"""
+Conteos aproximados para listados grandes.
+
+En vez de un COUNT(*) por página, cada conteo se guarda en memoria y se
+recalcula como mucho una vez cada `ttl_seconds` (por worker). La cifra puede
+ir atrasada ese tiempo; por eso las respuestas la marcan como aproximada.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Hashable, Tuple
+
+from sqlmodel import Session
+
+
+class ApproximateCounter:
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._values: Dict[Hashable, Tuple[int, datetime, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session: Session, key: Hashable, count: Callable[[Session], int]) -> Tuple[int, datetime]:
+        """(conteo, momento en que se calculó) para `key`; `count` solo corre si la cifra venció"""
+        cached = self._values.get(key)
+        if cached and time.monotonic() - cached[2] < self.ttl_seconds:
+            return cached[0], cached[1]
+        with self._lock:
+            cached = self._values.get(key)
+            if cached and time.monotonic() - cached[2] < self.ttl_seconds:
+                return cached[0], cached[1]
+            value = count(session)
+            as_of = datetime.now(timezone.utc)
+            self._values[key] = (value, as_of, time.monotonic())
+            return value, as_of
+
+    def invalidate(self):
+        self._values.clear()
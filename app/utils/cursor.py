@@ -0,0 +1,21 @@
+# app/utils/cursor.py
+import base64
+import json
+
+
+def encode_cursor(data: dict) -> str:
+    """Cursor opaco para paginación: JSON compacto en base64 url-safe"""
+    raw = json.dumps(data, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> dict:
+    """Inverso de encode_cursor; ValueError si el token no es válido"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+    except Exception:
+        raise ValueError("Cursor inválido")
+    if not isinstance(data, dict):
+        raise ValueError("Cursor inválido")
+    return data
@@ -1,22 +1,27 @@
 # app/utils/email.py
 import os
-import requests
-import smtplib
+from functools import lru_cache
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from jinja2 import Environment, FileSystemLoader
 from typing import Optional
 
+from starlette.concurrency import run_in_threadpool
+
 from app.config import (
     MAIL_SERVICE, MAILGUN_API_KEY, MAILGUN_DOMAIN, MAILGUN_BASE_URL,
     SMTP_SERVER, SMTP_PORT, SMTP_USER, SMTP_PASSWORD,
     MAIL_FROM_EMAIL, MAIL_FROM_NAME
 )
 
-# Configurar Jinja2 para plantillas
-template_env = Environment(
-    loader=FileSystemLoader("app/templates/email")
-)
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "email")
+
+
+@lru_cache(maxsize=1)
+def get_template_env():
+    """Entorno Jinja2 para plantillas, creado en el primer uso (o en el lifespan)"""
+    from jinja2 import Environment, FileSystemLoader
+
+    return Environment(loader=FileSystemLoader(TEMPLATES_DIR))
 
 class EmailService:
     """Servicio de email que soporta Mailgun API y SMTP"""
@@ -32,6 +37,8 @@ class EmailService:
         if not all([MAILGUN_API_KEY, MAILGUN_DOMAIN]):
             raise ValueError("Mailgun API Key y Domain son requeridos")
         
+        import requests
+
         url = f"{MAILGUN_BASE_URL}/{MAILGUN_DOMAIN}/messages"
         
         data = {
@@ -44,7 +51,8 @@ class EmailService:
         if text_content:
             data["text"] = text_content
         
-        response = requests.post(
+        response = await run_in_threadpool(
+            requests.post,
             url,
             auth=("api", MAILGUN_API_KEY),
             data=data
@@ -82,12 +90,18 @@ class EmailService:
         msg.attach(part2)
         
         # Enviar email
-        try:
+        import smtplib
+
+        def _send():
             server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
             server.starttls()
             server.login(SMTP_USER, SMTP_PASSWORD)
             server.send_message(msg)
             server.quit()
+
+        # smtplib es bloqueante: se ejecuta en el threadpool para no frenar el event loop
+        try:
+            await run_in_threadpool(_send)
         except Exception as e:
             raise Exception(f"Error enviando email SMTP: {str(e)}")
     
@@ -132,7 +146,7 @@ async def send_verification_email(
     """Enviar email de verificación usando template"""
     try:
         # Cargar template
-        template = template_env.get_template("verify_email.html")
+        template = get_template_env().get_template("verify_email.html")
         
         # Datos para el template
         now = __import__("datetime").datetime.utcnow()
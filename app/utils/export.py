@@ -0,0 +1,105 @@
+# app/utils/export.py
+"""
+Exportación del catálogo completo en streaming (NDJSON o CSV).
+
+Los productos se leen por lotes con keyset (`WHERE id > :último ORDER BY id
+LIMIT :lote`) y las relaciones se precargan por lote con `selectinload`; cada
+lote se serializa, se envía y se descarta. No depende de cursores del lado del
+servidor: mysql-connector los lee enteros en memoria (buffered), así que
+`yield_per` no acotaba la memoria con el driver de producción.
+"""
+import csv
+import io
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select
+
+from app.models import Product
+from app.schemas.product import ProductExportRow
+
+EXPORT_BATCH_SIZE = 500
+
+CSV_COLUMNS = [
+    "id", "name", "price", "quantity", "user_id", "description",
+    "brand_id", "brand", "category_id", "category",
+    "color_ids", "gender_ids", "material_ids", "size_ids",
+    "image_urls", "created_at", "updated_at",
+]
+
+
+def iter_product_batches(
+    session: Session,
+    updated_since: Optional[datetime] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[list]:
+    """Productos ordenados por id, en lotes de `batch_size` con sus relaciones cargadas"""
+    query = (
+        select(Product)
+        .options(
+            selectinload(Product.brand),
+            selectinload(Product.category),
+            selectinload(Product.images),
+            selectinload(Product.colors),
+            selectinload(Product.genders),
+            selectinload(Product.materials),
+            selectinload(Product.sizes),
+        )
+        .order_by(Product.id)
+        .limit(batch_size)
+    )
+    if updated_since is not None:
+        query = query.where(Product.updated_at >= updated_since)
+
+    last_id = 0
+    while True:
+        batch = session.exec(query.where(Product.id > last_id)).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+        yield batch
+        # Soltar el lote (y sus relaciones) antes de leer el siguiente
+        session.expunge_all()
+        if len(batch) < batch_size:
+            break
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _ids(items) -> str:
+    return "|".join(str(item.id) for item in items)
+
+
+def ndjson_chunks(batches: Iterator[list]) -> Iterator[str]:
+    """Un objeto JSON por línea, con la misma forma que ProductRead más las fechas"""
+    for batch in batches:
+        lines = [ProductExportRow.model_validate(product).model_dump_json() for product in batch]
+        yield "\n".join(lines) + "\n"
+
+
+def csv_chunks(batches: Iterator[list]) -> Iterator[str]:
+    """CSV plano: las relaciones many-to-many van como IDs separados por '|'"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for batch in batches:
+        for product in batch:
+            writer.writerow([
+                product.id, product.name, product.price, product.quantity,
+                product.user_id, product.description,
+                product.brand_id, product.brand.name if product.brand else "",
+                product.category_id, product.category.name if product.category else "",
+                _ids(product.colors), _ids(product.genders),
+                _ids(product.materials), _ids(product.sizes),
+                "|".join(image.url for image in sorted(product.images, key=lambda i: (i.order or 0, i.id))),
+                _isoformat(product.created_at), _isoformat(product.updated_at),
+            ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Solo el encabezado si no hubo productos
+    if buffer.tell():
+        yield buffer.getvalue()
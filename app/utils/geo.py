@@ -0,0 +1,146 @@
+# app/utils/geo.py
+"""
+Búsquedas por cercanía sin extensiones espaciales (funciona igual en MySQL y SQLite).
+
+1. Caja envolvente del círculo (lat ± r y el ancho máximo en longitud).
+2. Celdas geohash que cubren la caja: cada una es un rango del índice de
+   addresses.geohash (LIKE 'prefijo%'), y la caja filtra dentro del rango.
+3. Distancia exacta (haversine) sobre esos candidatos, en SQL.
+
+Todo queda en una sola consulta (`sellers_near_query`), que los listados usan
+como subconsulta: `Product.user_id IN (SELECT user_id FROM addresses ...)`, sin
+traer los IDs de vendedores a Python. Necesita SIN/COS/RADIANS en la BD
+(MySQL; SQLite 3.35+ compilado con las funciones matemáticas, lo habitual).
+"""
+import math
+from typing import List, Optional, Set, Tuple
+
+from sqlmodel import Session, select, or_, func
+
+from app.models import Address
+
+EARTH_RADIUS_KM = 6371.0088
+MAX_COVER_CELLS = 16
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+BoundingBox = Tuple[float, float, float, float]  # (min_lat, max_lat, min_lon, max_lon)
+
+
+def geohash_encode(lat: float, lon: float, precision: int = 9) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits = bit_count = 0
+    even = True
+    while len(chars) < precision:
+        interval, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (interval[0] + interval[1]) / 2
+        if value >= mid:
+            bits = bits * 2 + 1
+            interval[0] = mid
+        else:
+            bits *= 2
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = bit_count = 0
+    return "".join(chars)
+
+
+def _cell_size(precision: int) -> Tuple[float, float]:
+    """(alto, ancho) en grados de una celda geohash"""
+    lon_bits = math.ceil(5 * precision / 2)
+    lat_bits = 5 * precision - lon_bits
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> BoundingBox:
+    angular = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angular)
+    # Ancho máximo del círculo en longitud (ocurre un poco hacia el polo, no en `lat`)
+    ratio = math.sin(angular) / max(math.cos(math.radians(lat)), 1e-12)
+    dlon = math.degrees(math.asin(ratio)) if ratio < 1 else 180.0
+    # Sin partir la caja en el antimeridiano: se recorta a [-180, 180]
+    return max(lat - dlat, -90.0), min(lat + dlat, 90.0), max(lon - dlon, -180.0), min(lon + dlon, 180.0)
+
+
+def _steps(start: float, stop: float, step: float) -> List[float]:
+    points = []
+    value = start
+    while value < stop:
+        points.append(value)
+        value += step
+    points.append(stop)
+    return points
+
+
+def covering_cells(box: BoundingBox) -> Set[str]:
+    """Celdas geohash (la precisión más fina con pocas celdas) que cubren la caja"""
+    min_lat, max_lat, min_lon, max_lon = box
+    for precision in range(9, 0, -1):
+        height, width = _cell_size(precision)
+        if (math.ceil((max_lat - min_lat) / height) + 1) * (math.ceil((max_lon - min_lon) / width) + 1) > MAX_COVER_CELLS:
+            continue
+        # Un punto cada celda (más los bordes) toca todas las celdas que cortan la caja
+        return {
+            geohash_encode(lat, lon, precision)
+            for lat in _steps(min_lat, max_lat, height)
+            for lon in _steps(min_lon, max_lon, width)
+        }
+    return {""}
+
+
+def parse_near(near: str) -> Tuple[float, float]:
+    """'lat,lon' -> (lat, lon); ValueError si no es válido"""
+    try:
+        lat, lon = (float(part) for part in near.split(","))
+    except ValueError:
+        raise ValueError("near debe ser 'lat,lon'")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError("Coordenadas fuera de rango")
+    return lat, lon
+
+
+def within_radius(lat: float, lon: float, radius_km: float):
+    """
+    Condición SQL haversine(punto, dirección) <= radio. Se compara el término
+    `a` de haversine con sin²(r / 2R), así no hacen falta ASIN ni SQRT.
+    """
+    half_dlat = func.sin((func.radians(Address.latitude) - math.radians(lat)) / 2)
+    half_dlon = func.sin((func.radians(Address.longitude) - math.radians(lon)) / 2)
+    a = half_dlat * half_dlat + math.cos(math.radians(lat)) * func.cos(func.radians(Address.latitude)) * half_dlon * half_dlon
+    return a <= math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2) ** 2
+
+
+def sellers_near_query(lat: float, lon: float, radius_km: float, *columns):
+    """SELECT de `columns` (por defecto user_id) de las direcciones de vendedores dentro del radio"""
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    cells = covering_cells((min_lat, max_lat, min_lon, max_lon))
+    return select(*(columns or (Address.user_id,))).where(
+        or_(*[Address.geohash.startswith(cell) for cell in sorted(cells)]),
+        Address.latitude.between(min_lat, max_lat),
+        Address.longitude.between(min_lon, max_lon),
+        Address.user_id.is_not(None),
+        within_radius(lat, lon, radius_km),
+    )
+
+
+def sellers_near(session: Session, lat: float, lon: float, radius_km: float,
+                 limit: Optional[int] = None) -> List[Tuple[int, float]]:
+    """[(user_id, distancia_km)] de los vendedores con dirección dentro del radio, del más cercano al más lejano"""
+    found = sorted(
+        (haversine_km(lat, lon, a_lat, a_lon), user_id)
+        for user_id, a_lat, a_lon in session.exec(
+            sellers_near_query(lat, lon, radius_km, Address.user_id, Address.latitude, Address.longitude)
+        ).all()
+    )
+    return [(user_id, distance) for distance, user_id in found[:limit]]
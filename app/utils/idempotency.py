@@ -0,0 +1,229 @@
+# app/utils/idempotency.py
+"""
+Cabecera Idempotency-Key para los POST que los clientes reintentan.
+
+La primera petición con una clave inserta una fila in_progress en
+idempotency_keys; el índice único (scope, idempotency_key) hace de lock, así
+que entre duplicados concurrentes solo uno ejecuta el handler. Al terminar se
+guarda el status y el cuerpo de la respuesta y los reintentos los reciben tal
+cual (con `Idempotent-Replayed: true`) sin volver a validar ni insertar.
+
+- Misma clave con otro cuerpo: 422.
+- Duplicado mientras la primera sigue en curso: espera hasta
+  IDEMPOTENCY_WAIT_SECONDS a que termine; si no, 409 y el cliente reintenta.
+- Errores 4xx se guardan (repetir la petición daría lo mismo); los 5xx y las
+  excepciones liberan la clave para que el reintento vuelva a ejecutar.
+- Si el worker muere con la clave tomada, el lock caduca a los
+  IDEMPOTENCY_LOCK_SECONDS y otra petición la recupera.
+
+El registro usa su propia sesión: no comparte transacción con el handler.
+"""
+import hashlib
+import json
+import time
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Response, status
+from pydantic_core import to_json
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from sqlmodel import Session, select, update, delete, func
+
+from app.config import IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_LOCK_SECONDS, IDEMPOTENCY_WAIT_SECONDS
+from app.models import IdempotencyRecord
+
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+POLL_INTERVAL = 0.1
+PRUNE_BATCH_SIZE = 1000
+
+
+class StoredResponse:
+    def __init__(self, status_code: int, body: str):
+        self.status_code = status_code
+        self.body = body
+
+    def response(self, replayed: bool = False) -> Response:
+        headers = {"Idempotent-Replayed": "true"} if replayed else None
+        return Response(content=self.body, media_type="application/json",
+                        status_code=self.status_code, headers=headers)
+
+
+def request_hash(scope: str, key: str, payload: Any) -> str:
+    """Huella del cuerpo; la clave entra en el hash para no guardar un sha256 simple de datos como contraseñas"""
+    data = payload.model_dump(mode="json") if hasattr(payload, "model_dump") else payload
+    raw = json.dumps([scope, key, data], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _session() -> Session:
+    from app.database import get_engine
+
+    return Session(get_engine())
+
+
+def _db_now(session: Session):
+    return session.exec(select(func.now())).one()
+
+
+def begin(scope: str, key: str, fingerprint: str,
+          wait_seconds: float = IDEMPOTENCY_WAIT_SECONDS) -> Optional[StoredResponse]:
+    """
+    Tomar la clave. Devuelve None si esta petición debe ejecutar el handler o
+    la respuesta guardada si ya se ejecutó; HTTPException 422/409 si no.
+    """
+    deadline = time.monotonic() + wait_seconds
+    with _session() as session:
+        while True:
+            now = _db_now(session)
+            session.add(IdempotencyRecord(
+                scope=scope, idempotency_key=key, request_hash=fingerprint,
+                status=IN_PROGRESS, expires_at=now + timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS),
+            ))
+            try:
+                session.commit()
+                return None
+            except IntegrityError:
+                session.rollback()
+
+            record = session.exec(
+                select(IdempotencyRecord)
+                .where(IdempotencyRecord.scope == scope, IdempotencyRecord.idempotency_key == key)
+            ).first()
+            if record is None:
+                # La borró el job de limpieza o un abandon: volver a intentar el INSERT
+                continue
+
+            if record.expires_at <= now:
+                # Respuesta caducada o lock de un worker caído: UPDATE condicional,
+                # solo un duplicado se la queda
+                result = session.exec(
+                    update(IdempotencyRecord)
+                    .where(IdempotencyRecord.id == record.id, IdempotencyRecord.expires_at == record.expires_at)
+                    .values(request_hash=fingerprint, status=IN_PROGRESS, response_status=None,
+                            response_body=None, expires_at=now + timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS))
+                    .execution_options(synchronize_session=False)
+                )
+                session.commit()
+                if result.rowcount:
+                    return None
+            elif record.request_hash != fingerprint:
+                raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY,
+                                    "Idempotency-Key ya usada con otro cuerpo de petición")
+            elif record.status == COMPLETED:
+                return StoredResponse(record.response_status, record.response_body)
+
+            if time.monotonic() >= deadline:
+                raise HTTPException(status.HTTP_409_CONFLICT,
+                                    "Hay una petición en curso con esta Idempotency-Key; reintenta más tarde")
+            session.expunge_all()
+            time.sleep(POLL_INTERVAL)
+
+
+def complete(scope: str, key: str, fingerprint: str, status_code: int, body: str):
+    """Guardar la respuesta de la petición que tiene la clave"""
+    with _session() as session:
+        now = _db_now(session)
+        session.exec(
+            update(IdempotencyRecord)
+            .where(IdempotencyRecord.scope == scope, IdempotencyRecord.idempotency_key == key,
+                   IdempotencyRecord.request_hash == fingerprint, IdempotencyRecord.status == IN_PROGRESS)
+            .values(status=COMPLETED, response_status=status_code, response_body=body,
+                    expires_at=now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS))
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+
+
+def abandon(scope: str, key: str, fingerprint: str):
+    """Liberar la clave tras un fallo: el siguiente reintento vuelve a ejecutar"""
+    with _session() as session:
+        session.exec(
+            delete(IdempotencyRecord)
+            .where(IdempotencyRecord.scope == scope, IdempotencyRecord.idempotency_key == key,
+                   IdempotencyRecord.request_hash == fingerprint, IdempotencyRecord.status == IN_PROGRESS)
+        )
+        session.commit()
+
+
+def _error_body(exc: HTTPException) -> Optional[str]:
+    """Cuerpo a guardar de un error del handler; None si no debe guardarse"""
+    if exc.status_code >= 500 or exc.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+        return None
+    return to_json({"detail": exc.detail}).decode()
+
+
+def run_idempotent(scope: str, key: str, payload: Any, handler: Callable[[], Any],
+                   status_code: int = status.HTTP_200_OK) -> Response:
+    """Ejecutar `handler` una sola vez por (scope, key) y devolver su respuesta JSON"""
+    fingerprint = request_hash(scope, key, payload)
+    stored = begin(scope, key, fingerprint)
+    if stored is not None:
+        return stored.response(replayed=True)
+    try:
+        result = handler()
+    except HTTPException as exc:
+        body = _error_body(exc)
+        if body is None:
+            abandon(scope, key, fingerprint)
+        else:
+            complete(scope, key, fingerprint, exc.status_code, body)
+        raise
+    except BaseException:
+        abandon(scope, key, fingerprint)
+        raise
+    body = to_json(result).decode()
+    complete(scope, key, fingerprint, status_code, body)
+    return StoredResponse(status_code, body).response()
+
+
+async def run_idempotent_async(scope: str, key: str, payload: Any, handler: Callable[[], Awaitable[Any]],
+                               status_code: int = status.HTTP_200_OK) -> Response:
+    """Igual que run_idempotent para handlers async; el registro va fuera del event loop"""
+    fingerprint = request_hash(scope, key, payload)
+    stored = await run_in_threadpool(begin, scope, key, fingerprint)
+    if stored is not None:
+        return stored.response(replayed=True)
+    try:
+        result = await handler()
+    except HTTPException as exc:
+        body = _error_body(exc)
+        if body is None:
+            await run_in_threadpool(abandon, scope, key, fingerprint)
+        else:
+            await run_in_threadpool(complete, scope, key, fingerprint, exc.status_code, body)
+        raise
+    except BaseException:
+        await run_in_threadpool(abandon, scope, key, fingerprint)
+        raise
+    body = to_json(result).decode()
+    await run_in_threadpool(complete, scope, key, fingerprint, status_code, body)
+    return StoredResponse(status_code, body).response()
+
+
+def prune_expired(session: Session, batch_size: int = PRUNE_BATCH_SIZE) -> int:
+    """Borrar respuestas y locks caducados por lotes; devuelve las filas borradas"""
+    now = _db_now(session)
+    total = 0
+    while True:
+        ids = session.exec(
+            select(IdempotencyRecord.id).where(IdempotencyRecord.expires_at < now).limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        # La condición se repite: un begin() pudo recuperar la fila entre el SELECT y el DELETE
+        session.exec(
+            delete(IdempotencyRecord)
+            .where(IdempotencyRecord.id.in_(ids), IdempotencyRecord.expires_at < now)
+        )
+        session.commit()
+        total += len(ids)
+        if len(ids) < batch_size:
+            break
+    return total
+
+
+def prune_job():
+    with _session() as session:
+        prune_expired(session)
@@ -0,0 +1,339 @@
+# app/utils/inventory.py
+"""
+Reservas de stock con decremento atómico.
+
+Cada reserva es un solo UPDATE condicional
+    UPDATE products SET quantity = quantity - :n WHERE id = :id AND quantity >= :n
+más el INSERT de la reserva, en la misma transacción: nunca se vende de más y
+no hay lectura-modificación-escritura. Antes solo se lee, sin lock,
+products.stock_shards para elegir el camino.
+
+Cuando cambia products.quantity, la misma transacción lleva el cambio a
+product_summary.quantity y a seller_category_stats, así /products/summaries y
+/users/me/stats no se quedan atrás de /products/filter.
+
+Para productos muy demandados el stock se reparte en `product_stock_shards`
+(products.stock_shards > 0). Las reservas restan de una fracción al azar y
+products.quantity pasa a ser la suma, que consolida el sweeper (junto con sus
+modelos de lectura).
+
+    python -m app.utils.inventory shard <product_id> <fracciones>
+"""
+import random
+import sys
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlmodel import Session, select, update, func
+
+from app.config import RESERVATION_TTL_SECONDS, RESERVATION_SWEEP_BATCH_SIZE
+from app.models import Product, ProductStockShard, ProductSummary, StockReservation
+from app.utils.product_summary import adjust_summary_quantity
+from app.utils.seller_stats import apply_quantity_changes, recompute_sellers
+
+
+class ReservationError(Exception):
+    """No se pudo reservar: producto inexistente o stock insuficiente"""
+
+    def __init__(self, product_id: int, message: str, not_found: bool = False):
+        super().__init__(message)
+        self.product_id = product_id
+        self.not_found = not_found
+
+
+def _db_now(session: Session):
+    return session.exec(select(func.now())).one()
+
+
+def _take_from_product(session: Session, product_id: int, quantity: int) -> bool:
+    result = session.exec(
+        update(Product)
+        .where(
+            Product.id == product_id,
+            Product.deleted_at.is_(None),
+            Product.stock_shards == 0,
+            Product.quantity >= quantity,
+        )
+        .values(quantity=Product.quantity - quantity)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def _take_from_shards(session: Session, product_id: int, shards: int, quantity: int) -> bool:
+    # Empezar en una fracción al azar reparte la contención entre filas
+    start = random.randrange(shards)
+    for offset in range(shards):
+        result = session.exec(
+            update(ProductStockShard)
+            .where(
+                ProductStockShard.product_id == product_id,
+                ProductStockShard.shard == (start + offset) % shards,
+                ProductStockShard.quantity >= quantity,
+            )
+            .values(quantity=ProductStockShard.quantity - quantity)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            return True
+
+    # Ninguna fracción alcanza sola: bloquear todas (en orden, sin deadlocks) y restar de varias
+    rows = session.exec(
+        select(ProductStockShard)
+        .where(ProductStockShard.product_id == product_id)
+        .order_by(ProductStockShard.shard)
+        .with_for_update()
+    ).all()
+    if sum(row.quantity for row in rows) < quantity:
+        return False
+    remaining = quantity
+    for row in rows:
+        taken = min(row.quantity, remaining)
+        row.quantity -= taken
+        remaining -= taken
+        session.add(row)
+        if not remaining:
+            break
+    session.flush()
+    return True
+
+
+def _stock_changed(session: Session, changes: Dict[int, int]):
+    """Llevar cambios de products.quantity {product_id: delta} a los modelos de lectura (sin commit)"""
+    for product_id in sorted(changes):
+        adjust_summary_quantity(session, product_id, changes[product_id])
+    apply_quantity_changes(session, changes)
+
+
+def _return_stock(session: Session, product_id: int, quantity: int) -> bool:
+    """Devolver stock; True si cambió products.quantity (producto sin fracciones)"""
+    shards = session.exec(
+        select(Product.stock_shards).where(Product.id == product_id).execution_options(include_deleted=True)
+    ).first()
+    if shards:
+        session.exec(
+            update(ProductStockShard)
+            .where(ProductStockShard.product_id == product_id, ProductStockShard.shard == random.randrange(shards))
+            .values(quantity=ProductStockShard.quantity + quantity)
+            .execution_options(synchronize_session=False)
+        )
+        return False
+    session.exec(
+        update(Product)
+        .where(Product.id == product_id)
+        .values(quantity=Product.quantity + quantity)
+        .execution_options(synchronize_session=False)
+    )
+    return True
+
+
+def _reserve(session: Session, product_id: int, quantity: int, ttl_seconds: int,
+             user_id: Optional[int]) -> Tuple[StockReservation, bool]:
+    """Reserva sin tocar los modelos de lectura; True si cambió products.quantity"""
+    # Lectura sin lock: decide el camino sin tocar la fila caliente de products
+    shards = session.exec(select(Product.stock_shards).where(Product.id == product_id)).first()
+    if shards is None:
+        raise ReservationError(product_id, "Product not found", not_found=True)
+    if shards:
+        taken = _take_from_shards(session, product_id, shards, quantity)
+    else:
+        taken = _take_from_product(session, product_id, quantity)
+    if not taken:
+        raise ReservationError(product_id, "Insufficient stock")
+
+    reservation = StockReservation(
+        product_id=product_id,
+        quantity=quantity,
+        user_id=user_id,
+        expires_at=_db_now(session) + timedelta(seconds=ttl_seconds),
+    )
+    session.add(reservation)
+    session.flush()
+    return reservation, not shards
+
+
+def reserve(session: Session, product_id: int, quantity: int, ttl_seconds: int = RESERVATION_TTL_SECONDS,
+            user_id: Optional[int] = None) -> StockReservation:
+    """Restar stock y registrar la reserva (sin commit). ReservationError si no alcanza."""
+    reservation, direct = _reserve(session, product_id, quantity, ttl_seconds, user_id)
+    if direct:
+        _stock_changed(session, {product_id: -quantity})
+    return reservation
+
+
+def reserve_many(session: Session, items: Iterable[Tuple[int, int]], ttl_seconds: int = RESERVATION_TTL_SECONDS,
+                 user_id: Optional[int] = None) -> List[StockReservation]:
+    """
+    Reservar varios productos: todo o nada (el llamador hace rollback si hay
+    ReservationError). Se agrupan por producto y se recorren en orden de ID para
+    que dos lotes concurrentes tomen los locks en el mismo orden.
+    """
+    totals = {}
+    for product_id, quantity in items:
+        totals[product_id] = totals.get(product_id, 0) + quantity
+    reservations = []
+    changes = {}
+    for product_id in sorted(totals):
+        reservation, direct = _reserve(session, product_id, totals[product_id], ttl_seconds, user_id)
+        reservations.append(reservation)
+        if direct:
+            changes[product_id] = -totals[product_id]
+    _stock_changed(session, changes)
+    return reservations
+
+
+def _finish(session: Session, reservation_id: int, status: str) -> Optional[StockReservation]:
+    # Transición condicional: solo una de dos peticiones simultáneas gana
+    result = session.exec(
+        update(StockReservation)
+        .where(StockReservation.id == reservation_id, StockReservation.status == "active")
+        .values(status=status)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        return None
+    return session.get(StockReservation, reservation_id, populate_existing=True)
+
+
+def _release(session: Session, reservation_id: int, changes: Dict[int, int]) -> Optional[StockReservation]:
+    reservation = _finish(session, reservation_id, "released")
+    if reservation and _return_stock(session, reservation.product_id, reservation.quantity):
+        changes[reservation.product_id] = changes.get(reservation.product_id, 0) + reservation.quantity
+    return reservation
+
+
+def release(session: Session, reservation_id: int) -> Optional[StockReservation]:
+    """Liberar una reserva activa y devolver su stock (sin commit); None si ya no estaba activa"""
+    changes: Dict[int, int] = {}
+    reservation = _release(session, reservation_id, changes)
+    _stock_changed(session, changes)
+    return reservation
+
+
+def confirm(session: Session, reservation_id: int) -> Optional[StockReservation]:
+    """Confirmar (vender) una reserva activa: el stock ya estaba descontado"""
+    return _finish(session, reservation_id, "confirmed")
+
+
+def sweep_expired(session: Session, batch_size: int = RESERVATION_SWEEP_BATCH_SIZE) -> int:
+    """Liberar reservas activas vencidas, un lote por llamada"""
+    ids = session.exec(
+        select(StockReservation.id)
+        .where(StockReservation.status == "active", StockReservation.expires_at <= _db_now(session))
+        .order_by(StockReservation.expires_at)
+        .limit(batch_size)
+    ).all()
+    released = 0
+    changes: Dict[int, int] = {}
+    for reservation_id in ids:
+        if _release(session, reservation_id, changes):
+            released += 1
+    _stock_changed(session, changes)
+    session.commit()
+    return released
+
+
+def rollup_stock(session: Session, since) -> None:
+    """
+    Consolidar el stock visible de los productos fraccionados:
+    products.quantity = suma de fracciones, y product_summary.quantity y el
+    rollup de vendedores de los que tuvieron reservas recientes (los demás
+    productos los actualiza la propia reserva).
+    """
+    shard_total = (
+        select(func.sum(ProductStockShard.quantity))
+        .where(ProductStockShard.product_id == Product.id)
+        .scalar_subquery()
+    )
+    # Solo se reescriben las filas cuyo total cambió; en esas updated_at avanza
+    # (onupdate) y /sync/products y el export entregan el stock nuevo
+    session.exec(
+        update(Product)
+        .where(Product.stock_shards > 0, Product.quantity.is_distinct_from(shard_total))
+        .values(quantity=shard_total)
+        .execution_options(synchronize_session=False)
+    )
+    touched = (
+        select(StockReservation.product_id)
+        .where(StockReservation.updated_at >= since,
+               StockReservation.product_id.in_(select(Product.id).where(Product.stock_shards > 0)))
+        .distinct()
+    )
+    product_quantity = select(Product.quantity).where(Product.id == ProductSummary.product_id).scalar_subquery()
+    session.exec(
+        update(ProductSummary)
+        .where(ProductSummary.product_id.in_(touched))
+        .values(quantity=product_quantity)
+        .execution_options(synchronize_session=False)
+    )
+    sellers = session.exec(select(Product.user_id).where(Product.id.in_(touched)).distinct()).all()
+    recompute_sellers(session, sellers)
+    session.commit()
+
+
+def set_stock(session: Session, product_id: int, quantity: int):
+    """Fijar el stock total de un producto fraccionado repartiéndolo entre sus fracciones (sin commit)"""
+    rows = session.exec(
+        select(ProductStockShard)
+        .where(ProductStockShard.product_id == product_id)
+        .order_by(ProductStockShard.shard)
+        .with_for_update()
+    ).all()
+    for row in rows:
+        row.quantity = quantity // len(rows) + (1 if row.shard < quantity % len(rows) else 0)
+        session.add(row)
+
+
+def shard_stock(session: Session, product_id: int, shards: int):
+    """Repartir el stock actual de un producto en `shards` fracciones (o volver a una sola fila con 0/1)"""
+    product = session.exec(select(Product).where(Product.id == product_id).with_for_update()).first()
+    if not product:
+        raise ReservationError(product_id, "Product not found", not_found=True)
+
+    existing = session.exec(select(ProductStockShard).where(ProductStockShard.product_id == product_id)).all()
+    total = sum(row.quantity for row in existing) if product.stock_shards else (product.quantity or 0)
+    for row in existing:
+        session.delete(row)
+    session.flush()
+
+    shards = shards if shards > 1 else 0
+    for shard in range(shards):
+        session.add(ProductStockShard(
+            product_id=product_id, shard=shard,
+            quantity=total // shards + (1 if shard < total % shards else 0),
+        ))
+    product.stock_shards = shards
+    product.quantity = total
+    session.add(product)
+    session.commit()
+
+
+_last_rollup = None
+
+
+def sweep_job():
+    from app.database import get_engine
+
+    global _last_rollup
+    with Session(get_engine()) as session:
+        now = _db_now(session)
+        while sweep_expired(session) == RESERVATION_SWEEP_BATCH_SIZE:
+            pass
+        rollup_stock(session, _last_rollup or now - timedelta(minutes=5))
+        _last_rollup = now
+
+
+def main():
+    from app.database import get_engine
+
+    if len(sys.argv) != 4 or sys.argv[1] != "shard":
+        print("Uso: python -m app.utils.inventory shard <product_id> <fracciones>")
+        sys.exit(1)
+    product_id, shards = int(sys.argv[2]), int(sys.argv[3])
+    with Session(get_engine()) as session:
+        shard_stock(session, product_id, shards)
+    print(f"✅ Producto {product_id}: stock repartido en {shards if shards > 1 else 1} fila(s)")
+
+
+if __name__ == "__main__":
+    main()
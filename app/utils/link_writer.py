@@ -0,0 +1,69 @@
+# app/utils/link_writer.py
+"""
+Escritura de las tablas de enlace de productos (color_product, gender_product,
+material_product, product_size).
+
+Cada fila es solo un par (product_id, id del atributo): en vez de crear un
+objeto ORM por fila y pasarlo por el unit of work, se emite un INSERT de Core
+por tabla con la lista de filas (executemany; SQLAlchemy las agrupa en
+INSERT ... VALUES de varias filas). id, created_at y updated_at los pone la BD.
+Los IDs repetidos en la petición se insertan una sola vez.
+
+    create_links(session, product.id, product_in)            # alta
+    replace_links(session, product.id, product_in)           # PATCH
+    bulk_create_links(session, [(id, data), ...])            # importación: un INSERT por tabla para todo el lote
+"""
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlmodel import Session, delete, insert
+
+from app.models import ColorProduct, GenderProduct, MaterialProduct, ProductSize
+
+# Campo de ProductCreate/ProductUpdate -> (tabla de enlace, columna del atributo)
+LINK_TABLES = {
+    "color_ids": (ColorProduct, "color_id"),
+    "gender_ids": (GenderProduct, "gender_id"),
+    "material_ids": (MaterialProduct, "material_id"),
+    "size_ids": (ProductSize, "size_id"),
+}
+
+INSERT_CHUNK = 1000
+
+
+def insert_links(session: Session, field: str, pairs: Iterable[Tuple[int, int]]) -> int:
+    """Insertar pares (product_id, id del atributo) en la tabla de `field`; devuelve las filas insertadas"""
+    model, column = LINK_TABLES[field]
+    # dict.fromkeys: sin duplicados y en el orden pedido
+    rows = [{"product_id": product_id, column: value} for product_id, value in dict.fromkeys(pairs)]
+    for start in range(0, len(rows), INSERT_CHUNK):
+        session.exec(insert(model.__table__), params=rows[start:start + INSERT_CHUNK])
+    return len(rows)
+
+
+def bulk_create_links(session: Session, items: Iterable[Tuple[int, Any]]) -> Dict[str, int]:
+    """Enlaces de varios productos: un INSERT por tabla para todos (sin commit)"""
+    pairs: Dict[str, List[Tuple[int, int]]] = {field: [] for field in LINK_TABLES}
+    for product_id, data in items:
+        for field in LINK_TABLES:
+            pairs[field].extend((product_id, value) for value in getattr(data, field, None) or ())
+    return {field: insert_links(session, field, field_pairs) for field, field_pairs in pairs.items() if field_pairs}
+
+
+def create_links(session: Session, product_id: int, data: Any) -> Dict[str, int]:
+    """Enlaces de un producto recién creado (sin commit)"""
+    return bulk_create_links(session, [(product_id, data)])
+
+
+def replace_links(session: Session, product_id: int, data: Any) -> Dict[str, int]:
+    """
+    Reemplazar los enlaces de los campos que vienen en `data` (None = no
+    tocar, lista vacía = quitar todos). Sin commit.
+    """
+    written = {}
+    for field, (model, _) in LINK_TABLES.items():
+        ids = getattr(data, field, None)
+        if ids is None:
+            continue
+        session.exec(delete(model.__table__).where(model.__table__.c.product_id == product_id))
+        written[field] = insert_links(session, field, ((product_id, value) for value in ids))
+    return written
@@ -0,0 +1,290 @@
+# app/utils/outbox.py
+import json
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from sqlmodel import Session, select, delete, func
+
+from app.config import OUTBOX_BATCH_SIZE, OUTBOX_BROKER, OUTBOX_GAP_TIMEOUT, OUTBOX_LATE_WINDOW
+from app.models.outbox import OutboxEvent, OutboxCheckpoint
+from app.schemas.outbox import ChangeEvent
+
+Handler = Callable[[ChangeEvent], Any]
+
+PRUNE_MIN_AGE_SECONDS = 600
+
+
+def record_event(
+    session: Session,
+    aggregate_type: str,
+    aggregate_id: int,
+    event_type: str,
+    payload: Optional[Dict[str, Any]] = None
+) -> OutboxEvent:
+    """
+    Añadir un evento al outbox dentro de la transacción actual.
+    No hace commit: el evento se confirma (o se descarta) junto con la mutación.
+    """
+    event = OutboxEvent(
+        aggregate_type=aggregate_type,
+        aggregate_id=aggregate_id,
+        event_type=event_type,
+        payload=json.dumps(payload or {}, default=str),
+    )
+    session.add(event)
+    return event
+
+
+def _to_change_event(event: OutboxEvent) -> ChangeEvent:
+    return ChangeEvent(
+        id=event.id,
+        aggregate_type=event.aggregate_type,
+        aggregate_id=event.aggregate_id,
+        event_type=event.event_type,
+        payload=json.loads(event.payload or "{}"),
+        created_at=event.created_at,
+    )
+
+
+class LocalBroker:
+    """Sustituto local de un broker externo: guarda los últimos mensajes en memoria"""
+
+    def __init__(self, maxlen: int = 10000):
+        self.messages: Deque[ChangeEvent] = deque(maxlen=maxlen)
+
+    def publish(self, event: ChangeEvent):
+        self.messages.append(event)
+
+
+class SkippedRange:
+    """Ids que faltaban cuando el checkpoint los pasó; se siguen buscando por si llegan tarde"""
+
+    def __init__(self, first_id: int, last_id: int, skipped_at: float):
+        self.first_id = first_id
+        self.last_id = last_id
+        self.skipped_at = skipped_at
+        self.delivered: Set[int] = set()
+
+
+class OutboxDispatcher:
+    """
+    Lee el outbox en orden de id y entrega cada evento a los consumidores suscritos.
+    La entrega es at-least-once: el checkpoint de un consumidor solo avanza
+    después de que su handler procesa el evento sin lanzar excepción.
+
+    Un hueco en los ids suele ser un rollback, pero también puede ser una
+    transacción larga que aún no hizo commit. Tras gap_timeout el checkpoint lo
+    salta (y lo registra), y durante late_window se sigue buscando: si el
+    evento aparece se entrega tarde, fuera de orden. Esos rangos viven en
+    memoria del proceso que despacha.
+
+    Los suscriptores son de este proceso: con varios workers el dispatcher
+    corre solo en el worker 0 (leader_only) o aparte con
+    `python -m app.utils.outbox`.
+    """
+
+    def __init__(self, batch_size: int = 100, gap_timeout: float = 5.0, late_window: float = 3600.0):
+        self.batch_size = batch_size
+        self.gap_timeout = gap_timeout
+        self.late_window = late_window
+        self._subscribers: Dict[str, Handler] = {}
+        # consumidor -> (id faltante, momento en que se detectó el hueco)
+        self._gaps: Dict[str, Tuple[int, float]] = {}
+        # consumidor -> ids saltados que aún pueden llegar
+        self._skipped: Dict[str, List[SkippedRange]] = {}
+
+    def subscribe(self, consumer: str, handler: Handler):
+        self._subscribers[consumer] = handler
+
+    def unsubscribe(self, consumer: str):
+        self._subscribers.pop(consumer, None)
+        self._gaps.pop(consumer, None)
+        self._skipped.pop(consumer, None)
+
+    @property
+    def consumers(self) -> List[str]:
+        return list(self._subscribers)
+
+    def oldest_pending_id(self) -> Optional[int]:
+        """Menor id saltado que aún se espera: el prune no debe borrar desde ahí"""
+        firsts = [skipped.first_id for ranges in self._skipped.values() for skipped in ranges]
+        return min(firsts) if firsts else None
+
+    def dispatch_once(self, session_factory: Optional[Callable[[], Session]] = None) -> int:
+        """Entregar un lote pendiente a cada consumidor. Devuelve los eventos entregados."""
+        if session_factory is None:
+            from app.database import get_engine
+            session_factory = lambda: Session(get_engine())
+
+        delivered = 0
+        for consumer, handler in list(self._subscribers.items()):
+            with session_factory() as session:
+                delivered += self._deliver(session, consumer, handler)
+        return delivered
+
+    def _deliver(self, session: Session, consumer: str, handler: Handler) -> int:
+        # SKIP LOCKED: si otro worker ya está entregando a este consumidor, no esperamos
+        checkpoint = session.exec(
+            select(OutboxCheckpoint)
+            .where(OutboxCheckpoint.consumer == consumer)
+            .with_for_update(skip_locked=True)
+        ).first()
+        if not checkpoint:
+            exists = session.exec(
+                select(OutboxCheckpoint.id).where(OutboxCheckpoint.consumer == consumer)
+            ).first()
+            if exists:
+                return 0
+            checkpoint = OutboxCheckpoint(consumer=consumer, last_event_id=0)
+            session.add(checkpoint)
+            session.commit()
+
+        delivered = self._deliver_late(session, consumer, handler)
+
+        events = session.exec(
+            select(OutboxEvent)
+            .where(OutboxEvent.id > checkpoint.last_event_id)
+            .order_by(OutboxEvent.id)
+            .limit(self.batch_size)
+        ).all()
+
+        expected = checkpoint.last_event_id + 1
+        for event in events:
+            # Un hueco en los ids puede ser una transacción aún sin commit:
+            # se espera gap_timeout antes de saltarlo
+            if checkpoint.last_event_id and event.id != expected:
+                if not self._gap_expired(consumer, expected):
+                    break
+                self._skip(consumer, expected, event.id - 1)
+            try:
+                handler(_to_change_event(event))
+            except Exception as e:
+                # Se reintenta desde este evento en el siguiente ciclo
+                print(f"Error entregando evento {event.id} a {consumer}: {str(e)}")
+                break
+            checkpoint.last_event_id = event.id
+            self._gaps.pop(consumer, None)
+            expected = event.id + 1
+            delivered += 1
+
+        # Un único commit por lote libera el bloqueo del checkpoint
+        session.add(checkpoint)
+        session.commit()
+        return delivered
+
+    def _skip(self, consumer: str, first_id: int, last_id: int):
+        print(f"Outbox: {consumer} salta los ids {first_id}-{last_id} tras {self.gap_timeout} s; "
+              f"se siguen buscando {self.late_window} s")
+        self._skipped.setdefault(consumer, []).append(SkippedRange(first_id, last_id, time.monotonic()))
+
+    def _deliver_late(self, session: Session, consumer: str, handler: Handler) -> int:
+        """Entregar los eventos saltados que ya hicieron commit"""
+        ranges = self._skipped.get(consumer)
+        if not ranges:
+            return 0
+        now = time.monotonic()
+        for skipped in [r for r in ranges if now - r.skipped_at > self.late_window]:
+            print(f"Outbox: {consumer} deja de esperar los ids {skipped.first_id}-{skipped.last_id}")
+            ranges.remove(skipped)
+
+        delivered = 0
+        for skipped in ranges:
+            events = session.exec(
+                select(OutboxEvent)
+                .where(OutboxEvent.id.between(skipped.first_id, skipped.last_id))
+                .order_by(OutboxEvent.id)
+            ).all()
+            for event in events:
+                if event.id in skipped.delivered:
+                    continue
+                try:
+                    handler(_to_change_event(event))
+                except Exception as e:
+                    print(f"Error entregando evento {event.id} a {consumer}: {str(e)}")
+                    return delivered
+                print(f"Outbox: evento {event.id} entregado tarde a {consumer}")
+                skipped.delivered.add(event.id)
+                delivered += 1
+        ranges[:] = [r for r in ranges if len(r.delivered) < r.last_id - r.first_id + 1]
+        return delivered
+
+    def _gap_expired(self, consumer: str, missing_id: int) -> bool:
+        now = time.monotonic()
+        gap = self._gaps.get(consumer)
+        if not gap or gap[0] != missing_id:
+            self._gaps[consumer] = (missing_id, now)
+            return False
+        return now - gap[1] >= self.gap_timeout
+
+
+def prune_outbox(session: Session, consumers: Optional[List[str]] = None, batch_size: int = 1000,
+                 pending_id: Optional[int] = None) -> int:
+    """
+    Borrar por lotes los eventos que ya entregaron todos los consumidores.
+    Si alguno de `consumers` aún no tiene checkpoint no se borra nada: todavía
+    no ha leído el outbox. `pending_id`: id saltado que aún se espera; se
+    conserva desde ahí.
+    """
+    if consumers:
+        known = set(session.exec(
+            select(OutboxCheckpoint.consumer).where(OutboxCheckpoint.consumer.in_(consumers))
+        ).all())
+        if known != set(consumers):
+            return 0
+    min_checkpoint = session.exec(select(func.min(OutboxCheckpoint.last_event_id))).first()
+    if pending_id is not None:
+        min_checkpoint = min(min_checkpoint or 0, pending_id - 1)
+    if not min_checkpoint:
+        return 0
+    # Los workers también leen el outbox (índice de precios): los eventos recientes se conservan
+    keep_after = session.exec(select(func.now())).one() - timedelta(seconds=PRUNE_MIN_AGE_SECONDS)
+    total = 0
+    while True:
+        ids = session.exec(
+            select(OutboxEvent.id).where(OutboxEvent.id <= min_checkpoint, OutboxEvent.created_at < keep_after)
+            .order_by(OutboxEvent.id).limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        session.exec(delete(OutboxEvent).where(OutboxEvent.id.in_(ids)))
+        session.commit()
+        total += len(ids)
+    return total
+
+
+def prune_job():
+    from app.database import get_engine
+
+    with Session(get_engine()) as session:
+        prune_outbox(session, dispatcher.consumers, pending_id=dispatcher.oldest_pending_id())
+
+
+dispatcher = OutboxDispatcher(batch_size=OUTBOX_BATCH_SIZE, gap_timeout=OUTBOX_GAP_TIMEOUT,
+                              late_window=OUTBOX_LATE_WINDOW)
+
+broker: Optional[LocalBroker] = None
+if OUTBOX_BROKER == "local":
+    broker = LocalBroker()
+    dispatcher.subscribe("broker", broker.publish)
+
+
+def main():
+    from app.config import OUTBOX_POLL_INTERVAL
+
+    print("Despachando eventos del outbox (Ctrl+C para salir)...")
+    next_prune = time.monotonic()
+    try:
+        while True:
+            if time.monotonic() >= next_prune:
+                prune_job()
+                next_prune = time.monotonic() + 3600
+            if not dispatcher.dispatch_once():
+                time.sleep(OUTBOX_POLL_INTERVAL)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
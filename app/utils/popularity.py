@@ -0,0 +1,182 @@
+# app/utils/popularity.py
+"""
+Vistas y popularidad de productos (tabla product_stats).
+
+GET /products/{id} no escribe en la BD: cada worker cuenta las vistas en
+memoria (ViewCounter) y un job las vuelca cada VIEW_FLUSH_INTERVAL segundos
+con un solo INSERT ... ON DUPLICATE KEY UPDATE por lote. Si un worker muere se
+pierden como mucho las vistas de ese intervalo.
+
+`popularity` son las vistas con decaimiento exponencial: el job de decaimiento
+multiplica cada fila por 0.5 ** (tiempo desde su último decaimiento / vida
+media). El factor sale del decayed_at de cada fila y el UPDATE lo exige igual
+al leído, así que varios workers corriendo el job no decaen dos veces.
+
+Cada producto tiene su fila desde que se crea (create_product), así el orden
+?sort=popular puede unir product_stats sin outer join.
+
+    python -m app.utils.popularity   # crear las filas que falten y decaer
+"""
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from itertools import count
+from typing import Dict
+
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlmodel import Session, select, update, func
+
+from app.config import POPULARITY_HALF_LIFE_HOURS, POPULARITY_DECAY_INTERVAL
+from app.models import Product, ProductStats
+
+UPSERT_CHUNK = 1000
+
+
+class ViewCounter:
+    """
+    Contador de vistas por producto en memoria, sin lock en la ruta de lectura:
+    next() sobre un itertools.count es atómico con el GIL. Al volcar se cambia el
+    diccionario entero por uno nuevo; una vista que llegue justo durante el
+    cambio puede perderse, lo que es aceptable para un ranking.
+    """
+
+    def __init__(self):
+        self._counts: Dict[int, count] = defaultdict(count)
+        # Vistas de un volcado que falló: se reintentan en el siguiente
+        self._pending: Dict[int, int] = {}
+        self._flush_lock = threading.Lock()
+
+    def record(self, product_id: int):
+        next(self._counts[product_id])
+
+    def drain(self) -> Dict[int, int]:
+        counts, self._counts = self._counts, defaultdict(count)
+        # next() devuelve cuántas veces se llamó antes: el número de vistas
+        drained = {product_id: next(counter) for product_id, counter in counts.items()}
+        for product_id, views in self._pending.items():
+            drained[product_id] = drained.get(product_id, 0) + views
+        self._pending = {}
+        return drained
+
+    def flush(self, session: Session) -> int:
+        """Volcar las vistas acumuladas a product_stats; devuelve cuántos productos se tocaron"""
+        with self._flush_lock:
+            counts = self.drain()
+            try:
+                flush_views(session, counts)
+            except Exception:
+                session.rollback()
+                self._pending = counts
+                raise
+            return len(counts)
+
+
+def _upsert(dialect: str, rows: list):
+    if dialect == "mysql":
+        statement = mysql.insert(ProductStats).values(rows)
+        return statement.on_duplicate_key_update(
+            views=ProductStats.views + statement.inserted.views,
+            popularity=ProductStats.popularity + statement.inserted.popularity,
+            last_viewed_at=statement.inserted.last_viewed_at,
+        )
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = insert(ProductStats).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=[ProductStats.product_id],
+        set_=dict(
+            views=ProductStats.views + statement.excluded.views,
+            popularity=ProductStats.popularity + statement.excluded.popularity,
+            last_viewed_at=statement.excluded.last_viewed_at,
+        ),
+    )
+
+
+def flush_views(session: Session, counts: Dict[int, int]):
+    """Sumar vistas a product_stats con un upsert por lote (con commit)"""
+    if not counts:
+        return
+    now = session.exec(select(func.now())).one()
+    dialect = session.get_bind().dialect.name
+    # En orden de product_id: dos workers volcando a la vez toman los locks en el mismo orden
+    rows = [
+        dict(product_id=product_id, views=views, popularity=float(views), last_viewed_at=now, decayed_at=now)
+        for product_id, views in sorted(counts.items())
+    ]
+    for start in range(0, len(rows), UPSERT_CHUNK):
+        session.exec(_upsert(dialect, rows[start:start + UPSERT_CHUNK]))
+    session.commit()
+
+
+def decay_popularity(session: Session, half_life_hours: float = POPULARITY_HALF_LIFE_HOURS,
+                     min_age_seconds: float = POPULARITY_DECAY_INTERVAL / 2, batch_size: int = 1000) -> int:
+    """Aplicar el decaimiento a las filas que no se decayeron en `min_age_seconds`; devuelve las filas tocadas"""
+    now = session.exec(select(func.now())).one()
+    cutoff = now - timedelta(seconds=min_age_seconds)
+    stamps = session.exec(
+        select(ProductStats.decayed_at).where(ProductStats.decayed_at <= cutoff).distinct()
+    ).all()
+
+    total = 0
+    for stamp in stamps:
+        factor = 0.5 ** ((now - stamp).total_seconds() / (half_life_hours * 3600))
+        while True:
+            ids = session.exec(
+                select(ProductStats.product_id).where(ProductStats.decayed_at == stamp)
+                .order_by(ProductStats.product_id).limit(batch_size)
+            ).all()
+            if not ids:
+                break
+            result = session.exec(
+                update(ProductStats)
+                .where(ProductStats.product_id.in_(ids), ProductStats.decayed_at == stamp)
+                .values(popularity=ProductStats.popularity * factor, decayed_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+            total += result.rowcount
+            if not result.rowcount:
+                # Otro worker ya los decayó
+                break
+    return total
+
+
+def ensure_stats_rows(session: Session) -> int:
+    """Crear la fila de product_stats de los productos que no la tengan (con commit)"""
+    missing = select(Product.id).where(
+        ~select(ProductStats.product_id).where(ProductStats.product_id == Product.id).exists()
+    )
+    ids = session.exec(missing).all()
+    for start in range(0, len(ids), UPSERT_CHUNK):
+        session.add_all(ProductStats(product_id=product_id) for product_id in ids[start:start + UPSERT_CHUNK])
+        session.commit()
+    return len(ids)
+
+
+view_counter = ViewCounter()
+
+
+def flush_job():
+    from app.database import get_engine
+
+    with Session(get_engine()) as session:
+        view_counter.flush(session)
+
+
+def decay_job():
+    from app.database import get_engine
+
+    with Session(get_engine()) as session:
+        decay_popularity(session)
+
+
+def main():
+    from app.database import get_engine
+
+    with Session(get_engine()) as session:
+        created = ensure_stats_rows(session)
+        decayed = decay_popularity(session)
+    print(f"✅ product_stats: {created} filas creadas, {decayed} decaídas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# app/utils/price_stats.py
+"""
+Índice en memoria de precios para /products/price-stats.
+
+Cada worker carga el índice una vez (el warmup lo hace al arrancar) y después
+lo mantiene al día leyendo del outbox los eventos de productos posteriores a
+la carga (`catch_up`), sin volver a recorrer products. Los ids de las últimas
+OUTBOX_GAP_TIMEOUT s se vuelven a leer por si una transacción hizo commit
+tarde. Una recarga completa cada PRICE_STATS_FULL_RELOAD_SECONDS corrige
+cualquier desvío.
+"""
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict, deque
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlmodel import Session, select, func
+
+from app.config import OUTBOX_GAP_TIMEOUT, PRICE_STATS_FULL_RELOAD_SECONDS
+from app.models import GenderProduct, Product
+from app.models.outbox import OutboxEvent
+
+# (category_id, géneros del producto ordenados) -> precios ordenados
+BucketKey = Tuple[int, Tuple[int, ...]]
+
+
+class PriceIndex:
+    """
+    Índice en memoria de precios por categoría y combinación de géneros.
+    Cada cubeta guarda sus precios ordenados, así min/max/histograma se
+    calculan con búsquedas binarias sin recorrer la tabla products.
+    """
+
+    def __init__(self, late_window: float = OUTBOX_GAP_TIMEOUT):
+        self._buckets: Dict[BucketKey, List[float]] = {}
+        self._sums: Dict[BucketKey, float] = {}
+        self._products: Dict[int, Tuple[BucketKey, float]] = {}
+        self._lock = threading.Lock()
+        # Serializa carga y catch_up (job y primera petición)
+        self._load_lock = threading.Lock()
+        self.late_window = late_window
+        # (momento, último id del outbox leído): el catch_up relee desde la marca
+        # de hace late_window; _applied evita reaplicar los ya vistos
+        self._marks: Deque[Tuple[float, int]] = deque()
+        self._applied: Set[int] = set()
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def load(self, session: Session):
+        """
+        Construir el índice completo desde la base de datos. Los cambios que
+        lleguen mientras se lee (locales o de otros workers) tienen un id del
+        outbox posterior a la marca leída antes y se reaplican tras el cambio.
+        """
+        with self._load_lock:
+            start_id = session.exec(select(func.max(OutboxEvent.id))).one() or 0
+            self._load(session)
+            self._marks = deque([(time.monotonic(), start_id)])
+            self._applied = set()
+            self._catch_up(session)
+
+    def _load(self, session: Session):
+        genders_by_product = defaultdict(list)
+        for product_id, gender_id in session.exec(
+            select(GenderProduct.product_id, GenderProduct.gender_id)
+        ).all():
+            genders_by_product[product_id].append(gender_id)
+
+        buckets: Dict[BucketKey, List[float]] = defaultdict(list)
+        products: Dict[int, Tuple[BucketKey, float]] = {}
+        for product_id, category_id, price in session.exec(
+            select(Product.id, Product.category_id, Product.price)
+        ).all():
+            key = (category_id, tuple(sorted(set(genders_by_product.get(product_id, ())))))
+            buckets[key].append(price)
+            products[product_id] = (key, price)
+
+        for prices in buckets.values():
+            prices.sort()
+
+        with self._lock:
+            self._buckets = dict(buckets)
+            self._sums = {key: sum(prices) for key, prices in buckets.items()}
+            self._products = products
+            self.loaded_at = time.monotonic()
+
+    def ensure_loaded(self, session: Session):
+        if not self.loaded:
+            self.load(session)
+
+    def catch_up(self, session: Session) -> int:
+        """Aplicar los eventos de productos del outbox desde la última lectura; devuelve los productos reindexados"""
+        if not self.loaded:
+            return 0
+        with self._load_lock:
+            return self._catch_up(session)
+
+    def _catch_up(self, session: Session) -> int:
+        now = time.monotonic()
+        while len(self._marks) > 1 and self._marks[1][0] <= now - self.late_window:
+            self._marks.popleft()
+        floor = self._marks[0][1]
+        self._applied = {event_id for event_id in self._applied if event_id > floor}
+
+        rows = session.exec(
+            select(OutboxEvent.id, OutboxEvent.aggregate_id)
+            .where(OutboxEvent.id > floor, OutboxEvent.aggregate_type == "product")
+            .order_by(OutboxEvent.id)
+        ).all()
+        new = [(event_id, product_id) for event_id, product_id in rows if event_id not in self._applied]
+        product_ids = list(dict.fromkeys(product_id for _, product_id in new))
+        for product_id in product_ids:
+            self.refresh_product(session, product_id)
+        self._applied.update(event_id for event_id, _ in new)
+        self._marks.append((now, rows[-1][0] if rows else self._marks[-1][1]))
+        return len(product_ids)
+
+    def upsert(self, product_id: int, category_id: int, price: float, gender_ids: Iterable[int]):
+        key = (category_id, tuple(sorted(set(gender_ids))))
+        with self._lock:
+            self._remove_locked(product_id)
+            insort(self._buckets.setdefault(key, []), price)
+            self._sums[key] = self._sums.get(key, 0.0) + price
+            self._products[product_id] = (key, price)
+
+    def remove(self, product_id: int):
+        with self._lock:
+            self._remove_locked(product_id)
+
+    def _remove_locked(self, product_id: int):
+        previous = self._products.pop(product_id, None)
+        if not previous:
+            return
+        key, price = previous
+        prices = self._buckets.get(key)
+        if prices is None:
+            return
+        i = bisect_left(prices, price)
+        if i < len(prices) and prices[i] == price:
+            prices.pop(i)
+            self._sums[key] -= price
+        if not prices:
+            del self._buckets[key]
+            del self._sums[key]
+
+    def refresh_product(self, session: Session, product_id: int):
+        """Reindexar un producto tras una escritura (o quitarlo si ya no existe)"""
+        if not self.loaded:
+            return
+        product = session.get(Product, product_id)
+        if not product:
+            self.remove(product_id)
+            return
+        gender_ids = session.exec(
+            select(GenderProduct.gender_id).where(GenderProduct.product_id == product_id)
+        ).all()
+        self.upsert(product_id, product.category_id, product.price, gender_ids)
+
+    def stats(
+        self,
+        categories: Optional[List[int]] = None,
+        genders: Optional[List[int]] = None,
+        buckets: int = 10
+    ) -> dict:
+        with self._lock:
+            return self._stats_locked(set(categories or ()), set(genders or ()), buckets)
+
+    def _stats_locked(self, category_set: set, gender_set: set, buckets: int) -> dict:
+        selected = [
+            (prices, self._sums[key])
+            for key, prices in self._buckets.items()
+            if (not category_set or key[0] in category_set)
+            and (not gender_set or gender_set.intersection(key[1]))
+        ]
+
+        count = sum(len(prices) for prices, _ in selected)
+        if not count:
+            return {"count": 0, "min_price": None, "max_price": None, "avg_price": None, "histogram": []}
+
+        low = min(prices[0] for prices, _ in selected)
+        high = max(prices[-1] for prices, _ in selected)
+        total = sum(s for _, s in selected)
+
+        bins = max(1, buckets) if high > low else 1
+        width = (high - low) / bins
+        edges = [low + width * i for i in range(bins)] + [high]
+        histogram = []
+        for i in range(bins):
+            lower, upper = edges[i], edges[i + 1]
+            last = i == bins - 1
+            in_bin = sum(
+                (bisect_right(prices, upper) if last else bisect_left(prices, upper)) - bisect_left(prices, lower)
+                for prices, _ in selected
+            )
+            histogram.append({"lower": lower, "upper": upper, "count": in_bin})
+
+        return {
+            "count": count,
+            "min_price": low,
+            "max_price": high,
+            "avg_price": total / count,
+            "histogram": histogram,
+        }
+
+
+price_index = PriceIndex()
+
+
+def refresh_price_index():
+    """Job periódico: recoge las escrituras de otros workers desde el outbox"""
+    from app.database import get_engine
+
+    with Session(get_engine()) as session:
+        if price_index.loaded and time.monotonic() - price_index.loaded_at < PRICE_STATS_FULL_RELOAD_SECONDS:
+            price_index.catch_up(session)
+        else:
+            price_index.load(session)
@@ -0,0 +1,55 @@
+# app/utils/product_filters.py
+"""
+Filtros de /products/filter y /products/summaries con formas de SQL canónicas.
+
+La caché de compilación de SQLAlchemy (y el digest de sentencias de MySQL)
+solo reutiliza una sentencia si su estructura es idéntica, así que ningún
+filtro añade una cláusula por cada valor pedido:
+
+- listas de IDs: un único IN con parámetro expandible; el SQL compilado es el
+  mismo con 1 o con 50 IDs y la lista se expande al ejecutar;
+- géneros: semijoin `id IN (SELECT product_id FROM gender_product WHERE
+  gender_id IN (...))` en vez de un JOIN más un EXISTS por género (el JOIN
+  además repetía el producto por cada género que coincidía). También en
+  product_summary: la lista empaquetada gender_ids solo se podría filtrar con
+  LIKE '%,x,%', que no usa índices; el semijoin usa
+  ix_gender_product_gender_id_product_id.
+"""
+from typing import Iterable, List, Optional
+
+from sqlmodel import select
+
+from app.models import GenderProduct, Product, ProductSummary
+
+
+def canonical_ids(ids: Optional[Iterable[int]]) -> List[int]:
+    """IDs ordenados y sin duplicados (mismos parámetros para la misma petición)"""
+    return sorted({int(i) for i in ids or ()})
+
+
+def _with_genders(genders: List[int]):
+    return select(GenderProduct.product_id).where(GenderProduct.gender_id.in_(canonical_ids(genders)))
+
+
+def product_filters(query, categories: Optional[List[int]] = None, genders: Optional[List[int]] = None,
+                    min_price: Optional[float] = None, max_price: Optional[float] = None):
+    """Filtros de /products/filter sobre un select de Product"""
+    if categories:
+        query = query.where(Product.category_id.in_(canonical_ids(categories)))
+    if genders:
+        query = query.where(Product.id.in_(_with_genders(genders)))
+    if min_price is not None and max_price is not None:
+        query = query.where(Product.price.between(min_price, max_price))
+    return query
+
+
+def summary_filters(query, categories: Optional[List[int]] = None, genders: Optional[List[int]] = None,
+                    min_price: Optional[float] = None, max_price: Optional[float] = None):
+    """Mismos filtros sobre product_summary (sin joins: los géneros van por semijoin)"""
+    if categories:
+        query = query.where(ProductSummary.category_id.in_(canonical_ids(categories)))
+    if genders:
+        query = query.where(ProductSummary.product_id.in_(_with_genders(genders)))
+    if min_price is not None and max_price is not None:
+        query = query.where(ProductSummary.price.between(min_price, max_price))
+    return query
@@ -0,0 +1,131 @@
+# app/utils/product_summary.py
+from typing import Iterable, List, Optional
+
+from sqlmodel import Session, select, update, delete
+
+from app.models import (
+    Brand, Category, ColorProduct, GenderProduct, MaterialProduct,
+    Product, ProductSize, ProductSummary
+)
+from app.models.image import Image
+from app.models.product import name_sort_key
+
+
+def pack_ids(ids: Iterable[int]) -> str:
+    """Empaquetar IDs como ",1,4,7," (ordenados y sin duplicados)"""
+    unique_ids = sorted(set(ids))
+    if not unique_ids:
+        return ","
+    return "," + ",".join(str(i) for i in unique_ids) + ","
+
+
+def unpack_ids(packed: Optional[str]) -> List[int]:
+    """Inverso de pack_ids"""
+    if not packed:
+        return []
+    return [int(i) for i in packed.strip(",").split(",") if i]
+
+
+def _link_ids(session: Session, link_model, column, product_id: int) -> List[int]:
+    return list(session.exec(select(column).where(link_model.product_id == product_id)).all())
+
+
+def refresh_product_summary(session: Session, product_id: int) -> Optional[ProductSummary]:
+    """
+    Recalcular la fila de resumen de un producto dentro de la transacción actual.
+    No hace commit: se llama desde las rutas de escritura antes de su commit único.
+    """
+    product = session.get(Product, product_id)
+    if not product:
+        delete_product_summary(session, product_id)
+        return None
+
+    brand = session.get(Brand, product.brand_id)
+    category = session.get(Category, product.category_id)
+    primary_image = session.exec(
+        select(Image.url)
+        .where(Image.product_id == product_id)
+        .order_by(Image.order, Image.id)
+        .limit(1)
+    ).first()
+
+    summary = session.exec(
+        select(ProductSummary).where(ProductSummary.product_id == product_id)
+    ).first()
+    if not summary:
+        summary = ProductSummary(product_id=product_id, user_id=product.user_id, name=product.name,
+                                 price=product.price, brand_id=product.brand_id,
+                                 category_id=product.category_id)
+
+    summary.user_id = product.user_id
+    summary.name = product.name
+    summary.sort_name = product.sort_name or name_sort_key(product.name)
+    summary.price = product.price
+    summary.quantity = product.quantity
+    summary.description = product.description
+    summary.brand_id = product.brand_id
+    summary.brand_name = brand.name if brand else None
+    summary.category_id = product.category_id
+    summary.category_name = category.name if category else None
+    summary.primary_image_url = primary_image
+    summary.color_ids = pack_ids(_link_ids(session, ColorProduct, ColorProduct.color_id, product_id))
+    summary.gender_ids = pack_ids(_link_ids(session, GenderProduct, GenderProduct.gender_id, product_id))
+    summary.material_ids = pack_ids(_link_ids(session, MaterialProduct, MaterialProduct.material_id, product_id))
+    summary.size_ids = pack_ids(_link_ids(session, ProductSize, ProductSize.size_id, product_id))
+
+    session.add(summary)
+    return summary
+
+
+def adjust_summary_quantity(session: Session, product_id: int, delta: int):
+    """Sumar `delta` a la cantidad del resumen, en la transacción que cambió products.quantity (sin commit)"""
+    session.exec(
+        update(ProductSummary)
+        .where(ProductSummary.product_id == product_id)
+        .values(quantity=ProductSummary.quantity + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def delete_product_summary(session: Session, product_id: int):
+    """Eliminar la fila de resumen de un producto (sin commit)"""
+    session.exec(delete(ProductSummary).where(ProductSummary.product_id == product_id))
+
+
+def rebuild_product_summaries(session: Session, batch_size: int = 500) -> int:
+    """
+    Reconstruir la tabla product_summary sin vaciarla: se reescriben las filas
+    por lotes y al final se borran las de productos que ya no existen, así
+    /products/summaries sigue respondiendo completo durante la reconstrucción.
+    """
+    total = 0
+    last_id = 0
+    while True:
+        ids = session.exec(
+            select(Product.id).where(Product.id > last_id).order_by(Product.id).limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        for product_id in ids:
+            refresh_product_summary(session, product_id)
+        session.commit()
+        session.expunge_all()
+        total += len(ids)
+        last_id = ids[-1]
+
+    live = select(Product.id).where(Product.id == ProductSummary.product_id, Product.deleted_at.is_(None))
+    session.exec(delete(ProductSummary).where(~live.exists()))
+    session.commit()
+    return total
+
+
+def main():
+    from app.database import get_engine
+
+    with Session(get_engine()) as session:
+        total = rebuild_product_summaries(session)
+    print(f"✅ product_summary reconstruida: {total} productos.")
+
+
+if __name__ == "__main__":
+    main()
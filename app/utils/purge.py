@@ -0,0 +1,88 @@
+# app/utils/purge.py
+"""
+Purga en segundo plano de productos borrados lógicamente.
+
+DELETE /products/{id} solo marca `deleted_at`; aquí se eliminan de verdad, en
+lotes pequeños y con pausas entre ellos para no retener locks ni saturar la BD.
+Cada lote limpia las tablas hijas con un DELETE por tabla (WHERE product_id IN ...).
+
+    python -m app.utils.purge
+"""
+import time
+from datetime import timedelta
+from typing import List
+
+from sqlmodel import Session, select, delete, func
+
+from app.config import (
+    PRODUCT_PURGE_GRACE_SECONDS, PRODUCT_PURGE_BATCH_SIZE,
+    PRODUCT_PURGE_MAX_BATCHES, PRODUCT_PURGE_PAUSE_SECONDS
+)
+from app.models import (
+    ColorProduct, GenderProduct, MaterialProduct, Product, ProductNeighbor, ProductSize, ProductStats,
+    ProductSummary, ProductStockShard, StockReservation
+)
+from app.models.image import Image
+
+# Tablas que referencian products.id, en orden de borrado
+CHILD_TABLES = [
+    ColorProduct, GenderProduct, MaterialProduct, ProductSize, Image, ProductSummary,
+    StockReservation, ProductStockShard, ProductNeighbor, ProductStats,
+]
+
+
+def purge_batch(session: Session, batch_size: int = PRODUCT_PURGE_BATCH_SIZE,
+                grace_seconds: int = PRODUCT_PURGE_GRACE_SECONDS) -> List[int]:
+    """Eliminar un lote de productos borrados hace más de `grace_seconds`; devuelve sus IDs"""
+    # Hora de la BD: el mismo reloj que escribió deleted_at
+    cutoff = session.exec(select(func.now())).one() - timedelta(seconds=grace_seconds)
+
+    ids = list(session.exec(
+        select(Product.id)
+        .where(Product.deleted_at.is_not(None), Product.deleted_at <= cutoff)
+        .order_by(Product.id)
+        .limit(batch_size)
+        .execution_options(include_deleted=True)
+    ).all())
+    if not ids:
+        return []
+
+    for model in CHILD_TABLES:
+        session.exec(delete(model).where(model.product_id.in_(ids)))
+    # Y las listas de otros productos que aún los tengan como vecinos
+    session.exec(delete(ProductNeighbor).where(ProductNeighbor.neighbor_id.in_(ids)))
+    session.exec(delete(Product).where(Product.id.in_(ids)))
+    session.commit()
+    return ids
+
+
+def purge_deleted_products(session: Session, max_batches: int = PRODUCT_PURGE_MAX_BATCHES,
+                           pause: float = PRODUCT_PURGE_PAUSE_SECONDS) -> int:
+    """Purgar lotes hasta vaciar la cola o llegar a `max_batches`, con pausa entre lotes"""
+    total = 0
+    for _ in range(max_batches):
+        ids = purge_batch(session)
+        total += len(ids)
+        if len(ids) < PRODUCT_PURGE_BATCH_SIZE:
+            break
+        time.sleep(pause)
+    return total
+
+
+def purge_job():
+    from app.database import get_engine
+
+    with Session(get_engine()) as session:
+        purge_deleted_products(session)
+
+
+def main():
+    from app.database import get_engine
+
+    with Session(get_engine()) as session:
+        total = purge_deleted_products(session, max_batches=10**9)
+    print(f"✅ Productos purgados: {total}")
+
+
+if __name__ == "__main__":
+    main()
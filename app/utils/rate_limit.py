@@ -0,0 +1,215 @@
+# app/utils/rate_limit.py
+import ipaddress
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from starlette.concurrency import run_in_threadpool
+
+from app.config import (
+    RATE_LIMIT_ENABLED, RATE_LIMIT_BACKEND, REDIS_URL, RATE_LIMITS, AUTH_MAX_CONCURRENCY, TRUSTED_PROXIES
+)
+
+
+class InMemoryBackend:
+    """
+    Token bucket por clave, en memoria del proceso (un worker).
+
+    Los buckets se guardan por ventana, cada grupo en orden de último acceso:
+    al frente están los que llevan más tiempo sin usarse, y uno inactivo más
+    de su propia ventana ya está lleno y se puede olvidar. Cada hit retira
+    del frente solo esos (coste amortizado constante, sin recorrer el dict).
+    Por encima de max_keys se olvidan los que antes volverían a estar llenos.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # ventana -> clave -> (tokens, último acceso)
+        self._buckets: Dict[float, "OrderedDict[str, Tuple[float, float]]"] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: float) -> Tuple[bool, float]:
+        """Consumir un token. Devuelve (permitido, segundos hasta el próximo token)."""
+        rate = limit / window
+        now = time.monotonic()
+        with self._lock:
+            buckets = self._buckets.setdefault(window, OrderedDict())
+            previous = buckets.pop(key, None)
+            if previous is None:
+                tokens, last = float(limit), now
+            else:
+                tokens, last = previous
+                self._size -= 1
+            tokens = min(float(limit), tokens + (now - last) * rate)
+            if tokens >= 1:
+                buckets[key] = (tokens - 1, now)
+                allowed, retry_after = True, 0.0
+            else:
+                buckets[key] = (tokens, now)
+                allowed, retry_after = False, (1 - tokens) / rate
+            self._size += 1
+            self._evict(buckets, now, window)
+        return allowed, retry_after
+
+    def _evict(self, buckets: "OrderedDict[str, Tuple[float, float]]", now: float, window: float):
+        # Inactivas más de su ventana: el bucket ya está lleno, olvidarlo no cambia nada
+        while buckets:
+            _, (_, last) = next(iter(buckets.items()))
+            if now - last <= window:
+                break
+            buckets.popitem(last=False)
+            self._size -= 1
+        # Tope de memoria: fuera el bucket que antes se llenaría solo (último
+        # acceso + ventana), así una ventana corta no resetea las largas
+        while self._size > self.max_keys:
+            _, group = min(((w, group) for w, group in self._buckets.items() if group),
+                                key=lambda item: next(iter(item[1].values()))[1] + item[0])
+            group.popitem(last=False)
+            self._size -= 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+            self._size = 0
+
+
+class RedisBackend:
+    """
+    Ventana deslizante aproximada (contador de la ventana actual + la anterior ponderada)
+    sobre Redis, compartida entre todos los workers. Requiere el paquete `redis`.
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requiere instalar el paquete 'redis'")
+        self._redis = redis.Redis.from_url(url)
+
+    def hit(self, key: str, limit: int, window: float) -> Tuple[bool, float]:
+        now = time.time()
+        current = int(now // window)
+        elapsed = now - current * window
+        current_key = f"rl:{key}:{current}"
+        previous_key = f"rl:{key}:{current - 1}"
+
+        pipe = self._redis.pipeline()
+        pipe.incr(current_key)
+        pipe.expire(current_key, int(math.ceil(window * 2)))
+        pipe.get(previous_key)
+        count, _, previous = pipe.execute()
+
+        weighted = int(previous or 0) * (1 - elapsed / window) + count
+        if weighted <= limit:
+            return True, 0.0
+        return False, window - elapsed
+
+    def reset(self):
+        for key in self._redis.scan_iter("rl:*"):
+            self._redis.delete(key)
+
+
+def _make_backend():
+    if RATE_LIMIT_BACKEND == "redis":
+        return RedisBackend(REDIS_URL)
+    return InMemoryBackend()
+
+
+backend = _make_backend()
+
+
+def _parse_networks(values: List[str]) -> list:
+    return [ipaddress.ip_network(value, strict=False) for value in values]
+
+
+_trusted_networks = _parse_networks(TRUSTED_PROXIES)
+
+
+def _is_trusted(host: str, networks: list) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in networks)
+
+
+def client_ip(request: Request, trusted: Optional[list] = None) -> str:
+    """
+    IP del cliente para los límites. X-Forwarded-For solo cuenta si la
+    conexión viene de un proxy de TRUSTED_PROXIES, y entonces se toma el salto
+    más a la derecha que no sea un proxy de confianza: los valores de la
+    izquierda los escribe el cliente y no sirven para identificarlo.
+    """
+    networks = _trusted_networks if trusted is None else trusted
+    peer = request.client.host if request.client else "unknown"
+    forwarded = request.headers.get("x-forwarded-for")
+    if not forwarded or not _is_trusted(peer, networks):
+        return peer
+    for hop in reversed([hop.strip() for hop in forwarded.split(",") if hop.strip()]):
+        if not _is_trusted(hop, networks):
+            return hop
+    return peer
+
+
+def enforce_rate_limit(request: Request, scope: str, identity: Optional[str] = None):
+    """
+    Aplicar los límites configurados para `scope` por IP y, si se da, por
+    identidad (email o id de usuario). Lanza 429 con Retry-After si se excede.
+    """
+    if not RATE_LIMIT_ENABLED:
+        return
+
+    limits = RATE_LIMITS.get(scope)
+    if not limits:
+        return
+
+    checks = [("ip", client_ip(request), limits["ip"])]
+    if identity and "identity" in limits:
+        checks.append(("id", identity.strip().lower(), limits["identity"]))
+
+    for kind, value, (limit, window) in checks:
+        allowed, retry_after = backend.hit(f"{scope}:{kind}:{value}", limit, window)
+        if not allowed:
+            raise HTTPException(
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                "Demasiadas solicitudes, intenta más tarde",
+                headers={"Retry-After": str(int(math.ceil(retry_after)))},
+            )
+
+
+async def enforce_rate_limit_async(request: Request, scope: str, identity: Optional[str] = None):
+    """enforce_rate_limit para handlers async: con Redis la consulta de red va fuera del event loop"""
+    if isinstance(backend, InMemoryBackend):
+        enforce_rate_limit(request, scope, identity)
+    else:
+        await run_in_threadpool(enforce_rate_limit, request, scope, identity)
+
+
+class ConcurrencyLimiter:
+    """Limita las peticiones simultáneas; si no hay hueco responde 503 al instante"""
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+
+    def __call__(self):
+        if not self._semaphore.acquire(blocking=False):
+            raise HTTPException(
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                "Servidor ocupado, intenta de nuevo",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+
+limit_auth_concurrency = ConcurrencyLimiter(AUTH_MAX_CONCURRENCY)
@@ -0,0 +1,15 @@
+# app/utils/responses.py
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+def adapter_response(adapter: TypeAdapter, data: Any, status_code: int = 200) -> Response:
+    """
+    Validar filas ORM con un TypeAdapter ya compilado y serializarlas a JSON en
+    pydantic-core. Al devolver un Response, FastAPI no repite la validación ni
+    pasa por jsonable_encoder; `response_model` se mantiene para la documentación.
+    """
+    content = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    return Response(content=content, media_type="application/json", status_code=status_code)
@@ -0,0 +1,127 @@
+# app/utils/runtime.py
+import asyncio
+import inspect
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, List, Optional
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+
+def _limiter():
+    import anyio.to_thread
+
+    return anyio.to_thread.current_default_thread_limiter()
+
+
+def configure_threadpool(size: int):
+    """Fijar los hilos de anyio que ejecutan rutas y dependencias síncronas (def)"""
+    _limiter().total_tokens = size
+
+
+def threadpool_stats() -> dict:
+    limiter = _limiter()
+    stats = limiter.statistics()
+    return {
+        "total": limiter.total_tokens,
+        "in_use": stats.borrowed_tokens,
+        "waiting": stats.tasks_waiting,
+        "saturation": stats.borrowed_tokens / limiter.total_tokens if limiter.total_tokens else 0.0,
+    }
+
+
+def _sync_calls(dependant) -> List[str]:
+    """Dependencias síncronas de una ruta: también se ejecutan en el threadpool"""
+    names = []
+    for dependency in dependant.dependencies:
+        call = dependency.call
+        if call is None:
+            continue
+        target = call if inspect.isroutine(call) else getattr(call, "__call__", call)
+        if not (inspect.iscoroutinefunction(target) or inspect.isasyncgenfunction(target)):
+            names.append(getattr(call, "__name__", type(call).__name__))
+        names.extend(_sync_calls(dependency))
+    return names
+
+
+def route_report(app: FastAPI) -> List[dict]:
+    """Qué rutas corren en el event loop y cuáles en el threadpool"""
+    report = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        is_async = asyncio.iscoroutinefunction(route.endpoint)
+        report.append({
+            "path": route.path,
+            "methods": sorted(route.methods),
+            "name": route.name,
+            "endpoint": "event_loop" if is_async else "threadpool",
+            "sync_dependencies": _sync_calls(route.dependant),
+        })
+    return report
+
+
+class LoopBlockingMonitor:
+    """
+    Detecta bloqueos del event loop: una tarea marca un latido cada `interval`
+    segundos y un hilo vigilante, si el latido se retrasa más de `threshold_ms`,
+    guarda la pila del hilo del loop en ese momento (el código que lo bloquea).
+    """
+
+    def __init__(self, threshold_ms: float, interval: float = 0.05, max_reports: int = 50):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval
+        self.reports: Deque[dict] = deque(maxlen=max_reports)
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self):
+        """Llamar desde el hilo del event loop (p. ej. en el lifespan)"""
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._watchdog:
+            self._watchdog.join(1)
+            self._watchdog = None
+
+    async def _heartbeat(self):
+        while True:
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stop.wait(self.interval):
+            beat = self._last_beat
+            lag = time.monotonic() - beat - self.interval
+            if lag < self.threshold or beat == reported_beat:
+                continue
+            # Un solo reporte por bloqueo
+            reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            self.reports.append({"blocked_ms": round(lag * 1000, 1), "at": time.time(), "stack": stack})
+            print(f"⚠️ Event loop bloqueado {lag * 1000:.0f} ms en:\n{stack}")
+
+    def recent(self) -> List[dict]:
+        return list(self.reports)
+
+
+loop_monitor: Optional[LoopBlockingMonitor] = None
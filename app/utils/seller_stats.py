@@ -0,0 +1,137 @@
+# app/utils/seller_stats.py
+"""
+Rollup de estadísticas por vendedor (seller_category_stats).
+
+Las rutas de escritura de productos aplican deltas en la misma transacción
+(apply_product_change) y las reservas de stock también (apply_quantity_changes).
+El stock de los productos fraccionados cambia al consolidarse, y entonces se
+recalcula a los vendedores tocados (recompute_sellers).
+
+    python -m app.utils.seller_stats   # reconstruir todo el rollup
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, update, delete, func
+
+from app.models import Product, SellerCategoryStats
+
+# (user_id, category_id, price, quantity) de un producto vivo
+ProductState = Tuple[int, int, float, Optional[int]]
+
+
+def product_state(product: Product) -> ProductState:
+    return product.user_id, product.category_id, product.price, product.quantity
+
+
+def _apply_delta(session: Session, user_id: int, category_id: int,
+                 count: int, quantity: int, value: float):
+    if not (count or quantity or value):
+        return
+    values = dict(
+        product_count=SellerCategoryStats.product_count + count,
+        total_quantity=SellerCategoryStats.total_quantity + quantity,
+        total_value=SellerCategoryStats.total_value + value,
+    )
+    statement = (
+        update(SellerCategoryStats)
+        .where(SellerCategoryStats.user_id == user_id, SellerCategoryStats.category_id == category_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if session.exec(statement).rowcount:
+        return
+    # Primera fila de esta categoría para el vendedor; si otra transacción la
+    # insertó a la vez, el índice único lo detecta y se vuelve al UPDATE
+    try:
+        with session.begin_nested():
+            session.add(SellerCategoryStats(user_id=user_id, category_id=category_id, product_count=count,
+                                            total_quantity=quantity, total_value=value))
+    except IntegrityError:
+        session.exec(statement)
+
+
+def apply_product_change(session: Session, before: Optional[ProductState], after: Optional[ProductState]):
+    """
+    Aplicar al rollup el cambio de un producto (sin commit).
+    before=None es un alta, after=None una baja.
+    """
+    for state, sign in ((before, -1), (after, 1)):
+        if state is None:
+            continue
+        user_id, category_id, price, quantity = state
+        quantity = quantity or 0
+        _apply_delta(session, user_id, category_id, sign, sign * quantity, sign * price * quantity)
+
+
+def apply_quantity_changes(session: Session, changes: Dict[int, int]):
+    """
+    Aplicar cambios de stock {product_id: delta} (sin commit). Las filas del
+    rollup se actualizan en orden (vendedor, categoría) para que dos lotes de
+    reservas concurrentes no se bloqueen entre sí.
+    """
+    if not changes:
+        return
+    deltas: Dict[Tuple[int, int], Tuple[int, float]] = {}
+    for product_id, user_id, category_id, price in session.exec(
+        select(Product.id, Product.user_id, Product.category_id, Product.price).where(Product.id.in_(changes))
+    ).all():
+        quantity, value = deltas.get((user_id, category_id), (0, 0.0))
+        delta = changes[product_id]
+        deltas[(user_id, category_id)] = (quantity + delta, value + price * delta)
+    for (user_id, category_id), (quantity, value) in sorted(deltas.items()):
+        _apply_delta(session, user_id, category_id, 0, quantity, value)
+
+
+def recompute_sellers(session: Session, user_ids: Iterable[int]):
+    """Recalcular desde products el rollup de algunos vendedores (sin commit)"""
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    session.exec(delete(SellerCategoryStats).where(SellerCategoryStats.user_id.in_(user_ids)))
+    rows = session.exec(
+        select(
+            Product.user_id,
+            Product.category_id,
+            func.count(Product.id),
+            func.coalesce(func.sum(Product.quantity), 0),
+            func.coalesce(func.sum(Product.price * func.coalesce(Product.quantity, 0)), 0),
+        )
+        .where(Product.user_id.in_(user_ids))
+        .group_by(Product.user_id, Product.category_id)
+    ).all()
+    for user_id, category_id, count, quantity, value in rows:
+        session.add(SellerCategoryStats(user_id=user_id, category_id=category_id, product_count=count,
+                                        total_quantity=quantity, total_value=value))
+
+
+def rebuild_seller_stats(session: Session, batch_size: int = 200) -> int:
+    """Reconstruir el rollup completo, por lotes de vendedores"""
+    total = 0
+    last_id = 0
+    while True:
+        user_ids = session.exec(
+            select(Product.user_id).where(Product.user_id > last_id)
+            .group_by(Product.user_id).order_by(Product.user_id).limit(batch_size)
+        ).all()
+        if not user_ids:
+            break
+        recompute_sellers(session, user_ids)
+        session.commit()
+        total += len(user_ids)
+        last_id = user_ids[-1]
+    return total
+
+
+def main():
+    from app.database import get_engine
+
+    with Session(get_engine()) as session:
+        session.exec(delete(SellerCategoryStats))
+        session.commit()
+        total = rebuild_seller_stats(session)
+    print(f"✅ seller_category_stats reconstruida: {total} vendedores.")
+
+
+if __name__ == "__main__":
+    main()
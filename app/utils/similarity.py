@@ -0,0 +1,243 @@
+# app/utils/similarity.py
+"""
+Productos similares precalculados (tabla product_neighbors).
+
+Cada producto vivo se describe con un vector binario de atributos: su
+categoría, su marca y sus colores, géneros, materiales y tallas. La similitud
+es el índice de Jaccard entre dos vectores:
+
+    |A ∩ B| / (|A| + |B| - |A ∩ B|)
+
+Las intersecciones de un lote de filas contra todo el catálogo salen de un solo
+producto de matrices (lote × atributos · atributos × productos), y el top-K de
+cada fila se elige con argpartition, sin ordenar la fila completa.
+
+El refresco incremental recalcula solo lo que cambió desde la última pasada:
+los productos tocados, los que los tenían como vecinos y los que ahora los
+tendrían. Carga la matriz de todo el catálogo, así que corre en un solo
+proceso: por cron o, con SIMILARITY_JOB_ENABLED=true, en el worker 0.
+
+    python -m app.utils.similarity                 # recalcular todo el catálogo
+    python -m app.utils.similarity --incremental   # solo lo cambiado (cron)
+"""
+import argparse
+from datetime import timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlmodel import Session, select, delete, insert, func
+
+from app.config import SIMILARITY_TOP_K, SIMILARITY_BATCH_SIZE, SYNC_SAFETY_LAG_SECONDS
+from app.models import (
+    ColorProduct, GenderProduct, MaterialProduct, Product, ProductDeletion, ProductNeighbor, ProductSize
+)
+
+# Columnas (tabla, columna del atributo) de los atributos con varios valores
+LINK_ATTRIBUTES = [
+    ("color", ColorProduct, ColorProduct.color_id),
+    ("gender", GenderProduct, GenderProduct.gender_id),
+    ("material", MaterialProduct, MaterialProduct.material_id),
+    ("size", ProductSize, ProductSize.size_id),
+]
+
+INSERT_CHUNK = 1000
+
+
+class AttributeVectors:
+    """Matriz binaria productos × atributos (float32, para multiplicar con BLAS)"""
+
+    def __init__(self, ids: np.ndarray, matrix: np.ndarray):
+        self.ids = ids
+        self.matrix = matrix
+        self.sizes = matrix.sum(axis=1)
+        self.row_of: Dict[int, int] = {int(product_id): row for row, product_id in enumerate(ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def scores(self, rows: np.ndarray) -> np.ndarray:
+        """Jaccard de las filas `rows` contra todos los productos (len(rows) × N)"""
+        inter = self.matrix[rows] @ self.matrix.T
+        union = self.sizes[rows, None] + self.sizes[None, :] - inter
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(union > 0, inter / union, 0.0)
+        # Un producto no es vecino de sí mismo
+        scores[np.arange(len(rows)), rows] = -1.0
+        return scores
+
+
+def load_vectors(session: Session) -> AttributeVectors:
+    """Construir los vectores de atributos de todos los productos vivos"""
+    products = session.exec(select(Product.id, Product.category_id, Product.brand_id).order_by(Product.id)).all()
+    ids = np.array([row[0] for row in products], dtype=np.int64)
+    row_of = {int(product_id): row for row, product_id in enumerate(ids)}
+
+    columns: Dict[Tuple[str, int], int] = {}
+    coords_rows: List[int] = []
+    coords_cols: List[int] = []
+
+    def add(row: int, key: Tuple[str, int]):
+        coords_rows.append(row)
+        coords_cols.append(columns.setdefault(key, len(columns)))
+
+    for product_id, category_id, brand_id in products:
+        row = row_of[product_id]
+        add(row, ("category", category_id))
+        add(row, ("brand", brand_id))
+
+    for name, model, column in LINK_ATTRIBUTES:
+        for product_id, value in session.exec(select(model.product_id, column)).all():
+            # Las tablas de enlace aún conservan filas de productos borrados
+            row = row_of.get(product_id)
+            if row is not None:
+                add(row, (name, value))
+
+    matrix = np.zeros((len(ids), max(len(columns), 1)), dtype=np.float32)
+    matrix[coords_rows, coords_cols] = 1.0
+    return AttributeVectors(ids, matrix)
+
+
+def top_neighbors(vectors: AttributeVectors, product_ids: Iterable[int], k: int = SIMILARITY_TOP_K,
+                  batch_size: int = SIMILARITY_BATCH_SIZE) -> Iterator[Tuple[int, List[Tuple[int, float]]]]:
+    """(product_id, [(neighbor_id, score), ...]) de mayor a menor similitud, por lotes"""
+    rows = np.array(sorted(vectors.row_of[p] for p in product_ids if p in vectors.row_of), dtype=np.int64)
+    k = min(k, len(vectors) - 1)
+    if k <= 0:
+        return
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        scores = vectors.scores(batch)
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        candidate_ids = vectors.ids[candidates]
+        # Mayor similitud primero; a igualdad, el ID menor (orden estable entre pasadas)
+        order = np.lexsort((candidate_ids, -candidate_scores), axis=1)
+        candidate_ids = np.take_along_axis(candidate_ids, order, axis=1)
+        candidate_scores = np.take_along_axis(candidate_scores, order, axis=1)
+        for row, ids, row_scores in zip(batch, candidate_ids, candidate_scores):
+            keep = row_scores > 0
+            yield int(vectors.ids[row]), list(zip(ids[keep].tolist(), row_scores[keep].tolist()))
+
+
+def _affected_by(session: Session, vectors: AttributeVectors, changed: Set[int], deleted: Set[int],
+                 k: int, batch_size: int) -> Set[int]:
+    """Productos cuya lista de vecinos puede cambiar por `changed` y `deleted`"""
+    affected = {p for p in changed if p in vectors.row_of}
+    touched = list(changed | deleted)
+    for start in range(0, len(touched), INSERT_CHUNK):
+        chunk = touched[start:start + INSERT_CHUNK]
+        affected.update(session.exec(
+            select(ProductNeighbor.product_id).where(ProductNeighbor.neighbor_id.in_(chunk)).distinct()
+        ).all())
+
+    rows = np.array([vectors.row_of[p] for p in changed if p in vectors.row_of], dtype=np.int64)
+    if not len(rows):
+        return affected
+
+    # Peor vecino guardado de cada producto: si un producto cambiado lo supera, entra en su lista
+    threshold = np.zeros(len(vectors), dtype=np.float32)
+    for product_id, worst, count in session.exec(
+        select(ProductNeighbor.product_id, func.min(ProductNeighbor.score), func.count())
+        .group_by(ProductNeighbor.product_id)
+    ).all():
+        row = vectors.row_of.get(product_id)
+        if row is not None and count >= k:
+            threshold[row] = worst
+
+    # Jaccard es simétrico: score(c, j) es también lo que j vería de c
+    for start in range(0, len(rows), batch_size):
+        scores = vectors.scores(rows[start:start + batch_size])
+        hits = np.nonzero(((scores > threshold[None, :]) & (scores > 0)).any(axis=0))[0]
+        affected.update(vectors.ids[hits].tolist())
+    return affected
+
+
+def _write_neighbors(session: Session, product_ids: List[int], neighbors: Dict[int, List[Tuple[int, float]]],
+                     computed_at):
+    for start in range(0, len(product_ids), INSERT_CHUNK):
+        chunk = product_ids[start:start + INSERT_CHUNK]
+        session.exec(delete(ProductNeighbor).where(ProductNeighbor.product_id.in_(chunk)))
+    rows = [
+        dict(product_id=product_id, rank=rank, neighbor_id=neighbor_id, score=score, computed_at=computed_at)
+        for product_id in product_ids
+        for rank, (neighbor_id, score) in enumerate(neighbors.get(product_id, ()))
+    ]
+    for start in range(0, len(rows), INSERT_CHUNK):
+        session.exec(insert(ProductNeighbor).values(rows[start:start + INSERT_CHUNK]))
+
+
+def refresh_neighbors(session: Session, changed: Optional[Iterable[int]] = None, deleted: Iterable[int] = (),
+                      k: int = SIMILARITY_TOP_K, batch_size: int = SIMILARITY_BATCH_SIZE) -> int:
+    """
+    Recalcular vecinos. changed=None recalcula todo el catálogo; si no, solo
+    los productos afectados por `changed` y `deleted`. Devuelve cuántos productos
+    se recalcularon (con commit).
+    """
+    computed_at = session.exec(select(func.now())).one()
+    vectors = load_vectors(session)
+    deleted = set(deleted)
+
+    if changed is None:
+        targets = vectors.ids.tolist()
+    else:
+        targets = sorted(_affected_by(session, vectors, set(changed), deleted, k, batch_size))
+        gone = sorted(p for p in deleted if p not in vectors.row_of)
+        if gone:
+            _write_neighbors(session, gone, {}, computed_at)
+
+    for start in range(0, len(targets), batch_size):
+        chunk = targets[start:start + batch_size]
+        _write_neighbors(session, chunk, dict(top_neighbors(vectors, chunk, k, batch_size)), computed_at)
+        session.commit()
+    if changed is None:
+        # Se reescribe por lotes sin vaciar la tabla antes; al final sobran las
+        # listas de productos que ya no existen. Se borran por producto y no
+        # por computed_at, para no tocar lo que escribe otra pasada a la vez
+        live = select(Product.id).where(Product.id == ProductNeighbor.product_id, Product.deleted_at.is_(None))
+        session.exec(delete(ProductNeighbor).where(~live.exists()))
+    session.commit()
+    return len(targets)
+
+
+_last_refresh = None
+
+
+def similarity_job():
+    from app.database import get_engine
+
+    global _last_refresh
+    with Session(get_engine()) as session:
+        now = session.exec(select(func.now())).one()
+        since = _last_refresh or session.exec(select(func.max(ProductNeighbor.computed_at))).one()
+        if since is None:
+            refresh_neighbors(session)
+        else:
+            since -= timedelta(seconds=SYNC_SAFETY_LAG_SECONDS)
+            changed = session.exec(select(Product.id).where(Product.updated_at >= since)).all()
+            deleted = session.exec(
+                select(ProductDeletion.product_id).where(ProductDeletion.created_at >= since)
+            ).all()
+            if changed or deleted:
+                refresh_neighbors(session, changed, deleted)
+        _last_refresh = now
+
+
+def main():
+    from app.database import get_engine
+
+    parser = argparse.ArgumentParser(description="Recalcular productos similares (product_neighbors)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="solo los productos cambiados o borrados desde la última pasada")
+    args = parser.parse_args()
+
+    if args.incremental:
+        similarity_job()
+        print("✅ product_neighbors actualizada.")
+        return
+    with Session(get_engine()) as session:
+        total = refresh_neighbors(session)
+    print(f"✅ product_neighbors recalculada: {total} productos.")
+
+
+if __name__ == "__main__":
+    main()
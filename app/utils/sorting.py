@@ -0,0 +1,170 @@
+# app/utils/sorting.py
+"""
+Registro de órdenes para los listados de productos.
+
+Cada orden es una lista de claves (columna, descendente); el id se añade
+siempre como desempate final, en la dirección de la última clave, para que el
+orden sea estable entre páginas. Solo se aceptan los órdenes registrados y
+cada uno declara el índice de products que lo sirve (se comprueba al importar
+que exista en los modelos), así la BD recorre el índice en vez de ordenar las
+filas (filesort). Un listado solo admite los órdenes cuyas claves tiene
+(ver sort_names).
+
+    ?sort=price,newest          precio ascendente y, a igual precio, el más nuevo
+    python -m app.utils.sorting rellenar products.sort_name en filas antiguas
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlmodel import Session, SQLModel, select, update
+
+from app.models import Product, ProductStats
+from app.models.product import name_sort_key
+
+SortKey = Tuple[str, bool]  # (clave, descendente)
+
+
+class SortOption:
+    def __init__(self, name: str, keys: List[SortKey], index: str, join: Optional[str] = None,
+                 tiebreaker: str = "id"):
+        self.name = name
+        self.keys = keys
+        self.index = index
+        # Tabla que hay que unir para tener las claves (ver PRODUCT_SORT_JOINS)
+        self.join = join
+        # Desempate: la columna de id que cubre el índice del orden
+        self.tiebreaker = tiebreaker
+
+    @property
+    def descending(self) -> bool:
+        return self.keys[-1][1] if self.keys else False
+
+    def order_by(self, columns: Dict[str, Any]) -> list:
+        """Expresiones ORDER BY con las columnas de un modelo; KeyError si le falta alguna"""
+        clauses = [columns[key].desc() if desc else columns[key] for key, desc in self.keys]
+        id_column = columns[self.tiebreaker]
+        clauses.append(id_column.desc() if self.descending else id_column)
+        return clauses
+
+
+SORTS: Dict[str, SortOption] = {}
+
+
+def register_sort(name: str, *keys: SortKey, index: str, join: Optional[str] = None, tiebreaker: str = "id"):
+    SORTS[name] = SortOption(name, list(keys), index, join, tiebreaker)
+
+
+register_sort("id", index="PRIMARY")
+register_sort("name", ("name", False), index="ix_products_sort_name_id")
+register_sort("price", ("price", False), index="ix_products_price_id")
+register_sort("-price", ("price", True), index="ix_products_price_id")
+register_sort("newest", ("created_at", True), index="ix_products_created_at_id")
+register_sort("price,newest", ("price", False), ("created_at", True), index="ix_products_price_created_at_id")
+register_sort("popular", ("popularity", True), index="ix_product_stats_popularity_product_id",
+              join="product_stats", tiebreaker="stats_product_id")
+
+
+
+def _check_indexes():
+    """Cada orden debe declarar un índice que exista en los modelos"""
+    names = {index.name for table in SQLModel.metadata.tables.values() for index in table.indexes}
+    missing = [f"{option.name} -> {option.index}" for option in SORTS.values()
+               if option.index != "PRIMARY" and option.index not in names]
+    if missing:
+        raise RuntimeError(f"Órdenes con índices inexistentes: {', '.join(missing)}")
+
+
+_check_indexes()
+
+# Valores anteriores de ?order_by=
+LEGACY_ORDER_BY = {0: "id", 1: "name", 2: "price", 3: "-price"}
+
+# Columnas de cada listado para las claves del registro
+PRODUCT_SORT_COLUMNS = {
+    "id": Product.id,
+    "name": Product.sort_name,
+    "price": Product.price,
+    "created_at": Product.created_at,
+    "popularity": ProductStats.popularity,
+    "stats_product_id": ProductStats.product_id,
+}
+
+# Joins que algunos órdenes necesitan en el listado de products.
+# Todo producto tiene fila en product_stats (app/utils/popularity.py): basta un inner join
+PRODUCT_SORT_JOINS = {
+    "product_stats": lambda query: query.join(ProductStats, ProductStats.product_id == Product.id),
+}
+
+
+def sort_names(columns: Dict[str, Any], joins: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Órdenes del registro que un listado puede servir con sus columnas y joins"""
+    return [
+        name for name, option in SORTS.items()
+        if all(key in columns for key, _ in option.keys) and option.tiebreaker in columns
+        and (not option.join or option.join in (joins or {}))
+    ]
+
+
+def sort_description(columns: Dict[str, Any], joins: Optional[Dict[str, Any]] = None) -> str:
+    """Texto de ?sort= para la documentación de un listado"""
+    names = sort_names(columns, joins)
+    return "Orden registrado: " + (", ".join(names[:-1]) + " o " + names[-1] if len(names) > 1 else names[0])
+
+
+def resolve_sort(sort: Optional[str], order_by: Optional[int] = None) -> SortOption:
+    """Orden pedido por ?sort= (o el antiguo ?order_by=); ValueError si no está registrado"""
+    if sort:
+        name = ",".join(part.strip() for part in sort.split(","))
+    else:
+        name = LEGACY_ORDER_BY.get(order_by or 0)
+    option = SORTS.get(name)
+    if option is None:
+        raise ValueError(f"Orden no válido: {sort or order_by}. Permitidos: {', '.join(SORTS)}")
+    return option
+
+
+def apply_sort(query, option: SortOption, columns: Dict[str, Any], joins: Optional[Dict[str, Any]] = None):
+    """Aplicar un orden del registro; ValueError si el listado no tiene alguna de sus claves"""
+    try:
+        clauses = option.order_by(columns)
+        if option.join:
+            query = (joins or {})[option.join](query)
+    except KeyError:
+        raise ValueError(f"Orden no disponible en este listado: {option.name}")
+    return query.order_by(*clauses)
+
+
+def backfill_sort_names(session: Session, batch_size: int = 500) -> int:
+    """Calcular sort_name de los productos creados antes de que existiera la columna"""
+    total = 0
+    last_id = 0
+    while True:
+        rows = session.exec(
+            select(Product.id, Product.name).where(Product.sort_name == "", Product.id > last_id)
+            .order_by(Product.id).limit(batch_size)
+            .execution_options(include_deleted=True)
+        ).all()
+        if not rows:
+            break
+        for product_id, name in rows:
+            # updated_at se conserva: el nombre no cambió y sync no debe reenviar el catálogo
+            session.exec(
+                update(Product).where(Product.id == product_id)
+                .values(sort_name=name_sort_key(name), updated_at=Product.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+        last_id = rows[-1][0]
+        session.commit()
+        total += len(rows)
+    return total
+
+
+def main():
+    from app.database import get_engine
+
+    with Session(get_engine()) as session:
+        total = backfill_sort_names(session)
+    print(f"✅ sort_name calculado para {total} productos.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# app/utils/statement_cache.py
+"""
+Aciertos de la caché de compilación de SQLAlchemy, por engine.
+
+Cada sentencia se compila a SQL una sola vez por forma (la clave es la
+estructura, no los valores de los parámetros) y se guarda en una LRU de
+DATABASE_QUERY_CACHE_SIZE entradas. Si el código genera formas distintas
+según la entrada (una cláusula por valor pedido), la LRU se llena, casi todo
+es fallo y cada petición paga compilar. Estos contadores lo hacen visible en
+/debug/runtime.
+"""
+import threading
+from typing import Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+
+
+class StatementCacheStats:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.hits = 0
+        self.misses = 0
+        # Sentencias sin clave de caché (texto SQL, DDL) o con caché desactivada
+        self.uncached = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is None:
+            return
+        with self._lock:
+            if context.cache_hit == CACHE_HIT:
+                self.hits += 1
+            elif context.cache_hit == CACHE_MISS:
+                self.misses += 1
+            else:
+                self.uncached += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = self.misses = self.uncached = 0
+
+    def report(self) -> dict:
+        cache = getattr(self.engine, "_compiled_cache", None)
+        cached = self.hits + self.misses
+        return {
+            "url": self.engine.url.render_as_string(hide_password=True),
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncached": self.uncached,
+            "hit_rate": round(self.hits / cached, 4) if cached else None,
+            "size": len(cache) if cache is not None else None,
+            "capacity": getattr(cache, "capacity", None),
+        }
+
+
+_stats: Dict[int, StatementCacheStats] = {}
+
+
+def watch(engine: Engine) -> StatementCacheStats:
+    """Empezar a contar aciertos y fallos de `engine` (una sola vez por engine)"""
+    stats = _stats.get(id(engine))
+    if stats is None or stats.engine is not engine:
+        stats = _stats[id(engine)] = StatementCacheStats(engine)
+    return stats
+
+
+def report() -> List[dict]:
+    return [stats.report() for stats in _stats.values()]
@@ -0,0 +1,129 @@
+# app/utils/sync.py
+"""
+Sincronización incremental del catálogo.
+
+El token de `/sync/products` guarda la marca de agua de cada flujo:
+- productos: último (updated_at, id) entregado, paginado por keyset;
+- tombstones: último id de product_deletions entregado.
+
+Solo se entregan filas más antiguas que `ahora - SYNC_SAFETY_LAG_SECONDS`, así
+una transacción que confirma tarde con un updated_at anterior no queda detrás
+de la marca de agua de ningún cliente.
+"""
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select, delete, func, or_, and_
+
+from app.config import SYNC_SAFETY_LAG_SECONDS, SYNC_TOMBSTONE_RETENTION_DAYS
+from app.models import Product, ProductDeletion
+from app.utils.cursor import encode_cursor, decode_cursor
+
+
+class SyncTokenExpired(Exception):
+    """El token es más antiguo que la retención de tombstones: hace falta una sincronización completa"""
+
+
+class SyncState:
+    def __init__(self, updated_at: Optional[datetime] = None, product_id: int = 0,
+                 deletion_id: int = 0, issued_at: Optional[float] = None):
+        self.updated_at = updated_at
+        self.product_id = product_id
+        self.deletion_id = deletion_id
+        self.issued_at = issued_at
+
+    @classmethod
+    def from_token(cls, token: Optional[str]) -> "SyncState":
+        if not token:
+            return cls()
+        data = decode_cursor(token)
+        try:
+            return cls(
+                updated_at=datetime.fromisoformat(data["u"]) if data.get("u") else None,
+                product_id=int(data.get("i", 0)),
+                deletion_id=int(data.get("d", 0)),
+                issued_at=float(data["t"]) if data.get("t") else None,
+            )
+        except (TypeError, ValueError):
+            raise ValueError("Cursor inválido")
+
+    def to_token(self) -> str:
+        return encode_cursor({
+            "u": self.updated_at.isoformat() if self.updated_at else None,
+            "i": self.product_id,
+            "d": self.deletion_id,
+            "t": int(time.time()),
+        })
+
+
+def _horizon(session: Session) -> datetime:
+    # Hora de la base de datos: es el mismo reloj que escribe updated_at
+    return session.exec(select(func.now())).one() - timedelta(seconds=SYNC_SAFETY_LAG_SECONDS)
+
+
+def changes_since(session: Session, state: SyncState, limit: int) -> Tuple[List[Product], List[ProductDeletion], SyncState, bool]:
+    """Una página de cambios: (productos, tombstones, nuevo estado, hay_más)"""
+    if (
+        state.issued_at is not None
+        and time.time() - state.issued_at > SYNC_TOMBSTONE_RETENTION_DAYS * 86400
+    ):
+        raise SyncTokenExpired()
+
+    horizon = _horizon(session)
+
+    query = (
+        select(Product)
+        .options(
+            selectinload(Product.brand),
+            selectinload(Product.category),
+            selectinload(Product.images),
+            selectinload(Product.colors),
+            selectinload(Product.genders),
+            selectinload(Product.materials),
+            selectinload(Product.sizes),
+        )
+        .where(Product.updated_at <= horizon)
+        .order_by(Product.updated_at, Product.id)
+        .limit(limit + 1)
+    )
+    if state.updated_at is not None:
+        query = query.where(or_(
+            Product.updated_at > state.updated_at,
+            and_(Product.updated_at == state.updated_at, Product.id > state.product_id),
+        ))
+    products = list(session.exec(query).all())
+
+    deletions = list(session.exec(
+        select(ProductDeletion)
+        .where(ProductDeletion.id > state.deletion_id, ProductDeletion.created_at <= horizon)
+        .order_by(ProductDeletion.id)
+        .limit(limit + 1)
+    ).all())
+
+    has_more = len(products) > limit or len(deletions) > limit
+    products, deletions = products[:limit], deletions[:limit]
+
+    next_state = SyncState(state.updated_at, state.product_id, state.deletion_id)
+    if products:
+        next_state.updated_at = products[-1].updated_at
+        next_state.product_id = products[-1].id
+    if deletions:
+        next_state.deletion_id = deletions[-1].id
+    return products, deletions, next_state, has_more
+
+
+def prune_tombstones(session: Session) -> int:
+    """Borrar tombstones más antiguos que la retención (los tokens de esa edad ya caducaron)"""
+    cutoff = _horizon(session) - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS)
+    result = session.exec(delete(ProductDeletion).where(ProductDeletion.created_at < cutoff))
+    session.commit()
+    return result.rowcount
+
+
+def prune_tombstones_job():
+    from app.database import get_engine
+
+    with Session(get_engine()) as session:
+        prune_tombstones(session)
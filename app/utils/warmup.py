@@ -0,0 +1,150 @@
+# app/utils/warmup.py
+"""
+Calentamiento del worker al arrancar, antes de marcarlo como listo.
+
+Sin esto, las primeras peticiones de cada worker pagan abrir conexiones,
+configurar los mappers, compilar cada forma de consulta (la caché de
+compilación de SQLAlchemy es por engine) y cargar plantillas y cachés en
+memoria. El lifespan lanza `start_warmup` en un hilo: /health/live responde
+desde el primer momento y /health/ready pasa a 200 solo cuando termina.
+
+Las consultas calientes se ejecutan pasando peticiones GET reales por la app
+(WARMUP_REQUESTS), así se calientan también el enrutado, las dependencias y la
+serialización. Los filtros usan IDs que no existen (-1, 0): misma sentencia
+SQL, resultado vacío y sin efectos (GET /products/0 no cuenta una vista).
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI
+from sqlalchemy.engine import Engine
+
+# Formas de consulta de las rutas de lectura más usadas
+WARMUP_REQUESTS = [
+    "/products/?category=-1",
+    "/products/filter?categories=-1&genders=-1&min_price=0&max_price=0&sort=price",
+    "/products/filter?sort=popular&categories=-1",
+    "/products/summaries?categories=-1&genders=-1&min_price=0&max_price=0",
+    "/products/price-stats",
+    "/products/0",
+    "/products/0/similar",
+    "/catalog/bootstrap",
+    "/sync/products",
+]
+
+
+class Readiness:
+    """Estado de /health/ready del worker"""
+
+    def __init__(self):
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.steps: Dict[str, float] = {}
+        self.errors: List[str] = []
+
+    def mark_ready(self):
+        self.ready = True
+
+    def mark_not_ready(self):
+        self.ready = False
+
+    def report(self) -> dict:
+        return {
+            "status": "ready" if self.ready else "warming_up",
+            "warmup_seconds": {name: round(seconds, 3) for name, seconds in self.steps.items()},
+            "warmup_errors": self.errors,
+        }
+
+
+readiness = Readiness()
+
+
+def open_pool(engine: Engine) -> int:
+    """Abrir a la vez tantas conexiones como pool_size y devolverlas al pool"""
+    size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    connections = []
+    try:
+        for _ in range(max(size, 1)):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+async def _get(app: FastAPI, path: str) -> int:
+    """GET dentro del proceso, por la pila ASGI completa; devuelve el status"""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": query.encode(),
+        "headers": [(b"host", b"warmup"), (b"accept-encoding", b"gzip")],
+        "client": ("127.0.0.1", 0), "server": ("warmup", 80),
+    }
+    response = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+
+    await app(scope, receive, send)
+    return response.get("status", 0)
+
+
+async def _run_requests(app: FastAPI, paths: List[str]) -> List[str]:
+    failed = []
+    for path in paths:
+        status = await _get(app, path)
+        if status >= 500:
+            failed.append(f"GET {path} -> {status}")
+    return failed
+
+
+def warm_up(app: FastAPI, paths: List[str] = WARMUP_REQUESTS):
+    """Calentar el worker paso a paso; un paso que falla no impide los demás"""
+    from sqlalchemy.orm import configure_mappers
+
+    from app.database import get_engine, get_replicas
+    from app.utils.email import get_template_env
+
+    def pools():
+        open_pool(get_engine())
+        for replica in get_replicas().engines:
+            open_pool(replica)
+
+    steps = [
+        ("mappers", configure_mappers),
+        ("templates", lambda: get_template_env().get_template("verify_email.html")),
+        ("pool", pools),
+        # Cachés en memoria (índice de precios, /catalog/bootstrap) y caché de
+        # compilación de cada forma de consulta
+        ("requests", lambda: readiness.errors.extend(asyncio.run(_run_requests(app, paths)))),
+    ]
+    readiness.started_at = time.monotonic()
+    readiness.steps, readiness.errors = {}, []
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            readiness.errors.append(f"{name}: {e}")
+        readiness.steps[name] = time.perf_counter() - start
+
+    total = time.monotonic() - readiness.started_at
+    detail = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in readiness.steps.items())
+    print(f"Warmup en {total:.2f} s ({detail})")
+    for error in readiness.errors:
+        print(f"Warmup: {error}")
+    readiness.mark_ready()
+
+
+def start_warmup(app: FastAPI) -> threading.Thread:
+    thread = threading.Thread(target=warm_up, args=(app,), name="warmup", daemon=True)
+    thread.start()
+    return thread
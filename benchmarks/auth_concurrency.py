@@ -0,0 +1,95 @@
+# benchmarks/auth_concurrency.py
+"""
+Registros duplicados y verificaciones repetidas en paralelo: exactamente uno
+debe ganar en cada caso, y cada paso debe costar un solo statement.
+
+    python -m benchmarks.auth_concurrency [--threads 16] [--database-url sqlite:///...]
+"""
+import argparse
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models.user import User
+from app.routers.auth import _create_user, verify_email
+from app.schemas.auth import RegisterRequest
+from app.utils.verifier import make_verify_token
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+
+
+def _parallel(fn, threads: int) -> List[str]:
+    barrier = threading.Barrier(threads)
+
+    def run(_):
+        barrier.wait()
+        try:
+            return fn()
+        except HTTPException as e:
+            return e.detail
+
+    with ThreadPoolExecutor(threads) as pool:
+        return list(pool.map(run, range(threads)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrencia de registro y verificación")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'auth.db')}"
+    connect_args = {"timeout": 30, "check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args, pool_size=args.threads)
+    SQLModel.metadata.create_all(engine)
+    counter = StatementCounter(engine)
+
+    data = RegisterRequest(name="Ana", last_name="Pérez", email="concurrencia@example.com", password="secret123")
+
+    def register():
+        with Session(engine) as session:
+            return _create_user(session, data)
+
+    results = _parallel(register, args.threads)
+    created = [r for r in results if isinstance(r, tuple)]
+    rejected = [r for r in results if r == "Email already registered"]
+    print(f"Registro x{args.threads}: {len(created)} creado, {len(rejected)} rechazados, "
+          f"{counter.count / args.threads:.1f} statements/intento")
+    assert len(created) == 1 and len(rejected) == args.threads - 1, results
+
+    user_id = created[0][0]
+    token = make_verify_token(user_id)
+    counter.count = 0
+
+    def verify():
+        with Session(engine) as session:
+            return verify_email(token=token, session=session)["message"]
+
+    messages = _parallel(verify, args.threads)
+    first = messages.count("Correo verificado correctamente!")
+    print(f"Verificación x{args.threads}: {first} escritura, {args.threads - first} repeticiones, "
+          f"{counter.count / args.threads:.1f} statements/intento")
+    assert first == 1, messages
+
+    with Session(engine) as session:
+        assert session.get(User, user_id).email_verified_at is not None
+    print("✅ Exactamente un registro y una verificación ganaron")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/geo.py
+"""
+Vendedores cercanos con N direcciones: recorrido completo con haversine
+contra caja envolvente + celdas geohash (app.utils.geo.sellers_near).
+
+    python -m benchmarks.geo [--sellers 100000] [--radius 5 25] [--queries 50]
+                             [--database-url mysql+mysqlconnector://...]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.models import Address, User
+from app.utils.geo import geohash_encode, haversine_km, sellers_near
+
+# Zona metropolitana aproximada del Valle de México
+LAT_RANGE = (19.0, 20.0)
+LON_RANGE = (-99.6, -98.6)
+
+
+def _seed(engine, sellers: int):
+    rng = random.Random(7)
+    with Session(engine) as session:
+        if session.exec(select(Address.id).limit(1)).first():
+            return
+        users, addresses = [], []
+        for i in range(1, sellers + 1):
+            lat, lon = rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)
+            users.append(dict(id=i, name="Vendedor", last_name="Bench", second_last_name="",
+                              email=f"seller{i}@example.com", password="x", address_id=i))
+            addresses.append(dict(id=i, user_id=i, latitude=lat, longitude=lon,
+                                  geohash=geohash_encode(lat, lon, 12)))
+        for start in range(0, sellers, 5000):
+            session.execute(insert(User.__table__), users[start:start + 5000])
+            session.execute(insert(Address.__table__), addresses[start:start + 5000])
+        session.commit()
+
+
+def full_scan(session: Session, lat: float, lon: float, radius: float):
+    rows = session.exec(select(Address.user_id, Address.latitude, Address.longitude)).all()
+    return sorted(user_id for user_id, a_lat, a_lon in rows if haversine_km(lat, lon, a_lat, a_lon) <= radius)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Búsqueda de vendedores por cercanía")
+    parser.add_argument("--sellers", type=int, default=100000)
+    parser.add_argument("--radius", type=float, nargs="+", default=[5, 25])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'geo.db')}"
+    engine = create_engine(url)
+    SQLModel.metadata.create_all(engine)
+    _seed(engine, args.sellers)
+
+    rng = random.Random(11)
+    points = [(rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) for _ in range(args.queries)]
+    with Session(engine) as session:
+        for radius in args.radius:
+            start = time.perf_counter()
+            expected = [full_scan(session, lat, lon, radius) for lat, lon in points[:5]]
+            scan = (time.perf_counter() - start) / 5
+
+            start = time.perf_counter()
+            found = [sellers_near(session, lat, lon, radius) for lat, lon in points]
+            indexed = (time.perf_counter() - start) / len(points)
+
+            assert [sorted(u for u, _ in f) for f in found[:5]] == expected, "Resultados distintos"
+            avg = sum(len(f) for f in found) / len(found)
+            print(f"radio={radius:>5} km  {avg:8.0f} vendedores/consulta  "
+                  f"recorrido={scan * 1000:8.1f} ms  geohash={indexed * 1000:7.1f} ms  {scan / indexed:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# benchmarks/inventory.py
+"""
+Reservas concurrentes sobre un mismo producto: comprueba que nunca se vende de
+más y mide reservas/s con el stock en una sola fila y repartido en fracciones.
+
+    python -m benchmarks.inventory [--threads 16] [--stock 2000] [--attempts 3000] [--shards 1 8]
+                                   [--database-url mysql+mysqlconnector://...]
+
+Con SQLite las escrituras se serializan a nivel de archivo, así que las
+fracciones solo muestran su efecto contra MySQL.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, create_engine, select, func
+
+from app.models import Brand, Category, Product, ProductStockShard, StockReservation, User
+from app.utils.inventory import ReservationError, reserve, shard_stock
+
+
+def _setup(engine, stock: int, shards: int) -> int:
+    with Session(engine) as session:
+        if not session.get(User, 1):
+            session.add(User(id=1, name="Bench", last_name="Bench", second_last_name="", email="bench@example.com",
+                             password="x"))
+            session.add(Brand(id=1, name="Marca"))
+            session.add(Category(id=1, name="Categoría"))
+            session.commit()
+        product = Product(name="Producto caliente", price=1, quantity=stock, user_id=1, brand_id=1, category_id=1,
+                          description="")
+        session.add(product)
+        session.commit()
+        product_id = product.id
+        if shards > 1:
+            shard_stock(session, product_id, shards)
+    return product_id
+
+
+def run(engine, stock: int, attempts: int, threads: int, shards: int):
+    product_id = _setup(engine, stock, shards)
+    ok = rejected = retried = 0
+    lock = threading.Lock()
+    remaining = iter(range(attempts))
+
+    def worker():
+        nonlocal ok, rejected, retried
+        with Session(engine) as session:
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                while True:
+                    try:
+                        reserve(session, product_id, 1)
+                        session.commit()
+                        outcome = "ok"
+                    except ReservationError:
+                        session.rollback()
+                        outcome = "rejected"
+                    except OperationalError:
+                        # Deadlock o lock wait: se reintenta igual que lo haría el cliente
+                        session.rollback()
+                        with lock:
+                            retried += 1
+                        continue
+                    break
+                with lock:
+                    if outcome == "ok":
+                        ok += 1
+                    else:
+                        rejected += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        for _ in range(threads):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - start
+
+    with Session(engine) as session:
+        reserved = session.exec(
+            select(func.coalesce(func.sum(StockReservation.quantity), 0))
+            .where(StockReservation.product_id == product_id)
+        ).one()
+        if shards > 1:
+            left = session.exec(
+                select(func.sum(ProductStockShard.quantity)).where(ProductStockShard.product_id == product_id)
+            ).one()
+        else:
+            left = session.get(Product, product_id).quantity
+
+    print(f"fracciones={shards:<3} {attempts / elapsed:8.0f} intentos/s  reservas={ok} rechazadas={rejected} "
+          f"reintentos={retried} stock restante={left}")
+    assert ok == min(stock, attempts), "Se reservaron más o menos unidades de las disponibles"
+    assert reserved == ok and left == stock - ok, "El stock no cuadra con las reservas"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Contención en reservas de stock")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--stock", type=int, default=2000)
+    parser.add_argument("--attempts", type=int, default=3000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'inventory.db')}"
+    connect_args = {"timeout": 30, "check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args, pool_size=args.threads)
+    SQLModel.metadata.create_all(engine)
+
+    for shards in args.shards:
+        run(engine, args.stock, args.attempts, args.threads, shards)
+    print("✅ Sin sobreventa en ningún escenario")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/link_writer.py
+"""
+Costo por fila de escribir las tablas de enlace: objetos ORM con add_all (como
+antes) contra los INSERT de Core por tabla de app.utils.link_writer, para
+productos con muchas tallas y colores.
+
+    python -m benchmarks.link_writer [--products 500] [--colors 12] [--sizes 20]
+                                     [--database-url mysql+mysqlconnector://...]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine, delete
+
+from app.models import (
+    Brand, Category, Color, ColorProduct, Gender, GenderProduct, Material, MaterialProduct, Product,
+    ProductSize, Size, User
+)
+from app.utils.link_writer import LINK_TABLES, bulk_create_links, create_links
+
+
+def orm_links(session: Session, product_id: int, data):
+    """Forma anterior: un objeto ORM por fila"""
+    for field, (model, column) in LINK_TABLES.items():
+        session.add_all([model(product_id=product_id, **{column: value}) for value in getattr(data, field)])
+    session.flush()
+
+
+def _seed(engine, products: int, colors: int, sizes: int):
+    with Session(engine) as session:
+        session.add(User(name="Vendedor", last_name="Bench", second_last_name="", email="bench@example.com",
+                         password="x", address_id=1))
+        session.add(Brand(name="Marca"))
+        session.add(Category(name="Categoría"))
+        for model, count in ((Color, colors), (Gender, 3), (Material, 5), (Size, sizes)):
+            session.add_all([model(name=f"{model.__name__} {i}") for i in range(count)])
+        session.commit()
+        session.execute(insert(Product.__table__), [
+            dict(name=f"Producto {i}", sort_name=f"producto {i}", description="", price=1.0, quantity=1,
+                 user_id=1, brand_id=1, category_id=1)
+            for i in range(products)
+        ])
+        session.commit()
+
+
+def _payloads(products: int, colors: int, sizes: int):
+    rng = random.Random(4)
+    return [
+        (product_id, SimpleNamespace(
+            color_ids=rng.sample(range(1, colors + 1), colors),
+            gender_ids=rng.sample(range(1, 4), 2),
+            material_ids=rng.sample(range(1, 6), 2),
+            size_ids=rng.sample(range(1, sizes + 1), sizes),
+        ))
+        for product_id in range(1, products + 1)
+    ]
+
+
+def _clear(engine):
+    with Session(engine) as session:
+        for model in (ColorProduct, GenderProduct, MaterialProduct, ProductSize):
+            session.exec(delete(model))
+        session.commit()
+
+
+def run(engine, write, payloads) -> float:
+    _clear(engine)
+    start = time.perf_counter()
+    with Session(engine) as session:
+        write(session, payloads)
+        session.commit()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escritura de tablas de enlace: ORM contra Core executemany")
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--colors", type=int, default=12)
+    parser.add_argument("--sizes", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'links.db')}"
+    engine = create_engine(url)
+    SQLModel.metadata.create_all(engine)
+    _seed(engine, args.products, args.colors, args.sizes)
+    payloads = _payloads(args.products, args.colors, args.sizes)
+    rows = sum(len(getattr(data, field)) for _, data in payloads for field in LINK_TABLES)
+
+    variants = [
+        ("ORM add_all (por producto)", lambda s, items: [orm_links(s, p, d) for p, d in items]),
+        ("Core (por producto)", lambda s, items: [create_links(s, p, d) for p, d in items]),
+        ("Core (lote completo)", bulk_create_links),
+    ]
+    print(f"{args.products} productos, {rows} filas de enlace ({rows // args.products} por producto)")
+    baseline = None
+    for name, write in variants:
+        elapsed = run(engine, write, payloads)
+        baseline = baseline or elapsed
+        print(f"{name:<28} {elapsed:7.2f} s  {elapsed / rows * 1e6:7.1f} µs/fila  {baseline / elapsed:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
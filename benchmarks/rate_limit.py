@@ -0,0 +1,61 @@
+# benchmarks/rate_limit.py
+"""
+Costo por petición del rate limiter de auth.
+
+    python -m benchmarks.rate_limit
+"""
+import time
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.utils.rate_limit import InMemoryBackend, ConcurrencyLimiter, enforce_rate_limit, backend
+
+
+def _request(ip: str) -> Request:
+    return Request({
+        "type": "http",
+        "method": "POST",
+        "path": "/auth/login",
+        "headers": [],
+        "client": (ip, 12345),
+    })
+
+
+def bench(label: str, fn, n: int = 100_000):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<45} {elapsed / n * 1e6:8.2f} µs/petición")
+
+
+def main():
+    memory = InMemoryBackend()
+    bench("InMemoryBackend.hit (una clave)", lambda i: memory.hit("login:ip:1.1.1.1", 10**9, 60))
+    bench("InMemoryBackend.hit (100k claves)", lambda i: memory.hit(f"login:ip:{i}", 10, 60))
+
+    requests = [_request(f"10.0.{i // 256 % 256}.{i % 256}") for i in range(1000)]
+    backend.reset()
+
+    def enforce(i):
+        # Incluye el costo de las peticiones rechazadas (429)
+        try:
+            enforce_rate_limit(requests[i % 1000], "login", f"user{i}@example.com")
+        except HTTPException:
+            pass
+
+    bench("enforce_rate_limit (IP + email)", enforce)
+
+    limiter = ConcurrencyLimiter(8)
+
+    def concurrency(_):
+        gen = limiter()
+        next(gen)
+        gen.close()
+
+    bench("ConcurrencyLimiter acquire/release", concurrency)
+
+
+if __name__ == "__main__":
+    main()
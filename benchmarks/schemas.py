@@ -0,0 +1,151 @@
+# benchmarks/schemas.py
+"""
+Costo de validar y serializar 1k productos: esquemas SQLModel anteriores
+(validación + jsonable + json.dumps, como hacía FastAPI) contra los modelos
+Pydantic v2 actuales con TypeAdapter y dump_json.
+
+    python -m benchmarks.schemas [--n 1000] [--repeat 20]
+"""
+import argparse
+import json
+import time
+import warnings
+from typing import List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import SQLModel
+
+from app.models import Brand, Category, Color, Gender, Material, Product, Size
+from app.models.image import Image
+from app.routers.product import _RELATION_FIELDS
+from app.schemas.product import ProductCreate, ProductReadList
+
+
+# Esquemas tal como estaban antes (SQLModel + orm_mode)
+class LegacyLookupRead(SQLModel):
+    id: int
+    name: str
+
+
+class LegacyImageRead(SQLModel):
+    id: int
+    product_id: int
+    url: str
+    description: Optional[str] = None
+    order: Optional[int] = 1
+
+
+class LegacyProductRead(SQLModel):
+    id: int
+    name: str
+    price: float
+    quantity: Optional[int]
+    user_id: int
+    description: Optional[str]
+
+    brand: Optional[LegacyLookupRead]
+    category: Optional[LegacyLookupRead]
+    images: List[LegacyImageRead] = []
+
+    colors: List[LegacyLookupRead] = []
+    genders: List[LegacyLookupRead] = []
+    materials: List[LegacyLookupRead] = []
+    sizes: List[LegacyLookupRead] = []
+
+
+class LegacyProductCreate(SQLModel):
+    name: str
+    price: float
+    quantity: Optional[int]
+    user_id: int
+    brand_id: int
+    category_id: int
+    description: Optional[str]
+    color_ids: Optional[List[int]] = []
+    gender_ids: Optional[List[int]] = []
+    material_ids: Optional[List[int]] = []
+    size_ids: Optional[List[int]] = []
+
+
+def _products(n: int) -> List[Product]:
+    brand, category = Brand(id=1, name="Marca"), Category(id=1, name="Categoría")
+    colors = [Color(id=i, name=f"Color {i}") for i in range(1, 4)]
+    genders = [Gender(id=i, name=f"Género {i}") for i in range(1, 3)]
+    materials = [Material(id=1, name="Algodón")]
+    sizes = [Size(id=i, name=f"Talla {i}") for i in range(1, 5)]
+    products = []
+    for i in range(1, n + 1):
+        product = Product(id=i, name=f"Producto {i}", price=100 + i, quantity=3, user_id=1,
+                          brand_id=1, category_id=1, description="Descripción de prueba")
+        product.brand, product.category = brand, category
+        product.colors, product.genders = colors, genders
+        product.materials, product.sizes = materials, sizes
+        product.images = [Image(id=i * 10 + k, product_id=i, url=f"img/{i}-{k}.jpg", order=k) for k in range(2)]
+        products.append(product)
+    return products
+
+
+def _payloads(n: int) -> List[dict]:
+    return [
+        {"name": f"Producto {i}", "price": 100 + i, "quantity": 3, "user_id": 1, "brand_id": 1,
+         "category_id": 1, "description": "x", "color_ids": [1, 2], "gender_ids": [1],
+         "material_ids": [1], "size_ids": [1, 2, 3]}
+        for i in range(n)
+    ]
+
+
+def legacy_serialize(products) -> bytes:
+    validated = [LegacyProductRead.model_validate(p) for p in products]
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def current_serialize(products) -> bytes:
+    return ProductReadList.dump_json(ProductReadList.validate_python(products, from_attributes=True))
+
+
+def legacy_payloads(payloads):
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+    for data in payloads:
+        LegacyProductCreate.model_validate(data).dict(exclude={"color_ids", "gender_ids", "material_ids", "size_ids"})
+
+
+def current_payloads(payloads):
+    for data in payloads:
+        ProductCreate.model_validate(data).model_dump(exclude=_RELATION_FIELDS)
+
+
+def bench(label: str, fn, data, repeat: int, n: int) -> float:
+    fn(data)  # calentamiento
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(data)
+    per_1k = (time.perf_counter() - start) / repeat / n * 1000
+    print(f"{label:<45} {per_1k * 1000:8.2f} ms / 1k productos")
+    return per_1k
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Costo de esquemas de lectura y payloads")
+    parser.add_argument("--n", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    products = _products(args.n)
+    # Misma salida salvo updated_at, que los esquemas anteriores no tenían
+    current = json.loads(current_serialize(products[:5]))
+    for row in current:
+        row.pop("updated_at")
+    assert json.loads(legacy_serialize(products[:5])) == current
+
+    before = bench("ProductRead SQLModel + jsonable_encoder", legacy_serialize, products, args.repeat, args.n)
+    after = bench("ProductRead Pydantic v2 + TypeAdapter", current_serialize, products, args.repeat, args.n)
+    print(f"{'':<45} {before / after:8.1f}x")
+
+    payloads = _payloads(args.n)
+    before = bench("ProductCreate SQLModel + .dict(exclude=set)", legacy_payloads, payloads, args.repeat, args.n)
+    after = bench("ProductCreate BaseModel + model_dump", current_payloads, payloads, args.repeat, args.n)
+    print(f"{'':<45} {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/serve_scaling.py
+"""
+Throughput de `python -m app.serve` con 1..N workers sobre una BD SQLite local.
+
+    python -m benchmarks.serve_scaling --workers 1 2 4 --duration 10 --clients 16
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+
+def _load(url: str, duration: float) -> int:
+    done = 0
+    deadline = time.monotonic() + duration
+    with httpx.Client(timeout=10) as client:
+        while time.monotonic() < deadline:
+            if client.get(url).status_code == 200:
+                done += 1
+    return done
+
+
+def _wait_ready(url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("El servidor no respondió a tiempo")
+
+
+def run(workers: int, port: int, duration: float, clients: int, path: str, env: dict) -> float:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}{path}"
+    try:
+        _wait_ready(url)
+        with ProcessPoolExecutor(clients) as pool:
+            total = sum(pool.map(_load, [url] * clients, [duration] * clients))
+        return total / duration
+    finally:
+        server.terminate()
+        server.wait(60)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--path", default="/brands/")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", OUTBOX_ENABLED="false")
+
+    print(f"CPUs: {os.cpu_count()}  clientes: {args.clients}  ruta: {args.path}")
+    baseline = None
+    for workers in args.workers:
+        rps = run(workers, args.port, args.duration, args.clients, args.path, env)
+        baseline = baseline or rps
+        print(f"{workers:>3} workers: {rps:8.0f} req/s  (x{rps / baseline:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/statement_cache.py
+"""
+Costo de compilar las consultas de /products/filter: la forma anterior (JOIN
+más un EXISTS por género) contra la canónica de app.utils.product_filters
+(semijoin con IN expandible), con la caché de compilación activa y sin ella.
+
+    python -m benchmarks.statement_cache [--requests 2000] [--genders 12]
+                                         [--database-url mysql+mysqlconnector://...]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine, select, or_
+
+from app.models import Brand, Category, Gender, GenderProduct, Product, User
+from app.utils.product_filters import product_filters
+from app.utils.statement_cache import StatementCacheStats
+
+
+def legacy_filters(query, categories, genders, min_price, max_price):
+    """Filtro de géneros anterior: una cláusula por género pedido"""
+    if categories:
+        query = query.where(Product.category_id.in_(categories))
+    if genders:
+        query = query.join(Product.genders).where(or_(*[Product.genders.any(id=g) for g in genders]))
+    if min_price is not None and max_price is not None:
+        query = query.where(Product.price.between(min_price, max_price))
+    return query
+
+
+def _seed(engine, products: int, genders: int):
+    rng = random.Random(3)
+    with Session(engine) as session:
+        session.add(User(name="Vendedor", last_name="Bench", second_last_name="", email="bench@example.com",
+                         password="x", address_id=1))
+        session.add_all([Brand(name=f"Marca {i}") for i in range(5)])
+        session.add_all([Category(name=f"Categoría {i}") for i in range(20)])
+        session.add_all([Gender(name=f"Género {i}") for i in range(genders)])
+        session.commit()
+        session.execute(insert(Product.__table__), [
+            dict(name=f"Producto {i}", sort_name=f"producto {i}", description="", price=rng.uniform(1, 1000),
+                 quantity=1, user_id=1, brand_id=rng.randint(1, 5), category_id=rng.randint(1, 20))
+            for i in range(products)
+        ])
+        session.execute(insert(GenderProduct.__table__), [
+            dict(product_id=p, gender_id=g)
+            for p in range(1, products + 1) for g in rng.sample(range(1, genders + 1), rng.randint(1, 3))
+        ])
+        session.commit()
+
+
+def _requests(n: int, genders: int):
+    rng = random.Random(9)
+    for _ in range(n):
+        categories = rng.sample(range(1, 21), rng.randint(0, 4))
+        picked = rng.sample(range(1, genders + 1), rng.randint(0, genders))
+        price = (10.0, rng.uniform(100, 1000)) if rng.random() < 0.5 else (None, None)
+        yield categories, picked, price
+
+
+def run(url: str, build, requests, cache_size: int):
+    engine = create_engine(url, query_cache_size=cache_size)
+    stats = StatementCacheStats(engine)
+    rows = 0
+    with Session(engine) as session:
+        start = time.perf_counter()
+        for categories, genders, (low, high) in requests:
+            query = build(select(Product.id), categories, genders, low, high).order_by(Product.id).limit(20)
+            rows += len(session.exec(query).all())
+        elapsed = time.perf_counter() - start
+    engine.dispose()
+    report = stats.report()
+    # Sin caché cada consulta se compila; con caché, solo los fallos
+    compiled = report["misses"] if cache_size else report["uncached"]
+    return elapsed / len(requests), report["hit_rate"], compiled, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Caché de compilación con filtros dinámicos")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--genders", type=int, default=12)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'statements.db')}"
+    engine = create_engine(url)
+    SQLModel.metadata.create_all(engine)
+    _seed(engine, args.products, args.genders)
+    engine.dispose()
+
+    requests = list(_requests(args.requests, args.genders))
+    print(f"{args.requests} peticiones, hasta {args.genders} géneros por petición")
+    print(f"{'filtro':<12} {'caché':>6} {'por consulta':>14} {'aciertos':>9} {'compiladas':>11} {'filas':>8}")
+    for name, build in (("anterior", legacy_filters), ("canónico", product_filters)):
+        for cache_size in (0, 500):
+            per_query, hit_rate, compiled, rows = run(url, build, requests, cache_size)
+            hits = f"{hit_rate:.1%}" if hit_rate is not None else "-"
+            print(f"{name:<12} {cache_size:>6} {per_query * 1e6:11.0f} µs {hits:>9} {compiled:>11} {rows:>8}")
+    # Las filas del filtro anterior incluyen productos repetidos (uno por género que coincidía)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/warmup.py
+"""
+Latencia de la primera petición de un worker recién arrancado, con y sin el
+calentamiento del lifespan (WARMUP_ENABLED). En ambos casos se mide después
+de que /health/ready responda 200, como haría el balanceador.
+
+    python -m benchmarks.warmup [--products 2000] [--port 8766]
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models import Brand, Category, Gender, GenderProduct, Product, User
+
+# Rutas que un cliente pide al abrir la app (con filtros reales)
+FIRST_REQUESTS = [
+    "/catalog/bootstrap",
+    "/products/filter?categories=1&categories=2&genders=1&min_price=10&max_price=500&sort=price",
+    "/products/summaries?categories=3&sort=name",
+    "/products/price-stats?categories=1",
+    "/products/1",
+]
+
+
+def _seed(url: str, products: int):
+    engine = create_engine(url)
+    SQLModel.metadata.create_all(engine)
+    rng = random.Random(5)
+    with Session(engine) as session:
+        session.add(User(name="Vendedor", last_name="Bench", second_last_name="", email="bench@example.com",
+                         password="x", address_id=1))
+        session.add_all([Brand(name=f"Marca {i}") for i in range(10)])
+        session.add_all([Category(name=f"Categoría {i}") for i in range(10)])
+        session.add_all([Gender(name=name) for name in ("Hombre", "Mujer", "Unisex")])
+        session.commit()
+        for i in range(products):
+            product = Product(name=f"Producto {i}", description="", price=rng.uniform(1, 1000), quantity=5,
+                              user_id=1, brand_id=rng.randint(1, 10), category_id=rng.randint(1, 10))
+            session.add(product)
+            session.flush()
+            session.add(GenderProduct(product_id=product.id, gender_id=rng.randint(1, 3)))
+        session.commit()
+    engine.dispose()
+
+
+def _wait_ready(base: str, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base}/health/ready", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError("El servidor no quedó listo a tiempo")
+
+
+def run(warmup: bool, port: int, env: dict) -> list:
+    env = dict(env, WARMUP_ENABLED="true" if warmup else "false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "1", "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        _wait_ready(base)
+        timings = []
+        with httpx.Client(base_url=base, timeout=30) as client:
+            for path in FIRST_REQUESTS:
+                start = time.perf_counter()
+                client.get(path).raise_for_status()
+                first = time.perf_counter() - start
+                start = time.perf_counter()
+                client.get(path).raise_for_status()
+                timings.append((path, first, time.perf_counter() - start))
+        return timings
+    finally:
+        server.terminate()
+        server.wait(60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Primera petición con y sin calentamiento")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'warmup.db')}"
+    _seed(url, args.products)
+    env = dict(os.environ, DATABASE_URL=url, OUTBOX_ENABLED="false")
+
+    results = {warmup: run(warmup, args.port, env) for warmup in (False, True)}
+    print(f"{'ruta':<45} {'en frío':>10} {'calentado':>10} {'2ª petición':>12}")
+    for (path, cold, _), (_, warm, second) in zip(results[False], results[True]):
+        print(f"{path[:45]:<45} {cold * 1000:8.1f} ms {warm * 1000:8.1f} ms {second * 1000:10.1f} ms")
+    total_cold = sum(t for _, t, _ in results[False])
+    total_warm = sum(t for _, t, _ in results[True])
+    print(f"{'total':<45} {total_cold * 1000:8.1f} ms {total_warm * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
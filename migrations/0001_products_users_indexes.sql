@@ -0,0 +1,34 @@
+-- migrations/0001_products_users_indexes.sql
+-- Cambios de esquema sobre tablas que ya existían. create_tables() (SQLModel
+-- create_all) solo crea las tablas nuevas (product_summary, product_stats,
+-- product_neighbors, stock_shards, idempotency_keys, ...) con sus índices;
+-- no añade columnas ni índices a una tabla existente. Ejecutar una vez en
+-- MySQL antes de desplegar esta versión sobre una base ya creada.
+
+ALTER TABLE products
+    -- Borrado lógico: las consultas filtran deleted_at IS NULL
+    ADD COLUMN deleted_at DATETIME NULL,
+    -- Número de shards de stock del producto (0 = sin shards, stock en quantity)
+    ADD COLUMN stock_shards INT NOT NULL DEFAULT 0,
+    -- Nombre normalizado para ordenar por nombre; se rellena con el backfill
+    ADD COLUMN sort_name VARCHAR(100) NOT NULL DEFAULT '',
+    ADD INDEX ix_products_deleted_at (deleted_at),
+    -- /sync/products: cambios desde un cursor (updated_at, id)
+    ADD INDEX ix_products_updated_at_id (updated_at, id),
+    -- Productos de un vendedor por fecha
+    ADD INDEX ix_products_user_id_created_at (user_id, created_at, id),
+    -- Paginación por cursor de los distintos órdenes del listado
+    ADD INDEX ix_products_sort_name_id (sort_name, id),
+    ADD INDEX ix_products_price_id (price, id),
+    ADD INDEX ix_products_created_at_id (created_at, id),
+    ADD INDEX ix_products_price_created_at_id (price, created_at DESC, id DESC);
+
+ALTER TABLE users
+    -- Keyset del listado de administración: ORDER BY created_at, id
+    ADD INDEX ix_users_created_at_id (created_at, id),
+    -- Filtro ?verified= y conteo de verificados
+    ADD INDEX ix_users_email_verified_at (email_verified_at);
+
+-- Filtro por género: se busca por gender_id y se une por product_id
+ALTER TABLE gender_product
+    ADD INDEX ix_gender_product_gender_id_product_id (gender_id, product_id);
@@ -0,0 +1,45 @@
+# tests/conftest.py
+"""
+Fixtures comunes: una base SQLite nueva por prueba y un helper que lanza la
+misma función desde varios hilos a la vez (con una barrera para que compitan).
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import SQLModel, create_engine
+
+THREADS = 12
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"timeout": 30, "check_same_thread": False},
+        pool_size=THREADS,
+    )
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def parallel() -> Callable[[Callable, int], List]:
+    """Ejecutar fn en `threads` hilos a la vez; devuelve el resultado o el detail de la HTTPException"""
+    def run_all(fn, threads: int = THREADS) -> List:
+        barrier = threading.Barrier(threads)
+
+        def run(_):
+            barrier.wait()
+            try:
+                return fn()
+            except HTTPException as e:
+                return e.detail
+
+        with ThreadPoolExecutor(threads) as pool:
+            return list(pool.map(run, range(threads)))
+
+    return run_all
@@ -0,0 +1,46 @@
+# tests/test_auth_concurrency.py
+"""Registros y verificaciones simultáneos: exactamente uno debe ganar"""
+from sqlmodel import Session, select, func
+
+from app.models.user import User
+from app.routers.auth import _create_user, verify_email
+from app.schemas.auth import RegisterRequest
+from app.utils.verifier import make_verify_token
+
+from tests.conftest import THREADS
+
+
+def test_duplicate_register_creates_one_user(engine, parallel):
+    data = RegisterRequest(name="Ana", last_name="Pérez", email="carrera@example.com", password="secret123")
+
+    def register():
+        with Session(engine) as session:
+            return _create_user(session, data)
+
+    results = parallel(register)
+
+    created = [r for r in results if isinstance(r, tuple)]
+    rejected = [r for r in results if r == "Email already registered"]
+    assert len(created) == 1, results
+    assert len(rejected) == THREADS - 1, results
+    with Session(engine) as session:
+        assert session.exec(
+            select(func.count()).select_from(User).where(User.email == "carrera@example.com")
+        ).one() == 1
+
+
+def test_repeated_verification_writes_once(engine, parallel):
+    data = RegisterRequest(name="Ana", last_name="Pérez", email="verifica@example.com", password="secret123")
+    with Session(engine) as session:
+        user_id = _create_user(session, data)[0]
+    token = make_verify_token(user_id)
+
+    def verify():
+        with Session(engine) as session:
+            return verify_email(token=token, session=session)["message"]
+
+    messages = parallel(verify)
+
+    assert messages.count("Correo verificado correctamente!") == 1, messages
+    with Session(engine) as session:
+        assert session.get(User, user_id).email_verified_at is not None
@@ -0,0 +1,104 @@
+# tests/test_inventory_concurrency.py
+"""Reservas simultáneas sobre un mismo producto: nunca se vende de más"""
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, select, func
+
+from app.models import (Brand, Category, Product, ProductStockShard, ProductSummary, SellerCategoryStats,
+                        StockReservation, User)
+from app.utils.inventory import ReservationError, release, reserve, shard_stock
+from app.utils.product_summary import refresh_product_summary
+from app.utils.seller_stats import apply_product_change, product_state
+
+from tests.conftest import THREADS
+
+STOCK = 20
+ATTEMPTS_PER_THREAD = 3
+
+
+def _create_product(engine, stock: int, shards: int) -> int:
+    with Session(engine) as session:
+        session.add(User(id=1, name="Test", last_name="Test", second_last_name="", email="stock@example.com",
+                         password="x"))
+        session.add(Brand(id=1, name="Marca"))
+        session.add(Category(id=1, name="Categoría"))
+        session.commit()
+        product = Product(name="Producto caliente", price=10, quantity=stock, user_id=1, brand_id=1,
+                          category_id=1, description="")
+        session.add(product)
+        session.flush()
+        refresh_product_summary(session, product.id)
+        apply_product_change(session, None, product_state(product))
+        session.commit()
+        product_id = product.id
+        if shards > 1:
+            shard_stock(session, product_id, shards)
+    return product_id
+
+
+def _attempt(session: Session, fn):
+    """Ejecutar fn y hacer commit; reintenta si la base devuelve un lock wait (como haría el cliente)"""
+    while True:
+        try:
+            result = fn()
+            session.commit()
+            return result
+        except OperationalError:
+            session.rollback()
+
+
+def _remaining(session: Session, product_id: int) -> int:
+    product = session.get(Product, product_id)
+    if not product.stock_shards:
+        return product.quantity
+    return session.exec(
+        select(func.sum(ProductStockShard.quantity)).where(ProductStockShard.product_id == product_id)
+    ).one()
+
+
+@pytest.mark.parametrize("shards", [0, 4])
+def test_concurrent_reservations_never_oversell(engine, parallel, shards):
+    product_id = _create_product(engine, STOCK, shards)
+
+    def buy():
+        taken = 0
+        with Session(engine) as session:
+            for _ in range(ATTEMPTS_PER_THREAD):
+                try:
+                    _attempt(session, lambda: reserve(session, product_id, 1))
+                    taken += 1
+                except ReservationError:
+                    session.rollback()
+        return taken
+
+    taken = sum(parallel(buy))
+
+    assert taken == min(STOCK, THREADS * ATTEMPTS_PER_THREAD)
+    with Session(engine) as session:
+        reserved = session.exec(
+            select(func.coalesce(func.sum(StockReservation.quantity), 0))
+            .where(StockReservation.product_id == product_id)
+        ).one()
+        assert reserved == taken
+        assert _remaining(session, product_id) == STOCK - taken
+        if not shards:
+            # Los modelos de lectura siguen al stock de la fila del producto
+            assert session.get(ProductSummary, product_id).quantity == STOCK - taken
+            assert session.exec(select(SellerCategoryStats.total_quantity)).one() == STOCK - taken
+
+
+@pytest.mark.parametrize("shards", [0, 4])
+def test_concurrent_release_returns_stock_once(engine, parallel, shards):
+    product_id = _create_product(engine, STOCK, shards)
+    with Session(engine) as session:
+        reservation_id = reserve(session, product_id, 5).id
+        session.commit()
+
+    def cancel():
+        with Session(engine) as session:
+            return _attempt(session, lambda: release(session, reservation_id)) is not None
+
+    assert sum(parallel(cancel)) == 1
+    with Session(engine) as session:
+        assert _remaining(session, product_id) == STOCK
+        assert session.get(StockReservation, reservation_id).status == "released"